@@ -0,0 +1,197 @@
+"""CPU and wire cost of the call audio path, per second of call audio.
+
+Usage (from backend/):
+    python -m app.audio_bench pipeline [--seconds 10] [--chunk-ms 40] [--runs 5]
+    python -m app.audio_bench codecs [--seconds 10] [--chunk-ms 40] [--runs 5]
+    python -m app.audio_bench input [--chunk-ms 40] [--runs 5]
+
+`pipeline` feeds a synthetic voice-like signal (tones plus noise) through
+AudioPipeline in chunk_ms chunks for each direction a client can negotiate,
+and reports the median thread CPU time in ms per call-second over --runs.
+
+`codecs` sends the same signal through each wire codec in chunk_ms messages
+at the Gemini input and output rates, and reports wire KB/s, median encode
+and decode CPU in ms per call-second, and the round-trip SNR in dB.
+
+`input` streams a short utterance plus trailing silence in real time, in
+chunk_ms client chunks, through InboundAudioStage for each frame size in
+INPUT_FRAME_SIZES_MS, against a session that takes INPUT_SEND_MS per send.
+It reports the median end-of-speech latency (last speech chunk pushed ->
+last speech byte received upstream) and the sends per second.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import numpy as np
+
+from .audio_codecs import _CODECS, AudioCodec
+from .audio_input import INPUT_SAMPLE_RATE, InboundAudioStage
+from .audio_processing import GEMINI_INPUT_RATE, GEMINI_OUTPUT_RATE, AudioPipeline
+
+# (label, in_rate, out_rate, channels, agc)
+PIPELINE_CASES = [
+    ("in 8000 mono", 8000, GEMINI_INPUT_RATE, 1, False),
+    ("in 16000 mono (passthrough)", 16000, GEMINI_INPUT_RATE, 1, False),
+    ("in 16000 mono + agc", 16000, GEMINI_INPUT_RATE, 1, True),
+    ("in 44100 mono", 44100, GEMINI_INPUT_RATE, 1, False),
+    ("in 48000 mono", 48000, GEMINI_INPUT_RATE, 1, False),
+    ("in 48000 stereo", 48000, GEMINI_INPUT_RATE, 2, False),
+    ("in 48000 stereo + agc", 48000, GEMINI_INPUT_RATE, 2, True),
+    ("out 8000", GEMINI_OUTPUT_RATE, 8000, 1, False),
+    ("out 16000", GEMINI_OUTPUT_RATE, 16000, 1, False),
+    ("out 24000 (passthrough)", GEMINI_OUTPUT_RATE, 24000, 1, False),
+    ("out 44100", GEMINI_OUTPUT_RATE, 44100, 1, False),
+    ("out 48000", GEMINI_OUTPUT_RATE, 48000, 1, False),
+]
+
+INPUT_FRAME_SIZES_MS = [10, 20, 40, 80, 160]
+INPUT_SEND_MS = 5  # simulated upstream cost of one realtime-input send
+
+
+def voice_like(rate: int, seconds: float, channels: int = 1, seed: int = 1) -> bytes:
+    """int16 PCM: a few harmonics with a syllable-rate envelope, plus noise."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(rate * seconds)) / rate
+    signal = sum(np.sin(2 * np.pi * f * t) / (i + 1) for i, f in enumerate((180, 360, 720, 1440)))
+    signal *= 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t) ** 2
+    signal = 0.25 * signal + 0.01 * rng.standard_normal(t.shape[0])
+    samples = (np.clip(signal, -1, 1) * 32767).astype(np.int16)
+    if channels > 1:
+        samples = np.repeat(samples, channels)
+    return samples.tobytes()
+
+
+def _chunks(pcm: bytes, size: int):
+    for position in range(0, len(pcm), size):
+        yield pcm[position:position + size]
+
+
+def bench_pipeline(seconds: float = 10.0, chunk_ms: int = 40, runs: int = 5) -> dict:
+    results = {}
+    for label, in_rate, out_rate, channels, agc in PIPELINE_CASES:
+        pcm = voice_like(in_rate, seconds, channels)
+        chunk_bytes = in_rate * chunk_ms // 1000 * 2 * channels
+        samples = []
+        for _ in range(runs):
+            pipeline = AudioPipeline(in_rate, out_rate, channels, agc=agc)
+            for chunk in _chunks(pcm, chunk_bytes):
+                pipeline.process(chunk)
+            samples.append(pipeline.cpu_seconds * 1000 / seconds)
+        results[label] = round(statistics.median(samples), 3)
+    return {
+        "seconds": seconds, "chunk_ms": chunk_ms, "runs": runs,
+        "cpu_ms_per_call_second": results,
+    }
+
+
+def _snr_db(reference: bytes, decoded: bytes) -> float:
+    x = np.frombuffer(reference, np.int16).astype(np.float64)
+    y = np.frombuffer(decoded, np.int16).astype(np.float64)
+    noise = ((x - y) ** 2).sum()
+    return float("inf") if noise == 0 else 10 * np.log10((x ** 2).sum() / noise)
+
+
+def bench_codecs(seconds: float = 10.0, chunk_ms: int = 40, runs: int = 5) -> dict:
+    results = {}
+    for rate in (GEMINI_INPUT_RATE, GEMINI_OUTPUT_RATE):
+        pcm = voice_like(rate, seconds)
+        chunk_bytes = rate * chunk_ms // 1000 * 2
+        for name in _CODECS:
+            encode_ms, decode_ms = [], []
+            for _ in range(runs):
+                sender, receiver = AudioCodec(name), AudioCodec(name)
+                decoded = b"".join(receiver.decode(sender.encode(chunk)) for chunk in _chunks(pcm, chunk_bytes))
+                encode_ms.append(sender.cpu_seconds * 1000 / seconds)
+                decode_ms.append(receiver.cpu_seconds * 1000 / seconds)
+            snr = _snr_db(pcm, decoded)
+            results[f"{name} {rate}"] = {
+                "wire_kb_s": round(sender.bytes_out / 1024 / seconds, 1),
+                "encode_ms_per_call_second": round(statistics.median(encode_ms), 3),
+                "decode_ms_per_call_second": round(statistics.median(decode_ms), 3),
+                "snr_db": None if snr == float("inf") else round(snr, 1),
+            }
+    return {"seconds": seconds, "chunk_ms": chunk_ms, "runs": runs, "codecs": results}
+
+
+class _TimedSession:
+    """Live session stand-in: each send takes send_ms; notes when the speech tail lands."""
+
+    def __init__(self, send_ms: float, speech_bytes: int):
+        self.send_s = send_ms / 1000
+        self.speech_bytes = speech_bytes
+        self.received = 0
+        self.speech_end_at: float | None = None
+
+    async def send(self, input=None, end_of_turn: bool = False):
+        await asyncio.sleep(self.send_s)
+        self.received += sum(len(chunk.data) for chunk in input.media_chunks)
+        if self.speech_end_at is None and self.received >= self.speech_bytes:
+            self.speech_end_at = time.perf_counter()
+
+
+async def _stream_utterance(frame_ms: int, chunk_ms: int, speech_s: float, silence_s: float = 0.3):
+    speech = voice_like(INPUT_SAMPLE_RATE, speech_s)
+    pcm = speech + bytes(int(INPUT_SAMPLE_RATE * silence_s) * 2)
+    session = _TimedSession(INPUT_SEND_MS, len(speech))
+    stage = InboundAudioStage(session, frame_ms=frame_ms)
+    sender = asyncio.create_task(stage.run())
+
+    chunk_bytes = INPUT_SAMPLE_RATE * chunk_ms // 1000 * 2
+    started = time.perf_counter()
+    speech_pushed_at = None
+    for index, chunk in enumerate(_chunks(pcm, chunk_bytes)):
+        delay = started + index * chunk_ms / 1000 - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)  # client mic runs in real time
+        stage.push(chunk)
+        if speech_pushed_at is None and (index + 1) * chunk_bytes >= len(speech):
+            speech_pushed_at = time.perf_counter()
+    while session.speech_end_at is None and time.perf_counter() - started < speech_s + 5:
+        await asyncio.sleep(0.005)
+    sender.cancel()
+    await sender
+
+    latency_ms = (session.speech_end_at - speech_pushed_at) * 1000 if session.speech_end_at else float("nan")
+    return latency_ms, stage.sends / (time.perf_counter() - started), stage.coalesced_sends
+
+
+def bench_input(chunk_ms: int = 40, runs: int = 5, frame_sizes: list[int] | None = None) -> dict:
+    results = {}
+    for frame_ms in frame_sizes or INPUT_FRAME_SIZES_MS:
+        latencies, rates, coalesced = [], [], 0
+        for run in range(runs):
+            # Spread the utterance end across one frame so the median sees every phase
+            speech_s = 0.5 + frame_ms / 1000 * run / runs
+            latency_ms, sends_per_s, coalesced_sends = asyncio.run(_stream_utterance(frame_ms, chunk_ms, speech_s))
+            latencies.append(latency_ms)
+            rates.append(sends_per_s)
+            coalesced += coalesced_sends
+        results[f"frame {frame_ms}ms"] = {
+            "speech_end_latency_ms": round(statistics.median(latencies), 1),
+            "sends_per_second": round(statistics.median(rates), 1),
+            "coalesced_sends": coalesced,
+        }
+    return {"chunk_ms": chunk_ms, "runs": runs, "send_ms": INPUT_SEND_MS, "frames": results}
+
+
+def main_cli(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Measure CPU cost of the call audio path")
+    parser.add_argument("command", choices=["pipeline", "codecs", "input"])
+    parser.add_argument("--seconds", type=float, default=10.0, help="audio per run")
+    parser.add_argument("--chunk-ms", type=int, default=40, help="client chunk size")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+    if args.command == "input":
+        report = bench_input(args.chunk_ms, args.runs)
+    else:
+        bench = bench_pipeline if args.command == "pipeline" else bench_codecs
+        report = bench(args.seconds, args.chunk_ms, args.runs)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
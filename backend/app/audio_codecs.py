@@ -0,0 +1,225 @@
+"""Compact audio codecs for the call WebSocket (pure NumPy, no native deps).
+
+- "pcm":   raw int16 little-endian (default, 16 bits/sample)
+- "mulaw": G.711 mu-law (8 bits/sample), table-driven
+- "adpcm": IMA-ADPCM (4 bits/sample + block headers)
+
+IMA-ADPCM is sequential within a block, so a message is split into many
+short blocks that each carry their own predictor and step index. The
+encoder/decoder then loop over sample positions and vectorize across blocks.
+
+ADPCM message layout (little-endian):
+    uint32 sample_count
+    per block: int16 predictor, uint8 step_index, uint8 reserved,
+               ADPCM_BLOCK_SAMPLES - 1 codes packed two per byte (low nibble first)
+"""
+
+import logging
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CODEC = "pcm"
+
+# --- G.711 mu-law -----------------------------------------------------------
+
+_MULAW_BIAS = 0x84
+_MULAW_CLIP = 32635
+
+
+def _build_mulaw_tables() -> tuple[np.ndarray, np.ndarray]:
+    # Encode table indexed by the int16 sample reinterpreted as uint16
+    samples = np.arange(65536, dtype=np.uint16).view(np.int16).astype(np.int32)
+    sign = (samples < 0).astype(np.int32) << 7
+    magnitude = np.minimum(np.abs(samples), _MULAW_CLIP) + _MULAW_BIAS
+    exponent = np.floor(np.log2(magnitude)).astype(np.int32) - 7
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    encode = (~(sign | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8)
+
+    codes = ~np.arange(256, dtype=np.int32) & 0xFF
+    exponent = (codes >> 4) & 0x07
+    mantissa = codes & 0x0F
+    magnitude = (((mantissa << 3) + _MULAW_BIAS) << exponent) - _MULAW_BIAS
+    decode = np.where(codes & 0x80, -magnitude, magnitude).astype(np.int16)
+    return encode, decode
+
+
+_MULAW_ENCODE, _MULAW_DECODE = _build_mulaw_tables()
+
+
+def mulaw_encode(pcm: bytes) -> bytes:
+    samples = np.frombuffer(pcm, dtype=np.uint16, count=len(pcm) // 2)
+    return _MULAW_ENCODE[samples].tobytes()
+
+
+def mulaw_decode(data: bytes) -> bytes:
+    return _MULAW_DECODE[np.frombuffer(data, dtype=np.uint8)].tobytes()
+
+
+# --- IMA-ADPCM --------------------------------------------------------------
+
+ADPCM_BLOCK_SAMPLES = 65
+_ADPCM_CODE_BYTES = (ADPCM_BLOCK_SAMPLES - 1) // 2
+_ADPCM_BLOCK_BYTES = 4 + _ADPCM_CODE_BYTES
+
+_STEP_TABLE = np.array([
+    7, 8, 9, 10, 11, 12, 13, 14, 16, 17, 19, 21, 23, 25, 28, 31, 34, 37, 41, 45,
+    50, 55, 60, 66, 73, 80, 88, 97, 107, 118, 130, 143, 157, 173, 190, 209, 230,
+    253, 279, 307, 337, 371, 408, 449, 494, 544, 598, 658, 724, 796, 876, 963,
+    1060, 1166, 1282, 1411, 1552, 1707, 1878, 2066, 2272, 2499, 2749, 3024, 3327,
+    3660, 4026, 4428, 4871, 5358, 5894, 6484, 7132, 7845, 8630, 9493, 10442,
+    11487, 12635, 13899, 15289, 16818, 18500, 20350, 22385, 24623, 27086, 29794,
+    32767,
+], dtype=np.int32)
+_INDEX_ADJUST = np.array([-1, -1, -1, -1, 2, 4, 6, 8], dtype=np.int32)
+
+
+def _build_adpcm_tables() -> tuple[np.ndarray, np.ndarray]:
+    # Flattened [step_index * 8 + magnitude_code] lookups so each sample
+    # position costs one take() for the reconstruction and one for the next index.
+    index = np.arange(89, dtype=np.int32)[:, None]
+    code = np.arange(8, dtype=np.int32)[None, :]
+    step = _STEP_TABLE[index]
+    vpdiff = (
+        (step >> 3)
+        + np.where(code & 4, step, 0)
+        + np.where(code & 2, step >> 1, 0)
+        + np.where(code & 1, step >> 2, 0)
+    )
+    next_index = np.clip(index + _INDEX_ADJUST[code], 0, 88)
+    return vpdiff.reshape(-1).astype(np.int32), (next_index * 8).reshape(-1).astype(np.int32)
+
+
+_ADPCM_VPDIFF, _ADPCM_NEXT = _build_adpcm_tables()
+
+
+def adpcm_encode(pcm: bytes) -> bytes:
+    samples = np.frombuffer(pcm, dtype=np.int16, count=len(pcm) // 2)
+    count = samples.shape[0]
+    header = np.array([count], dtype="<u4").tobytes()
+    if count == 0:
+        return header
+
+    blocks = -(-count // ADPCM_BLOCK_SAMPLES)
+    padded = np.pad(samples, (0, blocks * ADPCM_BLOCK_SAMPLES - count), mode="edge")
+    lanes = padded.reshape(blocks, ADPCM_BLOCK_SAMPLES).astype(np.int32)
+
+    # Start each block at a step size matched to its mean slope so blocks
+    # can be coded independently (and therefore in parallel).
+    slope = np.abs(np.diff(lanes, axis=1)).mean(axis=1)
+    first_index = np.clip(np.searchsorted(_STEP_TABLE, slope), 0, 88).astype(np.int32)
+    state = first_index * 8  # step_index * 8, ready for table lookups
+    predictor = lanes[:, 0].copy()
+
+    codes = np.empty((blocks, ADPCM_BLOCK_SAMPLES - 1), dtype=np.int32)
+    for i in range(1, ADPCM_BLOCK_SAMPLES):
+        diff = lanes[:, i] - predictor
+        negative = diff < 0
+        # Quantize |diff| to 0..7 quarter-steps; decoding is standard IMA
+        magnitude = np.minimum((np.abs(diff) << 2) // _STEP_TABLE[state >> 3], 7)
+        state += magnitude
+        vpdiff = _ADPCM_VPDIFF.take(state)
+        predictor += np.where(negative, -vpdiff, vpdiff)
+        np.clip(predictor, -32768, 32767, out=predictor)
+        state = _ADPCM_NEXT.take(state)
+        codes[:, i - 1] = magnitude | (negative << 3)
+
+    out = np.zeros((blocks, _ADPCM_BLOCK_BYTES), dtype=np.uint8)
+    out[:, 0:2] = lanes[:, 0].astype("<i2").view(np.uint8).reshape(blocks, 2)
+    out[:, 2] = first_index
+    out[:, 4:] = codes[:, 0::2] | (codes[:, 1::2] << 4)
+    return header + out.tobytes()
+
+
+def adpcm_decode(data: bytes) -> bytes:
+    if len(data) < 4:
+        return b""
+    count = int(np.frombuffer(data, dtype="<u4", count=1)[0])
+    blocks = (len(data) - 4) // _ADPCM_BLOCK_BYTES
+    if count == 0 or blocks == 0:
+        return b""
+    raw = np.frombuffer(data, dtype=np.uint8, offset=4, count=blocks * _ADPCM_BLOCK_BYTES)
+    raw = raw.reshape(blocks, _ADPCM_BLOCK_BYTES)
+
+    predictor = raw[:, 0:2].copy().view("<i2").reshape(blocks).astype(np.int32)
+    state = np.clip(raw[:, 2].astype(np.int32), 0, 88) * 8
+    packed = raw[:, 4:].astype(np.int32)
+    codes = np.empty((blocks, ADPCM_BLOCK_SAMPLES - 1), dtype=np.int32)
+    codes[:, 0::2] = packed & 0x0F
+    codes[:, 1::2] = packed >> 4
+    magnitudes = codes & 7
+    negative = (codes & 8) != 0
+
+    out = np.empty((blocks, ADPCM_BLOCK_SAMPLES), dtype=np.int16)
+    out[:, 0] = predictor
+    for i in range(1, ADPCM_BLOCK_SAMPLES):
+        state += magnitudes[:, i - 1]
+        vpdiff = _ADPCM_VPDIFF.take(state)
+        predictor += np.where(negative[:, i - 1], -vpdiff, vpdiff)
+        np.clip(predictor, -32768, 32767, out=predictor)
+        state = _ADPCM_NEXT.take(state)
+        out[:, i] = predictor
+    return out.reshape(-1)[:count].tobytes()
+
+
+# --- Negotiation ------------------------------------------------------------
+
+_CODECS = {
+    "pcm": (None, None),
+    "mulaw": (mulaw_encode, mulaw_decode),
+    "adpcm": (adpcm_encode, adpcm_decode),
+}
+
+
+class AudioCodec:
+    """
+    Per-call codec wrapper for one negotiated codec (both directions).
+    Tracks wire bytes and CPU time so bandwidth/cost can be reported per call.
+    """
+
+    def __init__(self, name: str = DEFAULT_CODEC):
+        self.name = name
+        self._encode, self._decode = _CODECS[name]
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.cpu_seconds = 0.0
+
+    def encode(self, pcm: bytes) -> bytes:
+        if self._encode is None:
+            data = pcm
+        else:
+            start = time.thread_time()
+            data = self._encode(pcm)
+            self.cpu_seconds += time.thread_time() - start
+        self.bytes_out += len(data)
+        return data
+
+    def decode(self, data: bytes) -> bytes:
+        self.bytes_in += len(data)
+        if self._decode is None:
+            return data
+        start = time.thread_time()
+        pcm = self._decode(data)
+        self.cpu_seconds += time.thread_time() - start
+        return pcm
+
+    def summary(self, call_seconds: float) -> str:
+        seconds = max(call_seconds, 1e-3)
+        return (
+            f"codec={self.name} out={self.bytes_out / 1024 / seconds:.1f}KB/s "
+            f"in={self.bytes_in / 1024 / seconds:.1f}KB/s "
+            f"cpu={self.cpu_seconds * 1000 / seconds:.2f}ms per call-second"
+        )
+
+
+def negotiate_codec(requested: str | None) -> str:
+    """Pick the first supported codec from a comma-separated preference list."""
+    for name in (requested or "").split(","):
+        name = name.strip().lower()
+        if name in _CODECS:
+            return name
+    if requested:
+        logger.warning(f"No supported codec in '{requested}', using {DEFAULT_CODEC}")
+    return DEFAULT_CODEC
@@ -0,0 +1,130 @@
+"""Inbound audio stage: re-chunks client mic PCM and forwards it to Gemini as realtime input."""
+
+import asyncio
+import logging
+import time
+
+import numpy as np
+
+from .config import AUDIO_INPUT_FRAME_MS, AUDIO_INPUT_BACKLOG_MS, AUDIO_INPUT_MAX_BACKLOG_MS, AUDIO_VOICE_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+INPUT_SAMPLE_RATE = 16000
+
+
+class InboundAudioStage:
+    """
+    Buffers 16 kHz mono int16 PCM from the client and sends it to the
+    Live session in fixed `frame_ms` frames via LiveClientRealtimeInput.
+    Frames are sent one by one while the upstream keeps up; once the oldest
+    waiting frame is more than `backlog_ms` old, everything queued is
+    coalesced into a single send. At most `max_backlog_ms` of audio is
+    held; past that the oldest frames are dropped so a stalled upstream
+    cannot grow the queue without bound.
+    """
+
+    def __init__(
+        self,
+        session,
+        frame_ms: int = AUDIO_INPUT_FRAME_MS,
+        backlog_ms: int = AUDIO_INPUT_BACKLOG_MS,
+        max_backlog_ms: int = AUDIO_INPUT_MAX_BACKLOG_MS,
+        sample_rate: int = INPUT_SAMPLE_RATE,
+    ):
+        self.session = session
+        self.frame_ms = frame_ms
+        self.sample_rate = sample_rate
+        self.mime_type = f"audio/pcm;rate={sample_rate}"
+        self.frame_bytes = max(2, sample_rate * frame_ms // 1000 * 2)
+        self.backlog_s = backlog_ms / 1000
+        self._buffer = bytearray()
+        max_frames = max(1, max_backlog_ms // max(frame_ms, 1))
+        self._queue: asyncio.Queue[tuple[float, bytes]] = asyncio.Queue(maxsize=max_frames)
+
+        # Stats / latency measurement
+        self.frames_sent = 0
+        self.sends = 0
+        self.coalesced_sends = 0
+        self.dropped_frames = 0
+        self.last_voiced_at: float | None = None
+        self._awaiting_response = False
+        self.response_latencies: list[float] = []
+
+    def push(self, pcm: bytes) -> bool:
+        """Add client PCM; complete frames are queued for sending. Returns True if any frame was voiced."""
+        self._buffer += pcm
+        frame_bytes = self.frame_bytes
+        voiced = False
+        while len(self._buffer) >= frame_bytes:
+            frame = bytes(self._buffer[:frame_bytes])
+            del self._buffer[:frame_bytes]
+            now = time.perf_counter()
+            if self._is_voiced(frame):
+                self.last_voiced_at = now
+                self._awaiting_response = True
+                voiced = True
+            if self._queue.full():
+                # Upstream stalled past the backlog limit: keep the newest audio
+                self._queue.get_nowait()
+                self.dropped_frames += 1
+            self._queue.put_nowait((now, frame))
+        return voiced
+
+    @property
+    def queued_bytes(self) -> int:
+        """Caller audio buffered here and not yet sent to Gemini."""
+        return len(self._buffer) + self._queue.qsize() * self.frame_bytes
+
+    def mark_response(self):
+        """Call when model audio arrives; records end-of-speech -> response latency."""
+        if self._awaiting_response and self.last_voiced_at is not None:
+            self.response_latencies.append(time.perf_counter() - self.last_voiced_at)
+            self._awaiting_response = False
+
+    @staticmethod
+    def _is_voiced(frame: bytes) -> bool:
+        """Cheap peak-amplitude voice check on int16 PCM."""
+        samples = np.frombuffer(frame, dtype=np.int16)
+        # int32 so that abs(-32768) does not wrap
+        return int(np.abs(samples.astype(np.int32)).max()) > AUDIO_VOICE_THRESHOLD
+
+    async def _send(self, data: bytes):
+        from google.genai import types
+
+        await self.session.send(
+            input=types.LiveClientRealtimeInput(
+                media_chunks=[types.Blob(mime_type=self.mime_type, data=data)]
+            )
+        )
+
+    async def run(self):
+        """Sender loop; run as its own task alongside the call tasks."""
+        try:
+            while True:
+                queued_at, frame = await self._queue.get()
+                frames = [frame]
+                if time.perf_counter() - queued_at > self.backlog_s:
+                    # Upstream is behind: ship everything waiting in one message
+                    while not self._queue.empty():
+                        frames.append(self._queue.get_nowait()[1])
+                    self.coalesced_sends += 1
+                await self._send(b"".join(frames) if len(frames) > 1 else frame)
+                self.frames_sent += len(frames)
+                self.sends += 1
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Inbound audio send error: {e}")
+
+    def summary(self) -> str:
+        latencies = self.response_latencies
+        if latencies:
+            avg_ms = sum(latencies) / len(latencies) * 1000
+            latency = f"avg speech-end->response {avg_ms:.0f}ms over {len(latencies)} turns"
+        else:
+            latency = "no response latency samples"
+        return (
+            f"frame={self.frame_ms}ms frames={self.frames_sent} sends={self.sends} "
+            f"coalesced={self.coalesced_sends} dropped={self.dropped_frames}, {latency}"
+        )
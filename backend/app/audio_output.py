@@ -0,0 +1,492 @@
+"""Outbound audio stage: paces model audio to the client at playback rate.
+
+Gemini generates speech faster than real time. Sent as it arrives, seconds of
+audio pile up in the browser's playback schedule, where the server can
+neither drop them on barge-in nor see how much is queued. This stage holds
+the model audio (already at the client's output rate) and releases it in
+fixed `frame_ms` frames so that only a small lead, the jitter target, is
+ahead of the client's playback position.
+
+The target adapts per call. Every `ack_every`-th frame asks the client to
+acknowledge it with its scheduled playback (buffered_ms) and underrun count.
+The ack round trips feed smoothed RTT and RTT-deviation estimates (RFC 6298
+style): the target is min_ms + 4 * rttvar, plus a boost that grows with each
+reported underrun and halves every UNDERRUN_DECAY_S. A reported buffer below
+min_ms is a near-underrun and raises the boost by the shortfall, so the lead
+grows before the caller hears a gap. Clients that never ack keep the
+initial target.
+
+    python -m app.audio_output simulate [--jitter-ms 30] [--seconds 120]
+
+runs the stage against a simulated network with injected jitter and reports
+underruns and end-to-end latency for unpaced, fixed-target and adaptive
+pacing.
+"""
+
+import argparse
+import asyncio
+import bisect
+import json
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, NamedTuple
+
+from .config import (
+    AUDIO_OUTPUT_PACING, AUDIO_OUTPUT_FRAME_MS, AUDIO_OUTPUT_TARGET_MS,
+    AUDIO_OUTPUT_MIN_MS, AUDIO_OUTPUT_MAX_MS, AUDIO_OUTPUT_ACK_EVERY
+)
+
+logger = logging.getLogger(__name__)
+
+UNDERRUN_BOOST_S = 0.04  # Lead added per client-reported underrun
+UNDERRUN_DECAY_S = 10.0  # Half-life of that boost
+
+
+class OutboundFrame(NamedTuple):
+    seq: int
+    data: bytes  # int16 PCM at the client's output rate
+    offset: int  # Position of the first byte in the pushed stream
+    start: bool  # First frame after the client ran idle (new talkspurt)
+    ack: bool  # Client should acknowledge this frame
+
+
+class OutboundAudioStage:
+    """
+    Buffers model audio and releases fixed-size frames while the estimated
+    client lead (audio sent but not yet played) is below the jitter target.
+    With `paced` off, everything buffered is sent as soon as it arrives.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[OutboundFrame], Awaitable[None]],
+        sample_rate: int,
+        paced: bool = AUDIO_OUTPUT_PACING,
+        frame_ms: int = AUDIO_OUTPUT_FRAME_MS,
+        target_ms: int = AUDIO_OUTPUT_TARGET_MS,
+        min_ms: int = AUDIO_OUTPUT_MIN_MS,
+        max_ms: int = AUDIO_OUTPUT_MAX_MS,
+        ack_every: int = AUDIO_OUTPUT_ACK_EVERY,
+    ):
+        self.send = send
+        self.sample_rate = sample_rate
+        self.paced = paced
+        self.frame_ms = frame_ms
+        self.frame_bytes = max(2, sample_rate * frame_ms // 1000 * 2)
+        self.frame_s = self.frame_bytes / 2 / sample_rate
+        self.initial_s = target_ms / 1000
+        self.min_s = min_ms / 1000
+        self.max_s = max(max_ms, min_ms) / 1000
+        self.ack_every = max(1, ack_every)
+        self._buffer = bytearray()
+        self._offset = 0  # Stream position of _buffer[0]
+        self._last_push = 0.0
+        self._client_end = 0.0  # When the client will have played everything sent
+        self._seq = 0
+        self._wakeup = asyncio.Event()
+        self._acks_pending: deque[tuple[int, float]] = deque(maxlen=64)
+
+        # Jitter target inputs
+        self.srtt: float | None = None
+        self.rttvar = 0.0
+        self.boost = 0.0
+        self._boost_at = 0.0
+        self.client_underruns = 0
+        self.client_buffered_ms: float | None = None
+
+        # Stats
+        self.frames_sent = 0
+        self.talkspurts = 0
+        self.acks = 0
+        self.padded_bytes = 0
+        self.flushed_bytes = 0
+        self.peak_lead_s = 0.0
+
+    @property
+    def target_s(self) -> float:
+        """Current jitter target: audio allowed ahead of the client's playback."""
+        base = self.initial_s if self.srtt is None else self.min_s + 4 * self.rttvar
+        return min(self.max_s, max(self.min_s, base + self.boost))
+
+    @property
+    def queued_bytes(self) -> int:
+        """Model audio held here and not yet sent to the client."""
+        return len(self._buffer)
+
+    def push(self, pcm: bytes, now: float | None = None):
+        """Add model audio (int16 PCM at the client's output rate)."""
+        self._buffer += pcm
+        self._last_push = time.perf_counter() if now is None else now
+        self._wakeup.set()
+
+    def flush(self) -> int:
+        """Drop audio not yet sent (caller barged in); returns the bytes dropped."""
+        dropped = len(self._buffer)
+        self._offset += dropped
+        self.flushed_bytes += dropped
+        self._buffer.clear()
+        return dropped
+
+    def on_ack(self, seq: Any, buffered_ms: Any = None, underruns: Any = None, now: float | None = None):
+        """Client playback acknowledgement for frame `seq`."""
+        if not isinstance(seq, int):
+            return
+        now = time.perf_counter() if now is None else now
+        while self._acks_pending and self._acks_pending[0][0] < seq:
+            self._acks_pending.popleft()
+        if self._acks_pending and self._acks_pending[0][0] == seq:
+            rtt = now - self._acks_pending.popleft()[1]
+            if self.srtt is None:
+                self.srtt, self.rttvar = rtt, rtt / 2
+            else:
+                self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+                self.srtt = 0.875 * self.srtt + 0.125 * rtt
+            self.acks += 1
+
+        self.boost *= 0.5 ** ((now - self._boost_at) / UNDERRUN_DECAY_S)
+        self._boost_at = now
+        if isinstance(underruns, int) and underruns > self.client_underruns:
+            self.boost = min(self.max_s, self.boost + UNDERRUN_BOOST_S * (underruns - self.client_underruns))
+            self.client_underruns = underruns
+        if isinstance(buffered_ms, (int, float)):
+            self.client_buffered_ms = float(buffered_ms)
+            shortfall = self.min_s - self.client_buffered_ms / 1000
+            if shortfall > 0:
+                self.boost = min(self.max_s, self.boost + shortfall)
+
+    def due_in(self, now: float) -> float | None:
+        """Seconds until the next frame may go out (<= 0: now), None if nothing is buffered."""
+        if not self._buffer:
+            return None
+        if not self.paced:
+            return 0.0
+        wait = self._client_end - self.target_s - now
+        if len(self._buffer) < self.frame_bytes:
+            # End of a turn: pad the remainder once no more audio arrived for a frame's time
+            wait = max(wait, self._last_push + self.frame_s - now)
+        return wait
+
+    def poll(self, now: float) -> list[OutboundFrame]:
+        """Frames to send at `now`."""
+        frames = []
+        while (due := self.due_in(now)) is not None and due <= 0:
+            frames.append(self._take(now))
+        return frames
+
+    def _take(self, now: float) -> OutboundFrame:
+        size = self.frame_bytes if self.paced else len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        offset = self._offset
+        self._offset += len(data)
+        if len(data) < size:
+            self.padded_bytes += size - len(data)
+            data += bytes(size - len(data))
+
+        start = self._client_end < now
+        if start:
+            self._client_end = now
+            self.talkspurts += 1
+        self._client_end += len(data) / 2 / self.sample_rate
+        self.peak_lead_s = max(self.peak_lead_s, self._client_end - now)
+
+        frame = OutboundFrame(self._seq, data, offset, start, self._seq % self.ack_every == 0)
+        if frame.ack:
+            self._acks_pending.append((frame.seq, now))
+        self._seq += 1
+        return frame
+
+    async def run(self):
+        """Sender loop; run as its own task alongside the call tasks."""
+        try:
+            while True:
+                for frame in self.poll(time.perf_counter()):
+                    await self.send(frame)
+                    self.frames_sent += 1
+                due = self.due_in(time.perf_counter())
+                self._wakeup.clear()
+                if due is None:
+                    await self._wakeup.wait()
+                elif due > 0:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), due)
+                    except asyncio.TimeoutError:
+                        pass
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Outbound audio send error: {e}")
+
+    def summary(self) -> str:
+        rtt = (
+            f"rtt={self.srtt * 1000:.0f}±{self.rttvar * 1000:.0f}ms over {self.acks} acks"
+            if self.srtt is not None else "no acks"
+        )
+        return (
+            f"paced={self.paced} frame={self.frame_ms}ms frames={self.frames_sent} "
+            f"talkspurts={self.talkspurts} target={self.target_s * 1000:.0f}ms "
+            f"peak_lead={self.peak_lead_s * 1000:.0f}ms {rtt} "
+            f"client_underruns={self.client_underruns} "
+            f"flushed={self.flushed_bytes / 2 / self.sample_rate * 1000:.0f}ms"
+        )
+
+
+# --- Simulation ----------------------------------------------------------------
+
+class _Link:
+    """
+    One direction of the WebSocket: in-order delivery, base delay plus
+    per-message jitter, and stalls (spikes) that arrive `spike_rate` times
+    per second. Stalls are drawn from their own generator on the time axis,
+    so every pacing mode meets the same stalls however many messages it sends.
+    """
+
+    def __init__(
+        self, rng: random.Random, stall_rng: random.Random,
+        base_s: float, jitter_s: float, spike_rate: float, spike_s: float,
+    ):
+        self.rng = rng
+        self.stall_rng = stall_rng
+        self.base_s = base_s
+        self.jitter_s = jitter_s
+        self.spike_rate = spike_rate
+        self.spike_s = spike_s
+        self.queue: deque[tuple[float, Any]] = deque()
+        self._last = 0.0
+        self._stall_at = self._next_stall(0.0)
+
+    def _next_stall(self, after: float) -> float:
+        return after + self.stall_rng.expovariate(self.spike_rate) if self.spike_rate > 0 else float("inf")
+
+    def send(self, now: float, item: Any):
+        while self._stall_at + self.spike_s <= now:
+            self._stall_at = self._next_stall(self._stall_at + self.spike_s)
+        delay = self.base_s + (self.rng.expovariate(1 / self.jitter_s) if self.jitter_s > 0 else 0.0)
+        arrival = now + delay
+        if self._stall_at <= now:
+            arrival = max(arrival, self._stall_at + self.spike_s + self.base_s)
+        # TCP: a late message holds back everything behind it
+        self._last = max(self._last, arrival)
+        self.queue.append((self._last, item))
+
+    def next_at(self) -> float | None:
+        return self.queue[0][0] if self.queue else None
+
+    def receive(self, now: float) -> list[Any]:
+        items = []
+        while self.queue and self.queue[0][0] <= now:
+            items.append(self.queue.popleft()[1])
+        return items
+
+
+class _SimClient:
+    """Mirrors useAudioPlayback: gapless schedule, re-primed 50 ms ahead after running dry."""
+
+    START_LEAD_S = 0.05
+
+    def __init__(self, sample_rate: int):
+        self.sample_rate = sample_rate
+        self.next_play = 0.0
+        self.started = False
+        self.underruns = 0
+        self.underrun_s = 0.0
+        self.peak_buffer_s = 0.0
+
+    def play(self, frame: OutboundFrame, now: float) -> float:
+        if not self.started or self.next_play < now:
+            if self.started and not frame.start:
+                self.underruns += 1
+                self.underrun_s += now + self.START_LEAD_S - self.next_play
+            self.next_play = now + self.START_LEAD_S
+            self.started = True
+        play_at = self.next_play
+        self.next_play += len(frame.data) / 2 / self.sample_rate
+        self.peak_buffer_s = max(self.peak_buffer_s, self.next_play - now)
+        return play_at
+
+
+def _scenario(rng: random.Random, seconds: float, sample_rate: int) -> list[dict[str, Any]]:
+    """Model turns: 1.5-6 s of speech generated at 1.5-4x real time, a quarter barged in on."""
+    turns = []
+    planned = 0.0
+    while planned < seconds:
+        audio_s = rng.uniform(1.5, 6.0)
+        speed = rng.uniform(1.5, 4.0)
+        chunks = []
+        position = at = 0.0
+        while position < audio_s:
+            chunk_s = rng.uniform(0.04, 0.16)
+            at = max(at, position / speed + rng.uniform(0.0, 0.02))
+            chunks.append((at, int(chunk_s * sample_rate) * 2))
+            position += chunk_s
+        barge_in = rng.uniform(0.5, 0.8 * audio_s) if rng.random() < 0.25 else None
+        gap = rng.uniform(0.8, 2.5)
+        turns.append({"chunks": chunks, "barge_in": barge_in, "gap": gap})
+        planned += audio_s + gap
+    return turns
+
+
+def _percentile(values: list[float], q: float) -> float | None:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def _ms(value: float | None) -> float | None:
+    return round(value * 1000, 1) if value is not None else None
+
+
+def _simulate_mode(
+    mode: str,
+    turns: list[dict[str, Any]],
+    seed: int,
+    sample_rate: int,
+    base_s: float,
+    jitter_s: float,
+    spike_rate: float,
+    spike_s: float,
+) -> dict[str, Any]:
+    rng = random.Random(seed)
+    down = _Link(rng, random.Random(seed * 2), base_s, jitter_s, spike_rate, spike_s)
+    up = _Link(rng, random.Random(seed * 2 + 1), base_s, jitter_s, spike_rate, spike_s)
+    stage = OutboundAudioStage(None, sample_rate, paced=mode != "unpaced")
+    client = _SimClient(sample_rate)
+
+    push_offsets: list[int] = []
+    push_turns: list[int] = []
+    pushed = 0
+    turn_first_push: dict[int, float] = {}
+    turn_play_end: dict[int, float] = {}
+    first_audio: list[float] = []
+    send_to_play: list[float] = []
+    now = 0.0
+
+    def deliver(frame: OutboundFrame, sent_at: float):
+        turn = push_turns[bisect.bisect_right(push_offsets, frame.offset) - 1]
+        play_at = client.play(frame, now)
+        send_to_play.append(play_at - sent_at)
+        if turn not in turn_play_end:
+            first_audio.append(play_at - turn_first_push[turn])
+        turn_play_end[turn] = client.next_play
+        if frame.ack:
+            up.send(now, (frame.seq, (client.next_play - now) * 1000, client.underruns))
+
+    def advance(until: float):
+        nonlocal now
+        while True:
+            candidates = [until]
+            if (due := stage.due_in(now)) is not None:
+                candidates.append(now + max(due, 0.0))
+            candidates += [t for t in (down.next_at(), up.next_at()) if t is not None]
+            now = max(now, min(candidates))
+            for frame in stage.poll(now):
+                down.send(now, (frame, now))
+            for frame, sent_at in down.receive(now):
+                deliver(frame, sent_at)
+            for seq, buffered_ms, underruns in up.receive(now):
+                if mode == "adaptive":
+                    stage.on_ack(seq, buffered_ms, underruns, now=now)
+            if now >= until:
+                return
+
+    stale: list[float] = []
+    barged: list[tuple[int, float]] = []
+    for index, turn in enumerate(turns):
+        turn_start = now
+        barge_at = turn_start + turn["barge_in"] if turn["barge_in"] is not None else None
+        for at, size in turn["chunks"]:
+            if barge_at is not None and turn_start + at >= barge_at:
+                break
+            advance(turn_start + at)
+            push_offsets.append(pushed)
+            push_turns.append(index)
+            turn_first_push.setdefault(index, now)
+            pushed += size
+            stage.push(bytes(size), now=now)
+        if barge_at is not None:
+            advance(barge_at)
+            stage.flush()
+            barged.append((index, barge_at))
+            advance(now + turn["gap"])
+        else:
+            while stage.queued_bytes or down.queue:
+                advance(now + 0.05)
+            advance(max(now, client.next_play) + turn["gap"])
+    while stage.queued_bytes or down.queue or up.queue:
+        advance(now + 0.05)
+    for index, barge_at in barged:
+        stale.append(max(0.0, turn_play_end.get(index, barge_at) - barge_at))
+
+    return {
+        "frames": stage._seq,
+        "underruns": client.underruns,
+        "underrun_ms": _ms(client.underrun_s),
+        # Model audio reaching the server -> caller hears a turn's first frame
+        "first_audio_ms": {
+            "mean": _ms(sum(first_audio) / len(first_audio)) if first_audio else None,
+            "p95": _ms(_percentile(first_audio, 0.95)),
+        },
+        # Frame leaves the server -> it plays (network plus client buffer)
+        "send_to_play_ms": {
+            "p50": _ms(_percentile(send_to_play, 0.5)),
+            "p95": _ms(_percentile(send_to_play, 0.95)),
+            "max": _ms(max(send_to_play, default=None)),
+        },
+        "stale_after_barge_in_ms": {
+            "turns": len(stale),
+            "mean": _ms(sum(stale) / len(stale)) if stale else None,
+            "max": _ms(max(stale, default=None)),
+        },
+        "peak_client_buffer_ms": _ms(client.peak_buffer_s),
+        "final_target_ms": _ms(stage.target_s) if stage.paced else None,
+        "srtt_ms": _ms(stage.srtt),
+    }
+
+
+def simulate(
+    seconds: float = 120.0,
+    seed: int = 1,
+    sample_rate: int = 24000,
+    base_ms: float = 40.0,
+    jitter_ms: float = 30.0,
+    spike_rate: float = 0.5,
+    spike_ms: float = 250.0,
+) -> dict[str, Any]:
+    """Run the same model turns through unpaced, fixed-target and adaptive pacing."""
+    turns = _scenario(random.Random(seed), seconds, sample_rate)
+    network = (base_ms / 1000, jitter_ms / 1000, spike_rate, spike_ms / 1000)
+    return {
+        "scenario": {
+            "seconds": seconds, "turns": len(turns), "seed": seed,
+            "base_ms": base_ms, "jitter_ms": jitter_ms,
+            "spike_rate": spike_rate, "spike_ms": spike_ms,
+        },
+        "modes": {
+            mode: _simulate_mode(mode, turns, seed, sample_rate, *network)
+            for mode in ("unpaced", "fixed", "adaptive")
+        },
+    }
+
+
+def main_cli(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Simulate outbound audio pacing over a jittery network")
+    parser.add_argument("command", choices=["simulate"])
+    parser.add_argument("--seconds", type=float, default=120.0, help="simulated conversation length")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--base-ms", type=float, default=40.0, help="one-way network delay")
+    parser.add_argument("--jitter-ms", type=float, default=30.0, help="mean exponential jitter per message")
+    parser.add_argument("--spike-rate", type=float, default=0.5, help="network stalls per second")
+    parser.add_argument("--spike-ms", type=float, default=250.0)
+    args = parser.parse_args(argv)
+    report = simulate(
+        args.seconds, args.seed, base_ms=args.base_ms, jitter_ms=args.jitter_ms,
+        spike_rate=args.spike_rate, spike_ms=args.spike_ms,
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
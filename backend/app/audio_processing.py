@@ -0,0 +1,208 @@
+"""NumPy audio stage: format conversion, resampling and AGC for call audio.
+
+Gemini Live expects 16 kHz mono int16 in and produces 24 kHz mono int16 out.
+Clients that capture or play at other rates (8 kHz phone gateways, 44.1/48 kHz
+browsers) negotiate their format on connect and the conversion happens here.
+Work buffers are kept per pipeline and reused between chunks.
+"""
+
+import logging
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+GEMINI_INPUT_RATE = 16000
+GEMINI_OUTPUT_RATE = 24000
+SUPPORTED_RATES = (8000, 16000, 22050, 24000, 32000, 44100, 48000)
+MAX_CHANNELS = 2
+
+_INT16_SCALE = 1.0 / 32768.0
+
+
+def _grow(buffer: np.ndarray, size: int) -> np.ndarray:
+    """Return `buffer` if it holds `size` items, else a larger replacement."""
+    if buffer.shape[0] >= size:
+        return buffer
+    return np.empty(max(size, buffer.shape[0] * 2), dtype=buffer.dtype)
+
+
+class StreamingResampler:
+    """
+    Chunk-continuous linear-interpolation resampler for mono float32.
+    Downsampling applies a windowed-sinc low-pass first to avoid aliasing.
+    Phase and filter history carry across chunks so chunk boundaries are seamless.
+    """
+
+    def __init__(self, in_rate: int, out_rate: int, taps: int = 31):
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.passthrough = in_rate == out_rate
+        self.step = in_rate / out_rate
+
+        self._fir = None
+        if out_rate < in_rate:
+            cutoff = 0.45 * out_rate / in_rate
+            n = np.arange(taps) - (taps - 1) / 2
+            fir = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(taps)
+            self._fir = (fir / fir.sum()).astype(np.float32)
+        self._history = np.zeros(taps - 1, dtype=np.float32)
+
+        self._pos = 0.0  # next output position, in input samples, relative to _src[0]
+        self._src = np.zeros(1, dtype=np.float32)  # [last sample of prev chunk, chunk...]
+        self._ext = np.zeros(0, dtype=np.float32)
+        self._grid = np.arange(1, dtype=np.float64)
+        self._steps = np.arange(1, dtype=np.float64)
+
+    def process(self, x: np.ndarray) -> np.ndarray:
+        if self.passthrough:
+            return x
+        n = x.shape[0]
+        if n == 0:
+            return x[:0]
+
+        if self._fir is not None:
+            h = self._history.shape[0]
+            self._ext = _grow(self._ext, h + n)
+            ext = self._ext[:h + n]
+            ext[:h] = self._history
+            ext[h:] = x
+            x = np.convolve(ext, self._fir, mode="valid")
+            self._history[:] = ext[n:]
+
+        last = self._src[0]  # carried over from the previous chunk; a regrown buffer starts uninitialized
+        self._src = _grow(self._src, n + 1)
+        src = self._src[:n + 1]
+        src[0] = last
+        src[1:] = x
+        if self._grid.shape[0] < n + 1:
+            self._grid = np.arange(max(n + 1, self._grid.shape[0] * 2), dtype=np.float64)
+
+        count = int((n - self._pos) // self.step) + 1 if self._pos <= n else 0
+        if self._steps.shape[0] < count:
+            self._steps = np.arange(max(count, self._steps.shape[0] * 2), dtype=np.float64)
+        positions = self._steps[:count] * self.step
+        positions += self._pos
+        out = np.interp(positions, self._grid[:n + 1], src).astype(np.float32)
+
+        self._pos = self._pos + count * self.step - n
+        src[0] = src[n]
+        return out
+
+
+class PeakNormalizer:
+    """
+    Simple AGC: steers a smoothed gain so chunk peaks approach `target`.
+    Gain changes are ramped across the chunk; silence below `noise_floor`
+    holds the current gain instead of boosting noise.
+    """
+
+    def __init__(
+        self,
+        target: float = 0.7,
+        max_gain: float = 8.0,
+        noise_floor: float = 0.01,
+        attack: float = 0.6,
+        release: float = 0.05,
+    ):
+        self.target = target
+        self.max_gain = max_gain
+        self.noise_floor = noise_floor
+        self.attack = attack
+        self.release = release
+        self.gain = 1.0
+        self._ramp = np.zeros(0, dtype=np.float32)
+        self._gains = np.zeros(0, dtype=np.float32)
+
+    def process(self, x: np.ndarray) -> np.ndarray:
+        """Normalize `x` in place and return it."""
+        n = x.shape[0]
+        if n == 0:
+            return x
+        peak = max(float(x.max()), -float(x.min()))
+        desired = self.gain
+        if peak > self.noise_floor:
+            desired = min(self.max_gain, self.target / peak)
+        rate = self.attack if desired < self.gain else self.release
+        new_gain = self.gain + rate * (desired - self.gain)
+        if peak * new_gain > 1.0:
+            new_gain = 1.0 / peak
+
+        # A loud onset after quiet audio must not ramp down through clipping
+        start_gain = min(self.gain, 1.0 / peak) if peak > 0 else self.gain
+
+        if self._ramp.shape[0] != n:
+            self._ramp = np.linspace(0.0, 1.0, n, dtype=np.float32)
+            self._gains = np.empty(n, dtype=np.float32)
+        np.multiply(self._ramp, new_gain - start_gain, out=self._gains)
+        self._gains += start_gain
+        x *= self._gains
+        self.gain = new_gain
+        return x
+
+
+class AudioPipeline:
+    """
+    int16 PCM at (`in_rate`, `channels`) -> mono int16 PCM at `out_rate`,
+    with optional AGC. Matching formats without AGC pass bytes through untouched.
+    `cpu_seconds` accumulates processing time for per-call cost reporting.
+    A chunk that ends mid-frame (odd byte, or one channel of a stereo frame)
+    keeps the partial frame for the next chunk, like the resampler keeps its tail.
+    """
+
+    def __init__(self, in_rate: int, out_rate: int, channels: int = 1, agc: bool = False):
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.channels = channels
+        self.passthrough = in_rate == out_rate and channels == 1 and not agc
+        self.resampler = StreamingResampler(in_rate, out_rate)
+        self.normalizer = PeakNormalizer() if agc else None
+        self.cpu_seconds = 0.0
+        self._work = np.zeros(0, dtype=np.float32)
+        self._out = np.zeros(0, dtype=np.int16)
+        self._carry = b""  # Partial frame from the previous chunk
+
+    def process(self, pcm: bytes) -> bytes:
+        if self.passthrough:
+            return pcm
+        start = time.thread_time()
+
+        if self._carry:
+            pcm = self._carry + pcm
+        frame_bytes = 2 * self.channels
+        frames = len(pcm) // frame_bytes
+        self._carry = pcm[frames * frame_bytes:]
+        samples = np.frombuffer(pcm, dtype=np.int16, count=frames * self.channels)
+        self._work = _grow(self._work, frames)
+        work = self._work[:frames]
+        if self.channels > 1:
+            interleaved = samples.reshape(frames, self.channels)
+            np.sum(interleaved, axis=1, dtype=np.float32, out=work)
+            work *= _INT16_SCALE / self.channels
+        else:
+            np.multiply(samples, _INT16_SCALE, out=work, casting="unsafe")
+
+        y = self.resampler.process(work)
+        if self.normalizer is not None:
+            self.normalizer.process(y)
+
+        np.clip(y, -1.0, 32767 / 32768, out=y)
+        self._out = _grow(self._out, y.shape[0])
+        out = self._out[:y.shape[0]]
+        np.multiply(y, 32768.0, out=out, casting="unsafe")
+
+        self.cpu_seconds += time.thread_time() - start
+        return out.tobytes()
+
+
+def negotiate_format(sample_rate: int, channels: int, output_rate: int) -> tuple[int, int, int]:
+    """Clamp a client's requested audio format to what the pipeline supports."""
+    if sample_rate not in SUPPORTED_RATES:
+        logger.warning(f"Unsupported input rate {sample_rate}, using {GEMINI_INPUT_RATE}")
+        sample_rate = GEMINI_INPUT_RATE
+    if output_rate not in SUPPORTED_RATES:
+        logger.warning(f"Unsupported output rate {output_rate}, using {GEMINI_OUTPUT_RATE}")
+        output_rate = GEMINI_OUTPUT_RATE
+    channels = min(max(1, channels), MAX_CHANNELS)
+    return sample_rate, channels, output_rate
@@ -0,0 +1,299 @@
+"""Batched call-log pipeline: structured call events -> on-disk spool -> bulk exporter.
+
+Events (call start/end, tool outcomes, access granted, check-in) are buffered
+in memory and flushed to an append-only spool segment when the buffer reaches
+CALL_LOG_FLUSH_SIZE or every CALL_LOG_FLUSH_INTERVAL seconds. Every
+CALL_LOG_EXPORT_INTERVAL seconds the current segment is sealed and sealed
+segments are handed to the exporter in one batch each; exported segments are
+moved to the local archive.
+
+Several workers can share CALL_LOG_DIR. Each writes only its own segment
+(named after its pid) and seals it by renaming. Exporting starts with an
+atomic rename of a sealed segment into exporting/<pid>/, so only one worker
+ever exports a given segment, and segments still being written are never
+read. On start, segments left open or claimed by a process that is gone
+(or by an earlier run with the same pid) are sealed or put back in pending.
+
+    <CALL_LOG_DIR>/pending/<ts>-<pid>.open     being written by <pid>
+    <CALL_LOG_DIR>/pending/<ts>-<pid>.jsonl    sealed, not yet exported
+    <CALL_LOG_DIR>/exporting/<pid>/...jsonl    claimed by <pid>
+    <CALL_LOG_DIR>/exported/<segment>.jsonl    local store of exported events
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any
+
+import httpx
+
+from .config import (
+    CALL_LOG_DIR, CALL_LOG_FLUSH_SIZE, CALL_LOG_FLUSH_INTERVAL, CALL_LOG_MAX_BUFFER,
+    CALL_LOG_EXPORTER, CALL_LOG_EXPORT_URL, CALL_LOG_EXPORT_INTERVAL, N8N_AUTH_TOKEN
+)
+
+logger = logging.getLogger(__name__)
+
+
+class CallLogExporter:
+    """Bulk exporter interface. `export` must raise if the batch was not delivered."""
+
+    async def export(self, events: list[dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class LocalOnlyExporter(CallLogExporter):
+    """Keeps events in the local archive only."""
+
+    async def export(self, events: list[dict[str, Any]]) -> None:
+        return None
+
+
+class WebhookExporter(CallLogExporter):
+    """
+    POSTs a whole batch as {"events": [...]} to a webhook, e.g. an n8n
+    workflow that appends all rows to the LOG sheet in one Sheets call.
+    """
+
+    def __init__(self, url: str = CALL_LOG_EXPORT_URL, auth_token: str = N8N_AUTH_TOKEN):
+        if not url:
+            # Would spool forever and retry every interval without ever delivering
+            raise ValueError("CALL_LOG_EXPORTER=webhook requires CALL_LOG_EXPORT_URL")
+        self.url = url
+        self.auth_token = auth_token
+        self._client: httpx.AsyncClient | None = None
+
+    async def export(self, events: list[dict[str, Any]]) -> None:
+        if self._client is None:
+            headers = {"Authorization": self.auth_token} if self.auth_token else {}
+            self._client = httpx.AsyncClient(timeout=30.0, headers=headers)
+        response = await self._client.post(self.url, json={"events": events})
+        response.raise_for_status()
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+EXPORTERS = {
+    "none": LocalOnlyExporter,
+    "webhook": WebhookExporter,
+}
+
+OPEN_SUFFIX = ".open"
+SEALED_SUFFIX = ".jsonl"
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == "nt":
+        return True  # os.kill(pid, 0) would terminate the process on Windows
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _segment_owner(name: str) -> str:
+    """"<ts>-<owner>.open" / "<ts>-<owner>.jsonl" -> owner ("" for pre-owner segment names)."""
+    stem = name.rsplit(".", 1)[0]
+    return stem.split("-", 1)[1] if "-" in stem else ""
+
+
+class CallLog:
+    """Buffered structured call-event log. `log_event` never blocks or does I/O."""
+
+    def __init__(
+        self,
+        directory: str = CALL_LOG_DIR,
+        exporter: CallLogExporter | None = None,
+        flush_size: int = CALL_LOG_FLUSH_SIZE,
+        flush_interval: float = CALL_LOG_FLUSH_INTERVAL,
+        max_buffer: int = CALL_LOG_MAX_BUFFER,
+        export_interval: float = CALL_LOG_EXPORT_INTERVAL,
+        owner: str | None = None,
+    ):
+        self.owner = owner or str(os.getpid())
+        self.pending_dir = os.path.join(directory, "pending")
+        self.exporting_root = os.path.join(directory, "exporting")
+        self.exporting_dir = os.path.join(self.exporting_root, self.owner)
+        self.exported_dir = os.path.join(directory, "exported")
+        self.exporter = exporter or EXPORTERS.get(CALL_LOG_EXPORTER, LocalOnlyExporter)()
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.export_interval = export_interval
+
+        self.dropped = 0
+        self.exported = 0
+        self._buffer: list[dict[str, Any]] = []
+        self._segment: str | None = None
+        self._flush_wanted = asyncio.Event()
+        self._io_lock = asyncio.Lock()
+        self._tasks: list[asyncio.Task] = []
+
+    def log_event(self, event: str, call_id: str | None = None, **fields: Any):
+        """Record a structured call event (call_start, call_end, tool_result, ...)."""
+        if len(self._buffer) >= self.max_buffer:
+            self.dropped += 1
+            return
+        self._buffer.append({"ts": time.time(), "event": event, "call_id": call_id, **fields})
+        if len(self._buffer) >= self.flush_size:
+            self._flush_wanted.set()
+
+    def start(self):
+        if self._tasks:
+            return
+        self._recover()
+        self._tasks = [
+            asyncio.create_task(self._flush_loop()),
+            asyncio.create_task(self._export_loop()),
+        ]
+        logger.info(f"Call log started (exporter: {type(self.exporter).__name__})")
+
+    # --- spool -------------------------------------------------------------
+
+    def _new_segment(self) -> str:
+        return os.path.join(self.pending_dir, f"{time.time_ns()}-{self.owner}{OPEN_SUFFIX}")
+
+    @staticmethod
+    def _sealed_name(segment: str) -> str:
+        return segment[: -len(OPEN_SUFFIX)] + SEALED_SUFFIX
+
+    def _is_orphan(self, owner: str) -> bool:
+        """Files of `owner` nobody will finish: ours from an earlier run, or a dead pid's."""
+        if owner == self.owner:
+            return True
+        return owner.isdigit() and not _pid_alive(int(owner))
+
+    def _recover(self):
+        """Seal abandoned open segments and release abandoned claims (call before writing)."""
+        if os.path.isdir(self.pending_dir):
+            for name in os.listdir(self.pending_dir):
+                if name.endswith(OPEN_SUFFIX) and self._is_orphan(_segment_owner(name)):
+                    segment = os.path.join(self.pending_dir, name)
+                    os.replace(segment, self._sealed_name(segment))
+        if os.path.isdir(self.exporting_root):
+            for owner in os.listdir(self.exporting_root):
+                claimed = os.path.join(self.exporting_root, owner)
+                if not self._is_orphan(owner):
+                    continue
+                os.makedirs(self.pending_dir, exist_ok=True)
+                for name in os.listdir(claimed):
+                    os.replace(os.path.join(claimed, name), os.path.join(self.pending_dir, name))
+
+    def _append(self, segment: str, events: list[dict[str, Any]]):
+        os.makedirs(self.pending_dir, exist_ok=True)
+        with open(segment, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(e, ensure_ascii=False, default=str) + "\n" for e in events))
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def flush(self):
+        """Write buffered events to the current spool segment."""
+        if not self._buffer:
+            return
+        events, self._buffer = self._buffer, []
+        async with self._io_lock:
+            if self._segment is None:
+                self._segment = self._new_segment()
+            try:
+                await asyncio.to_thread(self._append, self._segment, events)
+            except Exception as e:
+                logger.error(f"Call log spool write failed ({len(events)} events): {e}")
+                self._buffer = events + self._buffer
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_wanted.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_wanted.clear()
+            await self.flush()
+
+    # --- export ------------------------------------------------------------
+
+    def _seal(self, segment: str):
+        if os.path.exists(segment):
+            os.replace(segment, self._sealed_name(segment))
+
+    def _claim_sealed(self) -> list[str]:
+        """Move every sealed segment into this worker's exporting dir; returns the ones it won."""
+        claimed = []
+        if os.path.isdir(self.exporting_dir):
+            # Left from a failed export this run
+            claimed += [os.path.join(self.exporting_dir, n) for n in os.listdir(self.exporting_dir)]
+        if os.path.isdir(self.pending_dir):
+            os.makedirs(self.exporting_dir, exist_ok=True)
+            for name in os.listdir(self.pending_dir):
+                if not name.endswith(SEALED_SUFFIX):
+                    continue
+                target = os.path.join(self.exporting_dir, name)
+                try:
+                    os.rename(os.path.join(self.pending_dir, name), target)
+                except FileNotFoundError:
+                    continue  # another worker claimed it first
+                claimed.append(target)
+        return sorted(claimed, key=os.path.basename)
+
+    @staticmethod
+    def _read_segment(segment: str) -> list[dict[str, Any]]:
+        events = []
+        with open(segment, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    events.append(json.loads(line))
+                except json.JSONDecodeError:
+                    pass  # torn last line after a crash
+        return events
+
+    def _archive(self, segment: str):
+        os.makedirs(self.exported_dir, exist_ok=True)
+        os.replace(segment, os.path.join(self.exported_dir, os.path.basename(segment)))
+
+    async def export_pending(self):
+        """Seal the current segment, claim sealed segments and export them in order."""
+        await self.flush()
+        async with self._io_lock:
+            if self._segment is not None:
+                await asyncio.to_thread(self._seal, self._segment)
+            self._segment = None  # next flush starts a new segment
+            segments = await asyncio.to_thread(self._claim_sealed)
+        for segment in segments:
+            events = await asyncio.to_thread(self._read_segment, segment)
+            if events:
+                try:
+                    await self.exporter.export(events)
+                except Exception as e:
+                    logger.warning(f"Call log export failed, will retry: {e}")
+                    return
+            await asyncio.to_thread(self._archive, segment)
+            self.exported += len(events)
+
+    async def _export_loop(self):
+        # Exports spool left over from a previous run first
+        while True:
+            await self.export_pending()
+            await asyncio.sleep(self.export_interval)
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.export_pending()
+        await self.exporter.close()
+        logger.info(f"Call log closed (exported={self.exported}, dropped={self.dropped})")
+
+
+# Global instance
+call_log = CallLog()
@@ -0,0 +1,277 @@
+"""Registry of live calls and graceful drain for zero-downtime deploys."""
+
+import asyncio
+import logging
+import time
+from typing import Any
+
+from fastapi import WebSocket
+
+from .config import DRAIN_TIMEOUT, DRAIN_NOTICE_SECONDS, CLIENT_DEAD_AFTER, REAPER_INTERVAL, get_idle_policy
+from .memory_stats import CallMemory
+
+logger = logging.getLogger(__name__)
+
+# Spoken notice injected into the Live session shortly before a drain deadline
+DRAIN_PROMPT = (
+    "[SYSTEM] Sistem akan segera menjalani pemeliharaan. Sampaikan dengan sopan "
+    "kepada penelepon bahwa panggilan akan berakhir dalam beberapa detik, mohon maaf "
+    "atas ketidaknyamanannya, dan persilakan menghubungi kembali sebentar lagi."
+)
+DRAIN_NOTICE_MESSAGE = "Sistem sedang pemeliharaan. Panggilan akan berakhir sebentar lagi."
+
+# Injected when the caller has been silent for the persona's idle_prompt_after
+IDLE_PROMPT = (
+    "[SYSTEM] Penelepon sudah lama tidak berbicara. Tanyakan dengan singkat dan "
+    "ramah apakah penelepon masih di sana."
+)
+IDLE_NOTICE_MESSAGE = "Panggilan diakhiri karena tidak ada aktivitas."
+
+
+class ActiveCall:
+    """Handle the registry keeps for one live /ws/call."""
+
+    def __init__(
+        self,
+        call_id: str,
+        persona: str,
+        websocket: WebSocket,
+        stop_event: asyncio.Event,
+        tenant_id: str = "default",
+    ):
+        self.call_id = call_id
+        self.persona = persona
+        self.tenant_id = tenant_id
+        self.websocket = websocket
+        self.stop_event = stop_event
+        self.session = None  # Gemini Live session, set once connected
+        self.started_at = time.monotonic()
+        self.end_reason: str | None = None  # set when the server ends the call
+        self.memory = CallMemory()
+
+        # Activity (monotonic seconds) used by the idle reaper
+        self.last_client_frame = self.started_at
+        self.last_voiced_input = self.started_at
+        self.last_gemini_output = self.started_at
+        self.idle_prompted_at: float | None = None
+
+    def mark_client_frame(self):
+        self.last_client_frame = time.monotonic()
+
+    def mark_voiced_input(self):
+        self.last_voiced_input = time.monotonic()
+
+    def mark_gemini_output(self):
+        self.last_gemini_output = time.monotonic()
+
+    def idle_seconds(self, now: float) -> float:
+        """Seconds since either side last said anything."""
+        return now - max(self.last_voiced_input, self.last_gemini_output)
+
+    async def notify_shutdown(self, seconds: float):
+        """Tell the caller (on screen and through the model) that the call will end."""
+        try:
+            await self.websocket.send_json({
+                "type": "notice",
+                "reason": "shutdown",
+                "message": DRAIN_NOTICE_MESSAGE,
+                "seconds": round(seconds)
+            })
+            if self.session is not None:
+                await self.session.send(input=DRAIN_PROMPT, end_of_turn=True)
+        except Exception as e:
+            logger.warning(f"Drain notice failed for call {self.call_id}: {e}")
+
+    async def prompt_idle(self):
+        """Have the model ask whether the caller is still there."""
+        if self.session is not None:
+            try:
+                await self.session.send(input=IDLE_PROMPT, end_of_turn=True)
+            except Exception as e:
+                logger.warning(f"Idle prompt failed for call {self.call_id}: {e}")
+
+    async def notify_idle_hangup(self):
+        # The socket may be half-open; don't let a stuck send hold the reaper
+        try:
+            await asyncio.wait_for(self.websocket.send_json({
+                "type": "notice",
+                "reason": "idle",
+                "message": IDLE_NOTICE_MESSAGE
+            }), timeout=1.0)
+        except Exception:
+            pass
+
+    def hang_up(self, reason: str = "drain"):
+        if self.end_reason is None:
+            self.end_reason = reason
+        self.stop_event.set()
+
+
+class CallRegistry:
+    """Tracks live calls; drains them (stop new calls, let active ones finish) on demand."""
+
+    def __init__(self):
+        self.calls: dict[str, ActiveCall] = {}
+        self.draining = False
+        self.drain_started_at: float | None = None
+        self._empty = asyncio.Event()
+        self._empty.set()
+        self._drain_task: asyncio.Task | None = None
+        self.reaper_stats = {
+            "idle_prompts": 0,
+            "idle_recovered": 0,
+            "idle_hangups": 0,
+            "abandoned_hangups": 0,
+            "reclaimed_idle_s": 0.0,
+        }
+
+    def register(self, call: ActiveCall):
+        self.calls[call.call_id] = call
+        self._empty.clear()
+
+    def unregister(self, call_id: str):
+        self.calls.pop(call_id, None)
+        if not self.calls:
+            self._empty.set()
+
+    def count_by_tenant(self) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for call in self.calls.values():
+            counts[call.tenant_id] = counts.get(call.tenant_id, 0) + 1
+        return counts
+
+    async def _wait_empty(self, timeout: float) -> bool:
+        if timeout <= 0:
+            return not self.calls
+        try:
+            await asyncio.wait_for(self._empty.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def start_drain(
+        self,
+        timeout: float = DRAIN_TIMEOUT,
+        notice_seconds: float = DRAIN_NOTICE_SECONDS,
+    ) -> asyncio.Task:
+        """Begin draining (idempotent). The returned task finishes when no calls remain."""
+        if self._drain_task is None:
+            self.draining = True
+            self.drain_started_at = time.monotonic()
+            logger.warning(f"Draining: {len(self.calls)} active calls, timeout {timeout:.0f}s")
+            self._drain_task = asyncio.create_task(self._drain(timeout, notice_seconds))
+        return self._drain_task
+
+    async def _drain(self, timeout: float, notice_seconds: float):
+        deadline = time.monotonic() + timeout
+        if not await self._wait_empty(deadline - notice_seconds - time.monotonic()):
+            remaining = max(0.0, deadline - time.monotonic())
+            logger.warning(f"Drain notice to {len(self.calls)} calls, closing in {remaining:.0f}s")
+            # A stalled session must not push the hang-up past the deadline
+            await asyncio.gather(
+                *(asyncio.wait_for(call.notify_shutdown(remaining), remaining) for call in list(self.calls.values())),
+                return_exceptions=True
+            )
+            if not await self._wait_empty(deadline - time.monotonic()):
+                logger.warning(f"Drain deadline reached, hanging up {len(self.calls)} calls")
+                for call in list(self.calls.values()):
+                    call.hang_up()
+                await self._wait_empty(5.0)
+        logger.warning("Drain complete")
+
+    # --- idle / abandoned-call reaper ----------------------------------------
+
+    async def reap_once(
+        self,
+        now: float | None = None,
+        dead_after: float = CLIENT_DEAD_AFTER,
+        action_timeout: float = 5.0,
+    ):
+        """Prompt idle callers and hang up idle or abandoned calls."""
+        now = time.monotonic() if now is None else now
+        actions = []
+        for call in list(self.calls.values()):
+            if call.stop_event.is_set():
+                continue
+            silent_client = now - call.last_client_frame
+            if dead_after > 0 and silent_client >= dead_after:
+                # No frames at all: frozen tab or half-open socket
+                logger.warning(f"Reaping abandoned call {call.call_id}: no client frames for {silent_client:.0f}s")
+                self.reaper_stats["abandoned_hangups"] += 1
+                self.reaper_stats["reclaimed_idle_s"] += silent_client
+                call.hang_up("abandoned")
+                continue
+
+            policy = get_idle_policy(call.persona)
+            if call.idle_prompted_at is not None:
+                if call.last_voiced_input > call.idle_prompted_at:
+                    call.idle_prompted_at = None
+                    self.reaper_stats["idle_recovered"] += 1
+                elif now - call.idle_prompted_at >= policy["hangup_after"]:
+                    idle = now - call.last_voiced_input
+                    logger.warning(f"Reaping idle call {call.call_id}: caller silent for {idle:.0f}s")
+                    self.reaper_stats["idle_hangups"] += 1
+                    self.reaper_stats["reclaimed_idle_s"] += idle
+                    actions.append((call, self._hang_up_idle(call)))
+            elif policy["prompt_after"] > 0 and call.idle_seconds(now) >= policy["prompt_after"]:
+                logger.info("Call %s idle for %.0fs, prompting caller", call.call_id, call.idle_seconds(now))
+                self.reaper_stats["idle_prompts"] += 1
+                call.idle_prompted_at = now
+                actions.append((call, call.prompt_idle()))
+
+        # Sends run concurrently and time out, so one stalled session can't hold up the sweep
+        results = await asyncio.gather(
+            *(asyncio.wait_for(action, action_timeout) for _, action in actions),
+            return_exceptions=True
+        )
+        for (call, _), result in zip(actions, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"Reaper action for call {call.call_id} failed: {result!r}")
+
+    @staticmethod
+    async def _hang_up_idle(call: ActiveCall):
+        try:
+            await call.notify_idle_hangup()
+        finally:
+            call.hang_up("idle")
+
+    async def run_reaper(self, interval: float = REAPER_INTERVAL):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reap_once()
+            except Exception as e:
+                logger.error(f"Call reaper error: {e}")
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "draining": self.draining,
+            "active_calls": len(self.calls),
+            "drain_elapsed_s": (
+                round(time.monotonic() - self.drain_started_at, 1)
+                if self.drain_started_at is not None else None
+            ),
+            "drain_complete": bool(self._drain_task and self._drain_task.done()),
+            "reaper": {**self.reaper_stats, "reclaimed_idle_s": round(self.reaper_stats["reclaimed_idle_s"], 1)},
+        }
+
+    def describe_calls(self) -> list[dict[str, Any]]:
+        now = time.monotonic()
+        return [
+            {
+                "call_id": call.call_id,
+                "tenant": call.tenant_id,
+                "persona": call.persona,
+                "duration_s": round(now - call.started_at, 1),
+                "since_client_frame_s": round(now - call.last_client_frame, 1),
+                "since_voiced_input_s": round(now - call.last_voiced_input, 1),
+                "since_gemini_output_s": round(now - call.last_gemini_output, 1),
+                "idle_prompted": call.idle_prompted_at is not None,
+                "memory": call.memory.summary(),
+            }
+            for call in self.calls.values()
+        ]
+
+
+# Global instance
+call_registry = CallRegistry()
@@ -1,5 +1,6 @@
 """Configuration module for AI Receptionist backend."""
 
+import json
 import os
 from dotenv import load_dotenv
 
@@ -10,6 +11,105 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 N8N_MCP_URL = os.getenv("N8N_MCP_URL", "")
 N8N_AUTH_TOKEN = os.getenv("N8N_AUTH_TOKEN", "")
 
+# MCP session management
+MCP_POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", "1"))  # Parallel MCP sessions to n8n
+MCP_KEEPALIVE_INTERVAL = float(os.getenv("MCP_KEEPALIVE_INTERVAL", "0"))  # Seconds between pings, 0 = off
+MCP_INIT_MAX_BACKOFF = float(os.getenv("MCP_INIT_MAX_BACKOFF", "60"))  # Max seconds between startup retries
+
+# Speculative lookups started from the caller's live transcription (e.g. a dictated email)
+TOOL_PREFETCH = os.getenv("TOOL_PREFETCH", "true").lower() == "true"
+TOOL_PREFETCH_MAX = int(os.getenv("TOOL_PREFETCH_MAX", "3"))  # Prefetches per call
+
+# Daily arrival roster for the kiosk persona (see app/roster.py)
+ROSTER_WORKFLOW_ID = os.getenv("ROSTER_WORKFLOW_ID", "")  # n8n workflow listing a day's bookings; unset = off
+ROSTER_REFRESH_INTERVAL = float(os.getenv("ROSTER_REFRESH_INTERVAL", "60"))  # Seconds between reloads
+ROSTER_EARLY_MINUTES = int(os.getenv("ROSTER_EARLY_MINUTES", "30"))  # Earlier than this before start = early
+ROSTER_LATE_MINUTES = int(os.getenv("ROSTER_LATE_MINUTES", "15"))  # Later than this after start = late
+
+# Inbound audio (client mic -> Gemini realtime input)
+AUDIO_INPUT_FRAME_MS = int(os.getenv("AUDIO_INPUT_FRAME_MS", "40"))  # Frame size sent to Gemini
+AUDIO_INPUT_BACKLOG_MS = int(os.getenv("AUDIO_INPUT_BACKLOG_MS", "200"))  # Coalesce sends above this backlog
+AUDIO_INPUT_MAX_BACKLOG_MS = int(os.getenv("AUDIO_INPUT_MAX_BACKLOG_MS", "2000"))  # Drop oldest audio above this
+AUDIO_VOICE_THRESHOLD = int(os.getenv("AUDIO_VOICE_THRESHOLD", "1000"))  # int16 peak treated as speech
+AUDIO_INPUT_AGC = os.getenv("AUDIO_INPUT_AGC", "false").lower() == "true"  # Peak-normalize mic audio
+
+# Outbound audio (Gemini -> client speaker)
+AUDIO_OUTPUT_PACING = os.getenv("AUDIO_OUTPUT_PACING", "true").lower() == "true"  # Release at playback rate
+AUDIO_OUTPUT_FRAME_MS = int(os.getenv("AUDIO_OUTPUT_FRAME_MS", "20"))  # Fixed frame size sent to the client
+AUDIO_OUTPUT_TARGET_MS = int(os.getenv("AUDIO_OUTPUT_TARGET_MS", "120"))  # Lead ahead of playback until RTT is measured
+AUDIO_OUTPUT_MIN_MS = int(os.getenv("AUDIO_OUTPUT_MIN_MS", "60"))  # Adaptive lead bounds
+AUDIO_OUTPUT_MAX_MS = int(os.getenv("AUDIO_OUTPUT_MAX_MS", "500"))
+AUDIO_OUTPUT_ACK_EVERY = int(os.getenv("AUDIO_OUTPUT_ACK_EVERY", "5"))  # Frames between client playback acks
+
+# Logging
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_MODE = os.getenv("LOG_MODE", "sync").lower()  # "sync" or "async" (queue + listener thread)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()  # "text" or "json"
+LOG_HOT_PATH_RATE = int(os.getenv("LOG_HOT_PATH_RATE", "0"))  # INFO records/s per message template, 0 = off
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0"))  # Event-loop lag probe period (s), 0 = off
+
+# Local data (transcripts, logs) written by the backend
+DATA_DIR = os.getenv("DATA_DIR", "data")
+
+# Shared state across uvicorn workers: "memory" (per process), "sqlite" or "redis"
+STATE_BACKEND = os.getenv("STATE_BACKEND", "memory").lower()
+STATE_PATH = os.getenv("STATE_PATH", os.path.join(DATA_DIR, "shared_state.db"))
+STATE_URL = os.getenv("STATE_URL", "redis://127.0.0.1:6380/0")  # Redis or `python -m app.shared_state serve`
+TOOL_CACHE_TTL = float(os.getenv("TOOL_CACHE_TTL", "0"))  # Seconds lookup results stay cached, 0 = off (opt-in)
+TOOL_CACHE_WAIT = float(os.getenv("TOOL_CACHE_WAIT", "10"))  # Max seconds to wait on another worker's lookup
+
+# Call transcripts: "jsonl", "sqlite" or "off"
+TRANSCRIPT_SINK = os.getenv("TRANSCRIPT_SINK", "jsonl").lower()
+TRANSCRIPT_PATH = os.getenv(
+    "TRANSCRIPT_PATH",
+    os.path.join(DATA_DIR, "transcripts.db" if TRANSCRIPT_SINK == "sqlite" else "transcripts.jsonl")
+)
+TRANSCRIPT_BATCH_SIZE = int(os.getenv("TRANSCRIPT_BATCH_SIZE", "50"))  # Records per write
+TRANSCRIPT_FLUSH_INTERVAL = float(os.getenv("TRANSCRIPT_FLUSH_INTERVAL", "2.0"))  # Max seconds a batch waits
+TRANSCRIPT_MAX_PENDING = int(os.getenv("TRANSCRIPT_MAX_PENDING", "5000"))  # Queue bound before dropping
+
+# Call-log pipeline (buffered events -> on-disk spool -> batched export)
+CALL_LOG_DIR = os.getenv("CALL_LOG_DIR", os.path.join(DATA_DIR, "call_log"))
+CALL_LOG_FLUSH_SIZE = int(os.getenv("CALL_LOG_FLUSH_SIZE", "100"))  # Events that trigger a spool flush
+CALL_LOG_FLUSH_INTERVAL = float(os.getenv("CALL_LOG_FLUSH_INTERVAL", "1.0"))  # Max seconds between flushes
+CALL_LOG_MAX_BUFFER = int(os.getenv("CALL_LOG_MAX_BUFFER", "10000"))  # In-memory bound before dropping
+CALL_LOG_EXPORTER = os.getenv("CALL_LOG_EXPORTER", "none").lower()  # "none" or "webhook"
+CALL_LOG_EXPORT_URL = os.getenv("CALL_LOG_EXPORT_URL", "")  # Webhook receiving {"events": [...]}
+CALL_LOG_EXPORT_INTERVAL = float(os.getenv("CALL_LOG_EXPORT_INTERVAL", "60"))  # Seconds between bulk exports
+
+# Opt-in call recording for record/replay regression fixtures
+CALL_RECORDING = os.getenv("CALL_RECORDING", "false").lower() == "true"
+CALL_RECORD_DIR = os.getenv("CALL_RECORD_DIR", os.path.join(DATA_DIR, "recordings"))
+
+# Graceful drain (zero-downtime deploys)
+DRAIN_TIMEOUT = float(os.getenv("DRAIN_TIMEOUT", "300"))  # Max seconds active calls may continue
+DRAIN_NOTICE_SECONDS = float(os.getenv("DRAIN_NOTICE_SECONDS", "20"))  # Warn callers this long before the deadline
+DRAIN_ON_SIGTERM = os.getenv("DRAIN_ON_SIGTERM", "true").lower() == "true"
+
+# Memory diagnostics: trace allocations from startup with this many frames (0 = off,
+# tracing can still be started via POST /admin/memory/tracemalloc)
+TRACEMALLOC_FRAMES = int(os.getenv("TRACEMALLOC_FRAMES", "0"))
+
+# Multi-tenant registry (JSON, see app/tenants.py); unset = single default venue
+TENANTS_FILE = os.getenv("TENANTS_FILE", "")
+TENANT_MAX_CALLS = int(os.getenv("TENANT_MAX_CALLS", "0"))  # Default per-tenant concurrent calls, 0 = unlimited
+
+# Idle / abandoned-call reaper
+REAPER_INTERVAL = float(os.getenv("REAPER_INTERVAL", "5"))  # Seconds between sweeps, 0 = off
+CLIENT_DEAD_AFTER = float(os.getenv("CLIENT_DEAD_AFTER", "30"))  # Hang up when no client frames arrive this long
+IDLE_PROMPT_AFTER = float(os.getenv("IDLE_PROMPT_AFTER", "45"))  # Silence before "are you still there?", 0 = never
+IDLE_HANGUP_AFTER = float(os.getenv("IDLE_HANGUP_AFTER", "20"))  # Hang up if still silent this long after the prompt
+
+# Per-persona overrides, e.g. IDLE_POLICY='{"reza": {"prompt_after": 20, "hangup_after": 10}}'
+IDLE_POLICIES = {
+    "reza": {"prompt_after": 25, "hangup_after": 15},  # Lobby kiosk: visitors often walk away
+}
+for _persona, _policy in json.loads(os.getenv("IDLE_POLICY", "{}")).items():
+    IDLE_POLICIES.setdefault(_persona.lower(), {}).update(_policy)
+
+# Admin endpoints (/admin/*); without a token only loopback clients are allowed
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
 # Gemini Model Configuration - using Live API compatible model
 GEMINI_MODEL = "gemini-2.5-flash-native-audio-preview-12-2025"
 
@@ -83,14 +183,16 @@ Ikuti alur ini langkah demi langkah. JANGAN melompat.
 
 1. **Identifikasi Awal**
    - Sapa tamu: "Selamat datang di Caliana. Boleh dibantu dengan nama atau email reservasinya?"
-   - **Action**: Panggil `lookup_appointment` dengan email/nama tamu.
+   - **Action**: Panggil `verify_arrival` dengan email dan/atau nama tamu.
+   - Jika hasilnya `ambiguous` atau meminta email, tanyakan email reservasi lalu panggil lagi.
 
 2. **Cek Validitas & Waktu (CRITICAL)**
    - **JIKA Tidak Tersedia / Tidak Ada Data**:
      - Tolak akses.
      - Instruksi: "Maaf, data tidak ditemukan. Silakan lakukan reservasi online atau temui resepsionis (Sari) untuk bantuan."
    
-   - **JIKA Ada Data, Bandingkan [Start Time] dengan [SYSTEM TIME]**:
+   - **JIKA Ada Data, gunakan `verdict` dari tool** (`early` = TERLALU CEPAT, `on_time` = TEPAT WAKTU, `late` = TERLAMBAT). JANGAN menghitung ulang sendiri.
+     Hanya jika `verdict` bernilai `unknown`, bandingkan [Start Time] dengan `server_time`:
      - **TERLALU CEPAT (> 30 menit sebelum jadwal)**:
        - Instruksi: "Anda datang terlalu awal. Jadwal Anda jam [Start Time]. Silakan menunggu di ruang tunggu lobby." -> END.
      - **TERLAMBAT (> 15 menit setelah jadwal)**:
@@ -121,6 +223,15 @@ Ikuti alur ini langkah demi langkah. JANGAN melompat.
 - Jika menolak, berikan alasan jelas (Terlalu cepat/Terlambat/Tidak terdaftar).
 """
 
+def get_idle_policy(persona: str) -> dict[str, float]:
+    """Idle thresholds for a persona: global defaults overlaid with IDLE_POLICIES."""
+    return {
+        "prompt_after": IDLE_PROMPT_AFTER,
+        "hangup_after": IDLE_HANGUP_AFTER,
+        **IDLE_POLICIES.get(persona.lower(), {}),
+    }
+
+
 def get_system_instruction(persona: str = "sari") -> str:
     """Get system instruction based on persona name."""
     if persona.lower() == "reza":
@@ -0,0 +1,86 @@
+"""Event-loop lag under logging load, per logging mode.
+
+Usage (from backend/):
+    python -m app.log_bench [--calls 50] [--rate 50] [--seconds 5] [--sink-delay-ms 0.2]
+
+Simulates `calls` concurrent calls, each logging `rate` INFO records per
+second from the event loop, into a sink whose flush takes --sink-delay-ms
+(a slow terminal, pipe or container log driver). For each configuration it
+runs the same load and reports the event-loop lag measured by
+monitor_loop_lag (p50/p99/max) plus how many records reached the sink.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+
+from .logging_setup import configure_logging, lag_summary, monitor_loop_lag, stop_logging
+
+CONFIGURATIONS = {
+    "sync": {"mode": "sync", "rate": 0},
+    "async": {"mode": "async", "rate": 0},
+    "async+rate20": {"mode": "async", "rate": 20},
+}
+
+
+class SlowSink:
+    """Write target whose flush blocks like a slow log consumer."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.records = 0
+
+    def write(self, text: str):
+        self.records += text.count("\n")
+
+    def flush(self):
+        if self.delay > 0:
+            time.sleep(self.delay)
+
+
+async def _call(index: int, rate: int, until: float):
+    logger = logging.getLogger("app.main")
+    while time.monotonic() < until:
+        logger.info("Audio frame for call %d: %d bytes", index, 1280)
+        await asyncio.sleep(1 / rate)
+
+
+async def _run(calls: int, rate: int, seconds: float) -> list[float]:
+    samples: list[float] = []
+    probe = asyncio.create_task(monitor_loop_lag(0.005, report_every=float("inf"), samples=samples))
+    until = time.monotonic() + seconds
+    await asyncio.gather(*(_call(i, rate, until) for i in range(calls)))
+    probe.cancel()
+    await asyncio.gather(probe, return_exceptions=True)
+    return samples
+
+
+def bench(calls: int = 50, rate: int = 50, seconds: float = 5.0, sink_delay_ms: float = 0.2) -> dict:
+    results = {}
+    for name, options in CONFIGURATIONS.items():
+        sink = SlowSink(sink_delay_ms / 1000)
+        configure_logging(level="INFO", mode=options["mode"], fmt="text", rate=options["rate"], stream=sink)
+        samples = asyncio.run(_run(calls, rate, seconds))
+        stop_logging()  # drains the queue in async mode
+        results[name] = {**lag_summary(samples), "records_written": sink.records}
+    logging.getLogger().handlers.clear()
+    return {
+        "calls": calls, "records_per_call_s": rate, "seconds": seconds,
+        "sink_delay_ms": sink_delay_ms, "results": results,
+    }
+
+
+def main_cli(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Measure event-loop lag per logging mode")
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--rate", type=int, default=50, help="INFO records per second per call")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--sink-delay-ms", type=float, default=0.2, help="blocking time per sink flush")
+    args = parser.parse_args(argv)
+    print(json.dumps(bench(args.calls, args.rate, args.seconds, args.sink_delay_ms), indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,173 @@
+"""Logging setup: optional queue-based (off-loop) handlers, JSON records and hot-path rate limiting.
+
+LOG_MODE=sync   handlers write on the calling thread (previous behaviour)
+LOG_MODE=async  records go through a QueueHandler; a listener thread formats
+                and writes them, so the event loop only pays for an enqueue
+LOG_FORMAT=json one JSON object per line, including the current call id
+"""
+
+import asyncio
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import statistics
+import threading
+import time
+
+from .config import LOG_LEVEL, LOG_MODE, LOG_FORMAT, LOG_HOT_PATH_RATE
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Set per WebSocket call; tasks spawned by the call inherit it
+call_id_var: contextvars.ContextVar[str | None] = contextvars.ContextVar("call_id", default=None)
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+class CallContextFilter(logging.Filter):
+    """Attach the current call id to every record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.call_id = call_id_var.get()
+        return True
+
+
+class HotPathRateFilter(logging.Filter):
+    """
+    Allow at most `rate` INFO/DEBUG records per second for each message
+    template; the rest are dropped and counted on the next record that passes.
+    Warnings and errors are never limited. Off unless LOG_HOT_PATH_RATE > 0.
+    Logging threads (to_thread workers, the SQLite writer) share the windows,
+    so updates happen under a lock.
+    """
+
+    def __init__(self, rate: int = LOG_HOT_PATH_RATE):
+        super().__init__()
+        self.rate = rate
+        self._windows: dict[tuple[str, str], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate <= 0 or record.levelno > logging.INFO:
+            return True
+        with self._lock:
+            return self._allow(record)
+
+    def _allow(self, record: logging.LogRecord) -> bool:
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        window = self._windows.get(key)
+        if window is None and len(self._windows) >= 1024:
+            # f-string messages make unbounded templates; start over
+            self._windows.clear()
+        if window is None or now - window[0] >= 1.0:
+            suppressed = window[2] if window else 0
+            self._windows[key] = [now, 1, 0]
+            if suppressed:
+                record.msg = f"{record.msg} [+{suppressed} similar suppressed]"
+            return True
+        if window[1] < self.rate:
+            window[1] += 1
+            return True
+        window[2] += 1
+        return False
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "call_id": getattr(record, "call_id", None),
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _LazyQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves message formatting to the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def configure_logging(
+    level: str = LOG_LEVEL,
+    mode: str = LOG_MODE,
+    fmt: str = LOG_FORMAT,
+    rate: int = LOG_HOT_PATH_RATE,
+    stream=None,
+):
+    """Configure the root logger. Safe to call more than once."""
+    global _listener
+    stop_logging()
+
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.setLevel(level)
+
+    if mode == "async":
+        front = _LazyQueueHandler(queue.SimpleQueue())
+        _listener = logging.handlers.QueueListener(front.queue, handler, respect_handler_level=True)
+        _listener.start()
+    else:
+        front = handler
+    front.addFilter(CallContextFilter())
+    front.addFilter(HotPathRateFilter(rate))
+    root.addHandler(front)
+
+
+def stop_logging():
+    """Flush and stop the listener thread (async mode)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def lag_summary(samples: list[float]) -> dict[str, float]:
+    """p50/p99/max of event-loop lag samples, in milliseconds."""
+    samples = sorted(samples)
+    return {
+        "samples": len(samples),
+        "p50_ms": round(statistics.median(samples) * 1000, 2),
+        "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000, 2),
+        "max_ms": round(samples[-1] * 1000, 2),
+    }
+
+
+async def monitor_loop_lag(interval: float, report_every: float = 60.0, samples: list[float] | None = None):
+    """
+    Measure event-loop lag as the oversleep of a short periodic timer and
+    log p50/p99/max every `report_every` seconds. With `samples`, every
+    measurement is also appended there (used by app.log_bench).
+    """
+    logger = logging.getLogger(__name__)
+    window: list[float] = []
+    last_report = time.monotonic()
+    while True:
+        start = time.monotonic()
+        await asyncio.sleep(interval)
+        lag = max(0.0, time.monotonic() - start - interval)
+        window.append(lag)
+        if samples is not None:
+            samples.append(lag)
+        if time.monotonic() - last_report >= report_every and window:
+            summary = lag_summary(window)
+            logger.info(
+                "Event loop lag over %d samples: p50=%.2fms p99=%.2fms max=%.2fms (log mode %s)",
+                summary["samples"], summary["p50_ms"], summary["p99_ms"], summary["max_ms"], LOG_MODE,
+            )
+            window.clear()
+            last_report = time.monotonic()
@@ -7,41 +7,174 @@ import asyncio
 import base64
 import json
 import logging
-import traceback
+import os
+import signal
+import time
+import uuid
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import Depends, FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from google import genai
-from google.genai import types
+from fastapi.responses import JSONResponse
 
-from .config import GEMINI_API_KEY, GEMINI_MODEL, get_system_instruction
+from .config import (
+    GEMINI_API_KEY, GEMINI_MODEL, MCP_INIT_MAX_BACKOFF, AUDIO_INPUT_AGC,
+    LOOP_LAG_INTERVAL, CALL_RECORDING, CALL_RECORD_DIR, DRAIN_ON_SIGTERM, ADMIN_TOKEN,
+    REAPER_INTERVAL, TRACEMALLOC_FRAMES, TOOL_PREFETCH, AUDIO_OUTPUT_PACING
+)
 from .tools import get_tool_declarations
 from .mcp_bridge import mcp_bridge
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+from .audio_input import InboundAudioStage
+from .audio_output import OutboundAudioStage
+from .audio_processing import (
+    AudioPipeline, GEMINI_INPUT_RATE, GEMINI_OUTPUT_RATE, negotiate_format
 )
+from .audio_codecs import AudioCodec, DEFAULT_CODEC, negotiate_codec
+from .transcripts import CallTranscript, transcript_writer
+from .call_log import call_log
+from .recorder import CallRecorder, current_recorder
+from .calls import ActiveCall, call_registry
+from .tenants import tenant_registry
+from .prefetch import ToolPrefetcher, prefetch_stats
+from .roster import BOOKING_WRITE_TOOLS
+from .memory_stats import process_memory, snapshot_diff, start_tracing, stop_tracing
+from .logging_setup import call_id_var, configure_logging, monitor_loop_lag, stop_logging
+
+# Reference point for startup timing (module import ~= process launch)
+_PROCESS_START = time.perf_counter()
+
+# Configure logging (LOG_MODE / LOG_FORMAT, see logging_setup)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 
+# Gemini client is built lazily: importing google.genai costs ~0.5 s
+_gemini_client = None
+_outbound_pacing = AUDIO_OUTPUT_PACING  # Replay --fast turns this off
+_first_call_logged = False
+
+
+def get_gemini_client():
+    """Return the shared Gemini client, constructing it on first use."""
+    global _gemini_client
+    if _gemini_client is None:
+        from google import genai
+        # EXACT Shila pattern
+        _gemini_client = genai.Client(
+            http_options={"api_version": "v1beta"},
+            api_key=GEMINI_API_KEY
+        )
+    return _gemini_client
+
+
+async def _init_mcp_with_retry(pool=mcp_bridge, label: str = "MCP Bridge"):
+    """Initialize an MCP pool in the background, retrying with exponential backoff."""
+    delay = 1.0
+    while True:
+        logger.info(f"Initializing {label}...")
+        if await pool.initialize():
+            logger.info(f"{label} initialized successfully")
+            pool.start_keepalive()
+            return
+        logger.error(f"{label} initialization failed, retrying in {delay:.0f}s")
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, MCP_INIT_MAX_BACKOFF)
+
+
+async def _warm_gemini_client():
+    """Import google.genai and build the client off the event loop."""
+    try:
+        await asyncio.to_thread(get_gemini_client)
+        await asyncio.to_thread(get_tool_declarations)
+        await asyncio.to_thread(tenant_registry.precompile)
+        logger.info("Gemini client ready")
+    except Exception as e:
+        logger.error(f"Gemini client warm-up failed: {e}")
+
+
+def _install_drain_on_sigterm():
+    """
+    Route SIGTERM through a graceful drain: stop taking calls, let active
+    calls finish, then hand the signal to uvicorn's own handler to exit
+    (or to the default action when there is none). A second SIGTERM skips
+    the drain.
+    """
+    try:
+        previous = signal.getsignal(signal.SIGTERM)
+    except ValueError:
+        return
+    loop = asyncio.get_running_loop()
+
+    def exit_now(*_):
+        if callable(previous):
+            previous(signal.SIGTERM, None)
+        else:
+            # SIG_DFL / SIG_IGN / not set by Python: terminate the default way
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            os.kill(os.getpid(), signal.SIGTERM)
+
+    def handle_sigterm(signum, frame):
+        if call_registry.draining:
+            exit_now()
+            return
+        logger.warning("SIGTERM received, draining calls before shutdown")
+        loop.call_soon_threadsafe(
+            lambda: call_registry.start_drain().add_done_callback(exit_now)
+        )
+
+    try:
+        signal.signal(signal.SIGTERM, handle_sigterm)
+    except ValueError:
+        pass  # not in the main thread (e.g. under a test client)
+
+
+async def require_admin(request: Request):
+    """Admin auth: X-Admin-Token must match ADMIN_TOKEN, or loopback if unset."""
+    if ADMIN_TOKEN:
+        if request.headers.get("x-admin-token") != ADMIN_TOKEN:
+            raise HTTPException(status_code=401, detail="Invalid admin token")
+    elif not request.client or request.client.host not in ("127.0.0.1", "::1", "localhost", "testclient"):
+        raise HTTPException(status_code=403, detail="Admin endpoints are loopback-only without ADMIN_TOKEN")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     logger.info("AI Receptionist Backend starting...")
+    tenant_registry.load()
+    if TRACEMALLOC_FRAMES > 0:
+        start_tracing(TRACEMALLOC_FRAMES)
+    transcript_writer.start()
+    call_log.start()
+    if DRAIN_ON_SIGTERM:
+        _install_drain_on_sigterm()
     
-    # Initialize MCP Bridge
-    logger.info("Initializing MCP Bridge...")
-    success = await mcp_bridge.initialize()
-    if success:
-        logger.info("MCP Bridge initialized successfully")
-    else:
-        logger.error("MCP Bridge initialization failed")
+    # Slow dependencies warm up in the background so the server accepts
+    # connections immediately; /ready reports when they are usable.
+    background = [
+        asyncio.create_task(_init_mcp_with_retry()),
+        asyncio.create_task(_warm_gemini_client()),
+    ]
+    for tenant_id, pool in tenant_registry.extra_pools():
+        background.append(asyncio.create_task(_init_mcp_with_retry(pool, f"MCP Bridge [{tenant_id}]")))
+    for tenant in tenant_registry.tenants.values():
+        if tenant.roster.enabled:
+            background.append(asyncio.create_task(tenant.roster.run()))
+    if REAPER_INTERVAL > 0:
+        background.append(asyncio.create_task(call_registry.run_reaper(REAPER_INTERVAL)))
+    if LOOP_LAG_INTERVAL > 0:
+        background.append(asyncio.create_task(monitor_loop_lag(LOOP_LAG_INTERVAL)))
+    logger.info(f"Startup complete in {time.perf_counter() - _PROCESS_START:.3f}s")
         
     yield
     logger.info("AI Receptionist Backend shutting down...")
+    for task in background:
+        task.cancel()
+    await asyncio.gather(*background, return_exceptions=True)
+    await tenant_registry.close()
     await mcp_bridge.close()
+    await transcript_writer.close()
+    await call_log.close()
+    stop_logging()
 
 
 app = FastAPI(
@@ -60,66 +193,257 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize Gemini client - EXACT Shila pattern
-client = genai.Client(
-    http_options={"api_version": "v1beta"},
-    api_key=GEMINI_API_KEY
-)
-
-
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
+    """Health check endpoint (liveness only)."""
     return {"status": "ok", "service": "ai-receptionist"}
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness endpoint: 200 once every tenant's MCP and Gemini are usable, 503 before or while draining."""
+    mcp_ready = {tenant.tenant_id: tenant.mcp.is_ready for tenant in tenant_registry.tenants.values()}
+    checks = {
+        "mcp": mcp_bridge.is_ready and all(mcp_ready.values()),
+        "gemini": _gemini_client is not None and bool(GEMINI_API_KEY),
+        "accepting_calls": not call_registry.draining,
+    }
+    ready = all(checks.values())
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not_ready", "checks": checks, "mcp_tenants": mcp_ready}
+    )
+
+
 import datetime
 
+@app.post("/admin/drain", dependencies=[Depends(require_admin)])
+async def start_drain():
+    """Stop accepting calls and let active calls finish (see DRAIN_TIMEOUT)."""
+    call_registry.start_drain()
+    return call_registry.status()
+
+
+@app.get("/admin/drain", dependencies=[Depends(require_admin)])
+async def drain_status():
+    """Drain progress: active calls and whether the drain has completed."""
+    return call_registry.status()
+
+
+@app.get("/admin/calls", dependencies=[Depends(require_admin)])
+async def active_calls():
+    """Active calls with their activity timestamps, plus reaper and drain counters."""
+    return {**call_registry.status(), "calls": call_registry.describe_calls()}
+
+
+@app.get("/admin/tenants", dependencies=[Depends(require_admin)])
+async def tenants_status():
+    """Per-tenant active calls, quota usage, MCP readiness and cache counters."""
+    return tenant_registry.status(call_registry.count_by_tenant())
+
+
+@app.get("/admin/memory", dependencies=[Depends(require_admin)])
+async def memory_status():
+    """Process RSS plus bytes held in each active call's buffers."""
+    calls = {call.call_id: call.memory.summary() for call in call_registry.calls.values()}
+    return {
+        **process_memory(),
+        "calls_held_bytes": sum(call["held_bytes"] for call in calls.values()),
+        "calls": calls,
+    }
+
+
+@app.post("/admin/memory/tracemalloc", dependencies=[Depends(require_admin)])
+async def tracemalloc_start(frames: int = 1):
+    """Start tracing allocations; later diffs are relative to this point."""
+    return {"started": start_tracing(frames), **process_memory()}
+
+
+@app.get("/admin/memory/tracemalloc", dependencies=[Depends(require_admin)])
+async def tracemalloc_diff(limit: int = 25, depth: int = 0, reset: bool = False):
+    """Allocation growth since the baseline, grouped by module (depth=1: top-level package)."""
+    try:
+        return await asyncio.to_thread(snapshot_diff, limit, depth, reset)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@app.delete("/admin/memory/tracemalloc", dependencies=[Depends(require_admin)])
+async def tracemalloc_stop():
+    stop_tracing()
+    return process_memory()
+
+
+@app.get("/admin/prefetch", dependencies=[Depends(require_admin)])
+async def prefetch_status():
+    """Transcription-driven tool prefetch: hit rate and tool latency saved."""
+    return prefetch_stats.summary()
+
+
+@app.get("/admin/roster", dependencies=[Depends(require_admin)])
+async def roster_status():
+    """Arrival roster state per tenant."""
+    return {tenant.tenant_id: tenant.roster.status() for tenant in tenant_registry.tenants.values()}
+
+
+@app.post("/admin/roster/refresh", dependencies=[Depends(require_admin)])
+async def roster_refresh(tenant_id: str | None = None):
+    """Reload today's bookings now (e.g. from an n8n Calendar change trigger)."""
+    if tenant_id is None:
+        tenants = list(tenant_registry.tenants.values())
+    elif tenant_id in tenant_registry.tenants:
+        tenants = [tenant_registry.tenants[tenant_id]]
+    else:
+        raise HTTPException(status_code=404, detail="Unknown tenant")
+    for tenant in tenants:
+        tenant.roster.request_refresh()
+    return {"requested": [tenant.tenant_id for tenant in tenants]}
+
+
+@app.get("/admin/tool-cache", dependencies=[Depends(require_admin)])
+async def tool_cache_stats():
+    """Tool-cache hit/miss counters per tenant for this worker."""
+    return {tenant.tenant_id: tenant.mcp.cache.summary() for tenant in tenant_registry.tenants.values()}
+
+
 @app.websocket("/ws/call")
-async def websocket_call(websocket: WebSocket, persona: str = "sari"):
+@app.websocket("/ws/call/{tenant_id}")
+async def websocket_call(
+    websocket: WebSocket,
+    tenant_id: str | None = None,
+    token: str | None = None,
+    persona: str = "sari",
+    sample_rate: int = GEMINI_INPUT_RATE,
+    channels: int = 1,
+    output_rate: int = GEMINI_OUTPUT_RATE,
+    codec: str = DEFAULT_CODEC,
+):
     """
     WebSocket endpoint for real-time audio call with AI.
-    Accepts 'persona' query param (sari/reza).
+    The tenant (venue) comes from the path (/ws/call/<tenant>) or a 'token'
+    query param / X-Tenant-Token header; plain /ws/call is the default tenant.
+    Accepts 'persona' query param (sari/reza) and optional audio format
+    params: 'sample_rate'/'channels' of client mic audio and 'output_rate'
+    the client wants to play. Defaults match Gemini (16 kHz in, 24 kHz out).
+    'codec' is a comma-separated preference list (adpcm, mulaw, pcm); the
+    chosen codec applies to audio frames in both directions.
     """
+    global _first_call_logged
+    from google.genai import types
+
     await websocket.accept()
-    logger.info(f"WebSocket connection accepted. Persona: {persona}")
+    if call_registry.draining:
+        # Node is draining for a deploy; client should retry on another node
+        await websocket.send_json({"type": "error", "message": "Server is restarting, please call again"})
+        await websocket.close(code=1013)
+        return
+    tenant = tenant_registry.resolve(tenant_id, token or websocket.headers.get("x-tenant-token"))
+    if tenant is None:
+        await websocket.send_json({"type": "error", "message": "Unknown tenant or invalid token"})
+        await websocket.close(code=1008)
+        return
+    if 0 < tenant.max_concurrent_calls <= call_registry.count_by_tenant().get(tenant.tenant_id, 0):
+        # Quota keeps one busy venue from taking every Gemini session
+        tenant.rejected_calls += 1
+        await websocket.send_json({"type": "error", "message": "All lines are busy, please call again"})
+        await websocket.close(code=1013)
+        return
+    persona = tenant.resolve_persona(persona)
+    call_id = uuid.uuid4().hex[:12]
+    call_id_var.set(call_id)
+    logger.info(
+        "WebSocket connection accepted. Call: %s Tenant: %s Persona: %s",
+        call_id, tenant.tenant_id, persona
+    )
+    if not _first_call_logged:
+        _first_call_logged = True
+        logger.info(f"First /ws/call accepted {time.perf_counter() - _PROCESS_START:.3f}s after launch")
     
     # Audio queue for smooth playback (Shila pattern)
     audio_out_queue = asyncio.Queue()
     stop_event = asyncio.Event()
+    active_call = ActiveCall(call_id, persona, websocket, stop_event, tenant.tenant_id)
+    call_registry.register(active_call)
+    
+    # Negotiate client audio format and build conversion pipelines
+    sample_rate, channels, output_rate = negotiate_format(sample_rate, channels, output_rate)
+    input_pipeline = AudioPipeline(sample_rate, GEMINI_INPUT_RATE, channels, agc=AUDIO_INPUT_AGC)
+    output_pipeline = AudioPipeline(GEMINI_OUTPUT_RATE, output_rate)
+    audio_codec = AudioCodec(negotiate_codec(codec))
+    transcript = CallTranscript(call_id, persona)
+    call_log.log_event(
+        "call_start", call_id, tenant=tenant.tenant_id, persona=persona, codec=audio_codec.name
+    )
+    call_started = time.perf_counter()
+    
+    recorder = None
+    if CALL_RECORDING:
+        recorder = CallRecorder(
+            os.path.join(CALL_RECORD_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{call_id}.crec"),
+            {
+                "call_id": call_id, "tenant": tenant.tenant_id, "persona": persona,
+                "started_at": time.time(),
+                "sample_rate": sample_rate, "channels": channels,
+                "output_rate": output_rate, "codec": audio_codec.name
+            }
+        )
+        recorder.start()
+        current_recorder.set(recorder)
     
     try:
+        await websocket.send_json({
+            "type": "audio_format",
+            "input": {"sample_rate": sample_rate, "channels": channels},
+            "output": {"sample_rate": output_rate, "channels": 1},
+            "codec": audio_codec.name
+        })
         await websocket.send_json({"type": "status", "status": "connecting"})
         
-        # Determine system instruction based on persona
-        system_instruction = get_system_instruction(persona)
-        
         # Inject Current Time for logic awareness
         current_time_str = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        system_instruction = f"[SYSTEM TIME: {current_time_str}]\n" + system_instruction
         
-        # Config - EXACT Shila pattern
-        config = types.LiveConnectConfig(
-            response_modalities=["AUDIO"],
-            output_audio_transcription={},
-            input_audio_transcription={},
-            speech_config=types.SpeechConfig(
-                voice_config=types.VoiceConfig(
-                    prebuilt_voice_config=types.PrebuiltVoiceConfig(
-                        voice_name="Aoede" if persona == "sari" else "Puck" # Different voice for Reza
-                    )
-                )
-            ),
-            system_instruction=system_instruction,
-            tools=get_tool_declarations()
-        )
+        # Per-call copy of the tenant's precompiled persona config (voice, tools, instruction)
+        config = tenant.connect_config(persona, f"[SYSTEM TIME: {current_time_str}]\n")
         
         logger.info(f"Connecting to model: {GEMINI_MODEL}")
         
+        client = get_gemini_client()
         async with client.aio.live.connect(model=GEMINI_MODEL, config=config) as session:
             logger.info("Connected to Gemini Live API")
+            active_call.session = session
             
             await websocket.send_json({"type": "status", "status": "connected"})
+            inbound_audio = InboundAudioStage(session)
+            call_memory = active_call.memory
+            call_memory.inbound_audio = inbound_audio
+
+            async def send_audio_frame(frame):
+                message = {
+                    "type": "audio",
+                    "data": base64.b64encode(audio_codec.encode(frame.data)).decode('utf-8'),
+                    "seq": frame.seq,
+                }
+                if frame.start:
+                    message["start"] = True
+                if frame.ack:
+                    message["ack"] = True  # Client answers with audio_ack
+                await websocket.send_json(message)
+
+            # Released to the client at playback rate in fixed frames
+            outbound_audio = OutboundAudioStage(send_audio_frame, output_rate, paced=_outbound_pacing)
+            call_memory.outbound_audio = outbound_audio
+            # Reza's email lookup is served by verify_arrival when the roster is on
+            prefetcher = ToolPrefetcher(
+                tenant.mcp.execute_function, persona,
+                enabled=TOOL_PREFETCH and not (persona == "reza" and tenant.roster.enabled),
+            )
+
+            async def run_tool(name: str, arguments: dict) -> dict:
+                # Served from a transcription-driven prefetch when possible
+                result = await prefetcher.take(name, arguments)
+                if result is None:
+                    result = await tenant.mcp.execute_function(name, arguments)
+                return result
             
             # Send initial greeting prompt
             await session.send(input="Mulai percakapan. Sapa penelepon.", end_of_turn=True)
@@ -132,30 +456,87 @@ async def websocket_call(websocket: WebSocket, persona: str = "sari"):
                     while not stop_event.is_set():
                         turn = session.receive()
                         async for response in turn:
+                            if recorder:
+                                recorder.gemini_message(response)
+                            
                             # Only handle response.data for audio (Shila pattern)
                             if data := response.data:
+                                inbound_audio.mark_response()
+                                active_call.mark_gemini_output()
+                                prefetcher.end_of_input()
+                                call_memory.audio_queued(len(data))
                                 await audio_out_queue.put(data)
                             
+                            # Forward live transcription and keep it for the call record
+                            if content := response.server_content:
+                                for role, transcription in (
+                                    ("user", content.input_transcription),
+                                    ("assistant", content.output_transcription),
+                                ):
+                                    if transcription and transcription.text:
+                                        if role == "user":
+                                            prefetcher.feed(transcription.text)
+                                        transcript.add(role, transcription.text)
+                                        await websocket.send_json({
+                                            "type": "transcript",
+                                            "role": role,
+                                            "text": transcription.text
+                                        })
+                                if content.interrupted:
+                                    # Caller barged in: drop model audio the client has not received
+                                    while not audio_out_queue.empty():
+                                        call_memory.audio_dequeued(len(audio_out_queue.get_nowait()))
+                                    outbound_audio.flush()
+                            
                             # Handle tool calls
                             if response.tool_call:
+                                active_call.mark_gemini_output()
+                                prefetcher.end_of_input()
                                 for fc in response.tool_call.function_calls:
-                                    logger.info(f"Tool call: {fc.name} Arguments: {fc.args}")
+                                    logger.info("Tool call: %s Arguments: %s", fc.name, fc.args)
                                     await websocket.send_json({
                                         "type": "function_call",
                                         "name": fc.name,
                                         "arguments": dict(fc.args) if fc.args else {}
                                     })
                                     
+                                    tool_args = dict(fc.args) if fc.args else {}
+                                    tool_started = time.perf_counter()
                                     try:
-                                        result = await mcp_bridge.execute_function(
-                                            fc.name,
-                                            dict(fc.args) if fc.args else {}
-                                        )
-                                        logger.info(f"Tool result: {result}")
+                                        if fc.name == "verify_arrival":
+                                            # Local tool: answered from today's roster in memory;
+                                            # its lookup_appointment fallback can use a prefetch
+                                            result = await tenant.roster.verify(tool_args, lookup=run_tool)
+                                        else:
+                                            result = await run_tool(fc.name, tool_args)
+                                        logger.info("Tool result: %s", result)
                                     except Exception as e:
-                                        logger.error(f"Tool execution error: {e}")
+                                        logger.error("Tool execution error: %s", e)
                                         result = {"error": f"Technical issue: {str(e)}", "success": False}
                                     
+                                    active_call.mark_gemini_output()  # slow tools are not caller idleness
+                                    call_memory.tool_payload(tool_args, result)
+                                    success = bool(result.get("success"))
+                                    if success and fc.name in BOOKING_WRITE_TOOLS:
+                                        tenant.roster.request_refresh()
+                                    call_log.log_event(
+                                        "tool_result", call_id,
+                                        tool=fc.name, success=success,
+                                        duration_ms=round((time.perf_counter() - tool_started) * 1000)
+                                    )
+                                    if success and fc.name == "grant_access":
+                                        call_log.log_event(
+                                            "access_granted", call_id,
+                                            visitor_name=tool_args.get("visitor_name"),
+                                            zone=tool_args.get("zone")
+                                        )
+                                    elif success and fc.name == "check_in_guest":
+                                        call_log.log_event(
+                                            "check_in", call_id,
+                                            name=tool_args.get("name"),
+                                            booking_id=tool_args.get("booking_id")
+                                        )
+                                    
                                     await session.send(
                                         input=types.LiveClientToolResponse(
                                             function_responses=[
@@ -171,12 +552,11 @@ async def websocket_call(websocket: WebSocket, persona: str = "sari"):
                 except asyncio.CancelledError:
                     pass
                 except Exception as e:
-                    logger.error(f"Gemini receive error: {e}")
-                    logger.error(traceback.format_exc())
+                    logger.error("Gemini receive error: %s", e, exc_info=True)
             
-            # Task 2: Send audio from queue to WebSocket (Shila play_audio pattern)
+            # Task 2: Convert queued audio for the client and hand it to the pacer
             async def send_audio_to_client():
-                """Send audio from queue to WebSocket - smooth playback."""
+                """Resample model audio to the client rate; outbound_audio sends it."""
                 try:
                     while not stop_event.is_set():
                         try:
@@ -185,12 +565,8 @@ async def websocket_call(websocket: WebSocket, persona: str = "sari"):
                                 audio_out_queue.get(),
                                 timeout=0.5
                             )
-                            
-                            audio_base64 = base64.b64encode(audio_data).decode('utf-8')
-                            await websocket.send_json({
-                                "type": "audio",
-                                "data": audio_base64
-                            })
+                            call_memory.audio_dequeued(len(audio_data))
+                            outbound_audio.push(output_pipeline.process(audio_data))
                             
                         except asyncio.TimeoutError:
                             continue
@@ -210,22 +586,32 @@ async def websocket_call(websocket: WebSocket, persona: str = "sari"):
                                 websocket.receive_json(),
                                 timeout=0.5
                             )
+                            active_call.mark_client_frame()
+                            if recorder:
+                                recorder.client_frame(data)
                             
                             if data.get("type") == "audio":
-                                audio_bytes = base64.b64decode(data["data"])
-                                # Shila pattern: simple dict for audio
-                                await session.send(
-                                    input={"data": audio_bytes, "mime_type": "audio/pcm"},
-                                    end_of_turn=False
+                                audio_bytes = audio_codec.decode(base64.b64decode(data["data"]))
+                                # Re-chunked and sent as realtime input by inbound_audio
+                                if inbound_audio.push(input_pipeline.process(audio_bytes)):
+                                    active_call.mark_voiced_input()
+                            
+                            elif data.get("type") == "audio_ack":
+                                outbound_audio.on_ack(
+                                    data.get("seq"), data.get("buffered_ms"), data.get("underruns")
                                 )
                             
                             elif data.get("type") == "image":
                                 # Handle video frame/image input
                                 image_bytes = base64.b64decode(data["data"])
-                                await session.send(
-                                    input={"data": image_bytes, "mime_type": "image/jpeg"},
-                                    end_of_turn=False
-                                )
+                                call_memory.image_started(len(image_bytes))
+                                try:
+                                    await session.send(
+                                        input={"data": image_bytes, "mime_type": "image/jpeg"},
+                                        end_of_turn=False
+                                    )
+                                finally:
+                                    call_memory.image_sent(len(image_bytes))
                             
                             elif data.get("type") == "end_call":
                                 logger.info("Client ended call")
@@ -243,38 +629,68 @@ async def websocket_call(websocket: WebSocket, persona: str = "sari"):
                 except Exception as e:
                     logger.error(f"Client receive error: {e}")
             
-            # Run all 3 tasks concurrently (Shila TaskGroup pattern)
+            # Run all tasks concurrently (Shila TaskGroup pattern)
             tasks = [
                 asyncio.create_task(receive_from_gemini()),
                 asyncio.create_task(send_audio_to_client()),
-                asyncio.create_task(receive_from_client())
+                asyncio.create_task(receive_from_client()),
+                asyncio.create_task(inbound_audio.run()),
+                asyncio.create_task(outbound_audio.run())
             ]
             
             try:
                 # Wait for any task to complete (usually client disconnect)
-                done, pending = await asyncio.wait(
+                await asyncio.wait(
                     tasks,
                     return_when=asyncio.FIRST_COMPLETED
                 )
             finally:
                 # Cancel remaining tasks
                 stop_event.set()
-                for task in pending:
+                for task in tasks:
+                    if task.done():
+                        continue
                     task.cancel()
                     try:
                         await task
                     except asyncio.CancelledError:
                         pass
+                # %-style: a per-call f-string would be a new template for the log rate limiter
+                logger.info("Inbound audio: %s", inbound_audio.summary())
+                logger.info("Outbound audio: %s", outbound_audio.summary())
+                call_seconds = time.perf_counter() - call_started
+                audio_cpu = input_pipeline.cpu_seconds + output_pipeline.cpu_seconds
+                logger.info(
+                    "Audio processing CPU: %.2fms per call-second (%dHz x%d in, %dHz out)",
+                    audio_cpu * 1000 / max(call_seconds, 1e-3), sample_rate, channels, output_rate
+                )
+                logger.info("Audio wire: %s", audio_codec.summary(call_seconds))
+                logger.info("Call memory: %s", call_memory.summary())
+                prefetcher.close()
+                logger.info("Tool prefetch: %s", prefetcher.summary())
                     
     except Exception as e:
-        logger.error(f"WebSocket error: {e}")
-        logger.error(traceback.format_exc())
+        logger.error("WebSocket error: %s", e, exc_info=True)
         try:
             await websocket.send_json({"type": "error", "message": str(e)})
         except:
             pass
     
     finally:
+        call_registry.unregister(call_id)
+        if transcript.entries:
+            transcript_writer.submit(transcript.to_record())
+        call_log.log_event(
+            "call_end", call_id, persona=persona,
+            duration_s=round(time.perf_counter() - call_started, 1),
+            end_reason=active_call.end_reason
+        )
+        if recorder:
+            await recorder.close()
+        try:
+            await websocket.close()
+        except Exception:
+            pass  # already closed by the client
         logger.info("WebSocket connection closed")
 
 
@@ -284,5 +700,8 @@ async def root():
     return {
         "name": "AI Receptionist - Caliana",
         "version": "1.0.0",
-        "endpoints": {"health": "/health", "websocket": "/ws/call"}
+        "endpoints": {
+            "health": "/health", "ready": "/ready", "websocket": "/ws/call",
+            "drain": "/admin/drain", "calls": "/admin/calls", "memory": "/admin/memory", "roster": "/admin/roster", "tool_cache": "/admin/tool-cache"
+        }
     }
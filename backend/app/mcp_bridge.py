@@ -5,11 +5,38 @@ import logging
 import uuid
 import json
 import asyncio
+import time
 from typing import Any
-from .config import N8N_MCP_URL, N8N_AUTH_TOKEN
+from .recorder import current_recorder
+from .tool_cache import ToolCache
+from .config import N8N_MCP_URL, N8N_AUTH_TOKEN, MCP_KEEPALIVE_INTERVAL, MCP_POOL_SIZE, ROSTER_WORKFLOW_ID
 
 logger = logging.getLogger(__name__)
 
+
+class MCPSessionExpired(Exception):
+    """Raised when n8n no longer recognises our MCP session."""
+
+
+# Tools safe to send twice: only these are replayed after a session re-init.
+# Writes (book_event, create_client, ...) may already have run, so they fail instead.
+IDEMPOTENT_TOOLS = {"client_lookup", "lookup_appointment", "check_availability", "list_today_bookings"}
+
+
+# Internal tool names -> n8n Workflow IDs found via search_workflows
+DEFAULT_TOOL_MAPPING = {
+    "client_lookup": "PiHySWYpcDwjUq87",          # [WEBHOOK] Tool - Client Lookup
+    "create_client": "KymrzNh4Jth9v16l",          # [WEBHOOK] Tool - New Client CRM
+    "check_availability": "8cRknpaIMUfpEbRv",     # [WEBHOOK] Tool - Check Availability
+    "book_event": "Ao6wuSMbydtD76ai",             # [WEBHOOK] Tool - Book Event
+    "lookup_appointment": "p5WAEBT7eViEUcN0",     # [WEBHOOK] Tool - Lookup Appointment
+    "reschedule_appointment": "JOIq7XOABi7w6Qlk", # [WEBHOOK] Tool - Reschedule Appointment
+    "cancel_appointment": "M7g6pQuSleRyPGcm"      # [WEBHOOK] Tool - Cancel Appointment
+}
+if ROSTER_WORKFLOW_ID:
+    DEFAULT_TOOL_MAPPING["list_today_bookings"] = ROSTER_WORKFLOW_ID  # Arrival roster (roster.py)
+
+
 class MCPBridge:
     """
     MCP Bridge for n8n Instance Level.
@@ -18,23 +45,27 @@ class MCPBridge:
     Maintains session via Cookies in persistent client.
     """
     
-    def __init__(self, mcp_url: str | None = None, auth_token: str | None = None):
+    def __init__(
+        self,
+        mcp_url: str | None = None,
+        auth_token: str | None = None,
+        tool_mapping: dict[str, str] | None = None,
+    ):
         self.mcp_url = mcp_url or N8N_MCP_URL
         self.auth_token = auth_token or N8N_AUTH_TOKEN
         self.timeout = 60.0
-        # Map internal tool names to n8n Workflow IDs found via search_workflows
-        self.tool_mapping = {
-            "client_lookup": "PiHySWYpcDwjUq87",          # [WEBHOOK] Tool - Client Lookup
-            "create_client": "KymrzNh4Jth9v16l",          # [WEBHOOK] Tool - New Client CRM
-            "check_availability": "8cRknpaIMUfpEbRv",     # [WEBHOOK] Tool - Check Availability
-            "book_event": "Ao6wuSMbydtD76ai",             # [WEBHOOK] Tool - Book Event
-            "lookup_appointment": "p5WAEBT7eViEUcN0",     # [WEBHOOK] Tool - Lookup Appointment
-            "reschedule_appointment": "JOIq7XOABi7w6Qlk", # [WEBHOOK] Tool - Reschedule Appointment
-            "cancel_appointment": "M7g6pQuSleRyPGcm"      # [WEBHOOK] Tool - Cancel Appointment
-        }
+        # Map internal tool names to n8n Workflow IDs
+        self.tool_mapping = dict(tool_mapping or DEFAULT_TOOL_MAPPING)
         self._initialized = False
         self._client: httpx.AsyncClient | None = None
         self._lock = asyncio.Lock()
+        # Streamable HTTP session id (sent back as Mcp-Session-Id header)
+        self._session_id: str | None = None
+        # Bumped on every successful (re)initialize so concurrent callers
+        # that hit the same expired session only re-initialize once.
+        self._generation = 0
+        self._keepalive_task: asyncio.Task | None = None
+        self.in_flight = 0
 
     async def _get_client(self) -> httpx.AsyncClient:
         if self._client is None or self._client.is_closed:
@@ -49,10 +80,31 @@ class MCPBridge:
         # Ensure Auth is always set (in case of recreation)
         if self.auth_token: 
              self._client.headers["Authorization"] = self.auth_token
+        if self._session_id:
+            self._client.headers["Mcp-Session-Id"] = self._session_id
         return self._client
 
+    @property
+    def is_ready(self) -> bool:
+        return self._initialized
+
+    def _reset_session(self):
+        """Forget the current MCP session (cookies + session id)."""
+        self._initialized = False
+        self._session_id = None
+        if self._client is not None:
+            self._client.cookies.clear()
+            self._client.headers.pop("Mcp-Session-Id", None)
+
     async def close(self):
         """Close the HTTP client."""
+        if self._keepalive_task and not self._keepalive_task.done():
+            self._keepalive_task.cancel()
+            try:
+                await self._keepalive_task
+            except asyncio.CancelledError:
+                pass
+        self._keepalive_task = None
         if self._client and not self._client.is_closed:
             await self._client.aclose()
             self._client = None
@@ -61,9 +113,8 @@ class MCPBridge:
         
     async def _parse_response(self, response: httpx.Response) -> dict[str, Any]:
         """Parse response which might be JSON or SSE-wrapped JSON."""
-        msg = f"Response {response.status_code}"
         text = response.text.strip()
-        logger.info(f"{msg}: {text[:500]}...") 
+        logger.debug("Response %s: %.500s...", response.status_code, text)
         
         try:
             return response.json()
@@ -101,15 +152,32 @@ class MCPBridge:
         if params is not None:
             payload["params"] = params
             
-        logger.info(f"Sending JSON-RPC: {method}")
+        logger.info("Sending JSON-RPC: %s", method)
         try:
             # Need to increase timeout for workflow execution
             timeout = 120.0 if method == "tools/call" else self.timeout
+            started = time.perf_counter()
             response = await client.post(self.mcp_url, json=payload, timeout=timeout)
+            
+            # Expired/unknown session: the MCP spec answers 404 to a request carrying Mcp-Session-Id
+            if (
+                method != "initialize"
+                and response.status_code == 404
+                and "Mcp-Session-Id" in response.request.headers
+            ):
+                raise MCPSessionExpired("Session rejected (404)")
             response.raise_for_status()
             
+            session_id = response.headers.get("mcp-session-id")
+            if session_id:
+                self._session_id = session_id
+                client.headers["Mcp-Session-Id"] = session_id
+            
             data = await self._parse_response(response)
             
+            if method == "tools/call" and (recorder := current_recorder.get()) is not None:
+                recorder.mcp_call(params, data, time.perf_counter() - started)
+            
             if "result" in data:
                 return data["result"]
             if "error" in data:
@@ -120,34 +188,88 @@ class MCPBridge:
             return data
             
         except Exception as e:
-            logger.error(f"RPC Error ({method}): {e}")
+            logger.error("RPC Error (%s): %s", method, e)
             raise
 
+    async def _initialize_locked(self) -> bool:
+        """Run the MCP handshake. Caller must hold `_lock`."""
+        try:
+            await self._send_jsonrpc("initialize", {
+                "protocolVersion": "2024-11-05",
+                "capabilities": {},
+                "clientInfo": {"name": "caliana-ai", "version": "1.0"}
+            })
+            
+            try:
+                await self._send_jsonrpc("notifications/initialized")
+            except Exception as e:
+                 logger.warning(f"Notify initialized warned: {e}")
+            
+            self._initialized = True
+            self._generation += 1
+            logger.info("MCP Session Initialized")
+            return True
+        except Exception as e:
+            logger.error(f"Init failed: {e}")
+            self._initialized = False
+            return False
+
     async def initialize(self) -> bool:
         async with self._lock:
             if self._initialized: return True
-            try:
-                await self._send_jsonrpc("initialize", {
-                    "protocolVersion": "2024-11-05",
-                    "capabilities": {},
-                    "clientInfo": {"name": "caliana-ai", "version": "1.0"}
-                })
-                
-                try:
-                    await self._send_jsonrpc("notifications/initialized")
-                except Exception as e:
-                     logger.warning(f"Notify initialized warned: {e}")
-                
-                self._initialized = True
-                logger.info("MCP Session Initialized")
+            return await self._initialize_locked()
+
+    async def _reinitialize(self, stale_generation: int) -> bool:
+        """Re-initialize after the session generation `stale_generation` expired."""
+        async with self._lock:
+            if self._initialized and self._generation != stale_generation:
+                # Another caller already replaced the expired session
                 return True
+            logger.warning("MCP session expired, re-initializing")
+            self._reset_session()
+            return await self._initialize_locked()
+
+    async def _call_tool(self, params: dict[str, Any], replay: bool) -> dict[str, Any]:
+        """tools/call; if the session expired it is re-initialized and, when `replay`, sent once more."""
+        generation = self._generation
+        try:
+            return await self._send_jsonrpc("tools/call", params)
+        except MCPSessionExpired:
+            if not await self._reinitialize(generation):
+                raise Exception("Re-initialization failed")
+            if not replay:
+                raise Exception("MCP session expired; not retrying a non-idempotent tool")
+            return await self._send_jsonrpc("tools/call", params)
+
+    def start_keepalive(self, interval: float = MCP_KEEPALIVE_INTERVAL):
+        """Keep the MCP session warm with periodic pings (interval <= 0 disables)."""
+        if interval <= 0 or (self._keepalive_task and not self._keepalive_task.done()):
+            return
+        self._keepalive_task = asyncio.create_task(self._keepalive_loop(interval))
+
+    async def _keepalive_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            if not self._initialized:
+                await self.initialize()
+                continue
+            generation = self._generation
+            try:
+                await self._send_jsonrpc("ping")
+            except MCPSessionExpired:
+                await self._reinitialize(generation)
             except Exception as e:
-                logger.error(f"Init failed: {e}")
-                self._initialized = False
-                return False
+                logger.warning(f"MCP keep-alive ping failed: {e}")
 
     async def execute_function(self, name: str, arguments: dict[str, Any]) -> dict[str, Any]:
-        logger.info(f"=== MCP EXECUTE: {name} ===")
+        self.in_flight += 1
+        try:
+            return await self._execute_function(name, arguments)
+        finally:
+            self.in_flight -= 1
+
+    async def _execute_function(self, name: str, arguments: dict[str, Any]) -> dict[str, Any]:
+        logger.info("=== MCP EXECUTE: %s ===", name)
         try:
             if not self._initialized:
                 if not await self.initialize():
@@ -169,7 +291,7 @@ class MCPBridge:
                 }
 
             if name == "trigger_ui_action":
-                logger.info(f"UI Action Triggered: {arguments}")
+                logger.info("UI Action Triggered: %s", arguments)
                 return {
                     "result": "UI action sent to client.",
                     "success": True
@@ -180,7 +302,7 @@ class MCPBridge:
             workflow_id = self.tool_mapping.get(name)
             
             if workflow_id:
-                logger.info(f"Executing Workflow ID: {workflow_id}")
+                logger.info("Executing Workflow ID: %s", workflow_id)
                 
                 # Wrap arguments in Webhook schema
                 # Clean payload as per user's n8n config (Body only)
@@ -200,10 +322,10 @@ class MCPBridge:
                 tool_to_call = name
                 request_args = arguments
 
-            result = await self._send_jsonrpc("tools/call", {
-                "name": tool_to_call,
-                "arguments": request_args
-            })
+            result = await self._call_tool(
+                {"name": tool_to_call, "arguments": request_args},
+                replay=name in IDEMPOTENT_TOOLS,
+            )
             
             # Extract result from n8n execution data
             result_data = result if isinstance(result, dict) else {}
@@ -255,5 +377,55 @@ class MCPBridge:
             logger.error(f"Execute failed: {e}")
             return {"error": str(e), "success": False}
 
+class MCPBridgePool:
+    """
+    Small pool of independent MCP sessions.
+    Each call goes to the session with the fewest in-flight requests,
+    so a slow workflow on one session does not queue the others.
+    Lookups go through the shared tool cache first (see tool_cache.py).
+    """
+
+    def __init__(
+        self,
+        size: int = 1,
+        mcp_url: str | None = None,
+        auth_token: str | None = None,
+        cache: ToolCache | None = None,
+        tool_mapping: dict[str, str] | None = None,
+    ):
+        self.bridges = [MCPBridge(mcp_url, auth_token, tool_mapping) for _ in range(max(1, size))]
+        self.cache = cache or ToolCache()
+
+    @property
+    def tool_mapping(self) -> dict[str, str]:
+        return self.bridges[0].tool_mapping
+
+    @property
+    def is_ready(self) -> bool:
+        return any(bridge.is_ready for bridge in self.bridges)
+
+    def _pick(self) -> MCPBridge:
+        return min(self.bridges, key=lambda bridge: bridge.in_flight)
+
+    async def initialize(self) -> bool:
+        """Initialize every session; usable as long as one succeeds."""
+        results = await asyncio.gather(*(bridge.initialize() for bridge in self.bridges))
+        return any(results)
+
+    def start_keepalive(self, interval: float = MCP_KEEPALIVE_INTERVAL):
+        for bridge in self.bridges:
+            bridge.start_keepalive(interval)
+
+    async def execute_function(self, name: str, arguments: dict[str, Any]) -> dict[str, Any]:
+        return await self.cache.execute(
+            name, arguments, lambda: self._pick().execute_function(name, arguments)
+        )
+
+    async def close(self):
+        for bridge in self.bridges:
+            await bridge.close()
+        await self.cache.close()
+
+
 # Global instance
-mcp_bridge = MCPBridge()
+mcp_bridge = MCPBridgePool(size=MCP_POOL_SIZE)
@@ -0,0 +1,169 @@
+"""Memory diagnostics: per-call byte accounting, process RSS and tracemalloc diffs.
+
+Each call keeps a CallMemory with the bytes it currently holds in queues
+(model audio waiting for the client or held back by pacing, caller audio
+waiting for Gemini, images being sent) and totals of tool payloads, so
+/admin/memory shows which calls, and which buffers, are growing. For allocations outside those buffers
+(retained Gemini responses, httpx buffers, log records), the tracemalloc
+endpoints diff snapshots and group the growth by module.
+"""
+
+import gc
+import json
+import os
+import sys
+import tracemalloc
+from typing import Any
+
+from .config import TRACEMALLOC_FRAMES
+
+_baseline: tracemalloc.Snapshot | None = None
+
+
+class CallMemory:
+    """Bytes held by one call's buffers (current and peak) and tool payload totals."""
+
+    def __init__(self):
+        self.queued_audio_out = 0
+        self.peak_audio_out = 0
+        self.pending_image = 0
+        self.image_bytes_total = 0
+        self.tool_payload_total = 0
+        self.peak_tool_payload = 0
+        self.inbound_audio = None  # InboundAudioStage, for its backlog
+        self.outbound_audio = None  # OutboundAudioStage, for audio held back by pacing
+
+    def audio_queued(self, size: int):
+        self.queued_audio_out += size
+        if self.queued_audio_out > self.peak_audio_out:
+            self.peak_audio_out = self.queued_audio_out
+
+    def audio_dequeued(self, size: int):
+        self.queued_audio_out -= size
+
+    def image_started(self, size: int):
+        self.pending_image += size
+        self.image_bytes_total += size
+
+    def image_sent(self, size: int):
+        self.pending_image -= size
+
+    def tool_payload(self, arguments: Any, result: Any):
+        size = len(json.dumps(arguments, default=str)) + len(json.dumps(result, default=str))
+        self.tool_payload_total += size
+        self.peak_tool_payload = max(self.peak_tool_payload, size)
+
+    @property
+    def queued_audio_in(self) -> int:
+        return self.inbound_audio.queued_bytes if self.inbound_audio is not None else 0
+
+    @property
+    def paced_audio_out(self) -> int:
+        return self.outbound_audio.queued_bytes if self.outbound_audio is not None else 0
+
+    @property
+    def held_bytes(self) -> int:
+        """Bytes currently sitting in this call's buffers."""
+        return self.queued_audio_out + self.paced_audio_out + self.queued_audio_in + self.pending_image
+
+    def summary(self) -> dict[str, int]:
+        return {
+            "held_bytes": self.held_bytes,
+            "queued_audio_out": self.queued_audio_out,
+            "peak_audio_out": self.peak_audio_out,
+            "paced_audio_out": self.paced_audio_out,
+            "queued_audio_in": self.queued_audio_in,
+            "pending_image": self.pending_image,
+            "image_bytes_total": self.image_bytes_total,
+            "tool_payload_total": self.tool_payload_total,
+            "peak_tool_payload": self.peak_tool_payload,
+        }
+
+
+def process_memory() -> dict[str, Any]:
+    """Current RSS (Linux /proc) and, if tracing, tracemalloc totals."""
+    info: dict[str, Any] = {"rss_bytes": None, "gc_objects": len(gc.get_objects())}
+    try:
+        with open("/proc/self/statm") as f:
+            info["rss_bytes"] = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        pass
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        info["traced_bytes"] = current
+        info["traced_peak_bytes"] = peak
+    return info
+
+
+def _take_snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+
+
+def start_tracing(frames: int = TRACEMALLOC_FRAMES or 1) -> bool:
+    """Start tracemalloc (adds CPU and memory overhead) and take the baseline snapshot."""
+    global _baseline
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start(frames)
+    _baseline = _take_snapshot()
+    return started
+
+
+def stop_tracing():
+    global _baseline
+    _baseline = None
+    tracemalloc.stop()
+
+
+def _module_index() -> dict[str, str]:
+    index = {}
+    for name, module in list(sys.modules.items()):
+        filename = getattr(module, "__file__", None)
+        if filename:
+            index[os.path.abspath(filename)] = name
+    return index
+
+
+def _module_name(filename: str, index: dict[str, str], depth: int) -> str:
+    name = index.get(os.path.abspath(filename))
+    if name is None:
+        # Not imported as a module (e.g. <frozen ...>): fall back to the path
+        parts = filename.replace("\\", "/").split("/")
+        name = parts[-1][:-3] if parts[-1].endswith(".py") else parts[-1]
+        if "site-packages" in parts:
+            name = ".".join(parts[parts.index("site-packages") + 1:])[:-3] or name
+    return ".".join(name.split(".")[:depth]) if depth > 0 else name
+
+
+def snapshot_diff(limit: int = 25, depth: int = 0, reset: bool = False) -> dict[str, Any]:
+    """
+    Compare a fresh snapshot with the baseline and group the size delta by
+    module (`depth` > 0 truncates dotted names, e.g. 1 = top-level package).
+    With `reset`, the fresh snapshot becomes the next baseline.
+    """
+    global _baseline
+    if not tracemalloc.is_tracing() or _baseline is None:
+        raise RuntimeError("tracemalloc is not running; start it first")
+    gc.collect()
+    snapshot = _take_snapshot()
+    index = _module_index()
+    grouped: dict[str, list[int]] = {}
+    for stat in snapshot.compare_to(_baseline, "filename"):
+        module = _module_name(stat.traceback[0].filename, index, depth)
+        entry = grouped.setdefault(module, [0, 0, 0])
+        entry[0] += stat.size_diff
+        entry[1] += stat.size
+        entry[2] += stat.count_diff
+    if reset:
+        _baseline = snapshot
+    top = sorted(grouped.items(), key=lambda item: abs(item[1][0]), reverse=True)[:limit]
+    return {
+        "total_diff_bytes": sum(entry[0] for entry in grouped.values()),
+        "modules": [
+            {"module": module, "size_diff": diff, "size": size, "count_diff": count}
+            for module, (diff, size, count) in top
+        ],
+    }
@@ -0,0 +1,198 @@
+"""Speculative tool prefetch from the caller's live input transcription.
+
+Both personas open by asking for an email and then look it up (Sari:
+client_lookup, Reza: lookup_appointment). The model only issues that tool
+call after the caller stops talking and it has spoken a filler line. The
+prefetcher watches the streamed input transcription for an email address and
+starts the persona's lookup in the background as soon as the address is
+complete; when the model's real tool call arrives with the same arguments it
+is answered from that task instead of a fresh n8n round trip.
+
+An address is treated as complete once more text follows it, or when the
+caller's turn ends (the model starts answering), so a half-transcribed
+"budi@gmail.co" is never looked up. Only read-only lookups are prefetched.
+"""
+
+import asyncio
+import json
+import logging
+import re
+import time
+from typing import Any, Awaitable, Callable
+
+from .config import TOOL_PREFETCH, TOOL_PREFETCH_MAX
+
+logger = logging.getLogger(__name__)
+
+# persona -> [(entity kind, tool name, argument name)]
+PREFETCH_RULES = {
+    "sari": [("email", "client_lookup", "email")],
+    "reza": [("email", "lookup_appointment", "email")],
+}
+DEFAULT_PERSONA_RULES = PREFETCH_RULES["sari"]
+
+# Spoken forms the transcription may produce (English and Indonesian)
+_SPOKEN = [
+    (re.compile(r"\s+(?:at|et|add)\s+"), " @ "),
+    (re.compile(r"\s+(?:dot|titik)\s+"), " . "),
+    (re.compile(r"\s+(?:underscore|garis bawah)\s+"), " _ "),
+    (re.compile(r"\s+(?:dash|strip|minus)\s+"), " - "),
+]
+_JOIN = re.compile(r"\s*([@._-])\s*")
+EMAIL_RE = re.compile(r"[a-z0-9][a-z0-9._%+-]*@[a-z0-9-]+(?:\.[a-z0-9-]+)*\.[a-z]{2,}")
+
+_TAIL_CHARS = 300
+
+
+def normalize_transcript(text: str) -> str:
+    """Lowercase and turn dictated addresses ("budi at gmail dot com") into written form."""
+    text = f" {text.lower()} "
+    for pattern, replacement in _SPOKEN:
+        text = pattern.sub(replacement, text)
+    return _JOIN.sub(r"\1", text).strip()
+
+
+def _key(name: str, arguments: dict[str, Any]) -> str:
+    return name + json.dumps(
+        {k: str(v).strip().lower() for k, v in (arguments or {}).items()}, sort_keys=True
+    )
+
+
+class PrefetchStats:
+    """Process-wide prefetch counters (aggregated when calls end)."""
+
+    def __init__(self):
+        self.calls = 0
+        self.started = 0
+        self.hits = 0
+        self.misses = 0
+        self.wasted = 0
+        self.saved_s = 0.0
+
+    def add(self, prefetcher: "ToolPrefetcher"):
+        self.calls += 1
+        self.started += prefetcher.started
+        self.hits += prefetcher.hits
+        self.misses += prefetcher.misses
+        self.wasted += prefetcher.wasted
+        self.saved_s += prefetcher.saved_s
+
+    def summary(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "calls": self.calls,
+            "started": self.started,
+            "hits": self.hits,
+            "misses": self.misses,
+            "wasted": self.wasted,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "saved_ms_total": round(self.saved_s * 1000),
+            "saved_ms_per_hit": round(self.saved_s * 1000 / self.hits) if self.hits else None,
+        }
+
+
+class ToolPrefetcher:
+    """Per-call prefetcher; `take` hands a prefetched result to the real tool call."""
+
+    def __init__(
+        self,
+        execute: Callable[[str, dict[str, Any]], Awaitable[dict[str, Any]]],
+        persona: str,
+        enabled: bool = TOOL_PREFETCH,
+        max_prefetches: int = TOOL_PREFETCH_MAX,
+    ):
+        self.execute = execute
+        self.rules = PREFETCH_RULES.get(persona.lower(), DEFAULT_PERSONA_RULES)
+        self.tools = {tool for _, tool, _ in self.rules}
+        self.enabled = enabled
+        self.max_prefetches = max_prefetches
+        self._text = ""
+        # key -> (started_at, task, [duration])
+        self._pending: dict[str, tuple[float, asyncio.Task, list[float]]] = {}
+        self._seen: set[str] = set()
+
+        self.started = 0
+        self.hits = 0
+        self.misses = 0
+        self.wasted = 0
+        self.saved_s = 0.0
+
+    def feed(self, text: str):
+        """Add a streamed input-transcription fragment."""
+        if not self.enabled:
+            return
+        self._text = (self._text + text)[-_TAIL_CHARS:]
+        self._scan(final=False)
+
+    def end_of_input(self):
+        """The caller's turn ended (model is answering): anything seen is complete."""
+        if self._text:
+            self._scan(final=True)
+            self._text = ""
+
+    def _scan(self, final: bool):
+        normalized = normalize_transcript(self._text)
+        for match in EMAIL_RE.finditer(normalized):
+            if not final and not normalized[match.end():].strip("._-@"):
+                continue  # may still be growing ("...@yahoo.co" -> ".co.id")
+            self._start("email", match.group(0).strip("."))
+
+    def _start(self, kind: str, value: str):
+        for rule_kind, tool, argument in self.rules:
+            if rule_kind != kind:
+                continue
+            arguments = {argument: value}
+            key = _key(tool, arguments)
+            if key in self._seen or self.started >= self.max_prefetches:
+                continue
+            self._seen.add(key)
+            logger.info("Prefetching %s for %s", tool, value)
+            duration: list[float] = []
+            task = asyncio.create_task(self._run(tool, arguments, duration))
+            self._pending[key] = (time.perf_counter(), task, duration)
+            self.started += 1
+
+    async def _run(self, tool: str, arguments: dict[str, Any], duration: list[float]) -> dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            return await self.execute(tool, arguments)
+        finally:
+            duration.append(time.perf_counter() - started)
+
+    async def take(self, name: str, arguments: dict[str, Any]) -> dict[str, Any] | None:
+        """Result for a real tool call if it was prefetched, else None (caller executes it)."""
+        entry = self._pending.pop(_key(name, arguments), None)
+        if entry is None:
+            if self.enabled and name in self.tools:
+                self.misses += 1
+            return None
+        started_at, task, duration = entry
+        called_at = time.perf_counter()
+        try:
+            result = await task
+        except Exception:
+            return None
+        if "error" in result:
+            return None  # transport failure: let the real call retry
+        # Without prefetch the result would arrive duration after the tool call
+        self.hits += 1
+        self.saved_s += min(duration[0], called_at - started_at)
+        return result
+
+    def close(self):
+        """Cancel unused prefetches; call once when the call ends."""
+        for _, task, _ in self._pending.values():
+            self.wasted += 1
+            task.cancel()
+        self._pending.clear()
+        prefetch_stats.add(self)
+
+    def summary(self) -> str:
+        return (
+            f"started={self.started} hits={self.hits} misses={self.misses} "
+            f"wasted={self.wasted} saved={self.saved_s * 1000:.0f}ms"
+        )
+
+
+# Global instance
+prefetch_stats = PrefetchStats()
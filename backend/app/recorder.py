@@ -0,0 +1,154 @@
+"""Opt-in call recorder: compact binary capture of one call for later replay.
+
+File layout (little-endian):
+    b"CREC" | uint8 version | uint32 metadata_len | metadata (JSON)
+    records: uint8 kind | uint64 t_us since call start | uint32 len | payload
+
+Client audio/images and Gemini audio are stored as raw bytes; control frames,
+non-audio Gemini messages and MCP exchanges as compact JSON. Records are
+buffered in memory and appended to disk from a worker thread about once a
+second, so nothing touches the disk on the call path.
+"""
+
+import asyncio
+import base64
+import contextvars
+import json
+import logging
+import os
+import struct
+import time
+from typing import Any, Iterator
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CREC"
+VERSION = 1
+
+CLIENT_AUDIO = 1
+CLIENT_IMAGE = 2
+CLIENT_CONTROL = 3
+GEMINI_AUDIO = 4
+GEMINI_MESSAGE = 5
+MCP_CALL = 6
+
+_HEADER = struct.Struct("<4sBI")
+_RECORD = struct.Struct("<BQI")
+
+# Recorder of the call running in the current task (MCP bridge records through it)
+current_recorder: contextvars.ContextVar["CallRecorder | None"] = contextvars.ContextVar(
+    "current_recorder", default=None
+)
+
+
+def _json_bytes(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str).encode()
+
+
+class CallRecorder:
+    """Captures client frames, Gemini messages and MCP exchanges for one call."""
+
+    def __init__(self, path: str, metadata: dict[str, Any], flush_interval: float = 1.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._start = time.perf_counter()
+        meta = _json_bytes(metadata)
+        self._buffer = bytearray(_HEADER.pack(MAGIC, VERSION, len(meta)) + meta)
+        self._closing = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.bytes_written = 0
+
+    def start(self):
+        self._task = asyncio.create_task(self._flush_loop())
+
+    def _add(self, kind: int, payload: bytes):
+        t_us = int((time.perf_counter() - self._start) * 1_000_000)
+        self._buffer += _RECORD.pack(kind, t_us, len(payload))
+        self._buffer += payload
+
+    def client_frame(self, message: dict[str, Any]):
+        kind = message.get("type")
+        if kind == "audio":
+            self._add(CLIENT_AUDIO, base64.b64decode(message.get("data", "")))
+        elif kind == "image":
+            self._add(CLIENT_IMAGE, base64.b64decode(message.get("data", "")))
+        else:
+            self._add(CLIENT_CONTROL, _json_bytes(message))
+
+    def gemini_message(self, response):
+        if data := response.data:
+            self._add(GEMINI_AUDIO, data)
+            rest = response.model_dump_json(
+                exclude_none=True, exclude={"server_content": {"model_turn"}}
+            )
+            if rest in ("{}", '{"server_content":{}}'):
+                return
+        else:
+            rest = response.model_dump_json(exclude_none=True)
+        self._add(GEMINI_MESSAGE, rest.encode())
+
+    def mcp_call(self, params: dict[str, Any], response: dict[str, Any], elapsed: float):
+        self._add(MCP_CALL, _json_bytes({
+            "params": params,
+            "response": response,
+            "ms": round(elapsed * 1000, 1)
+        }))
+
+    def _append(self, chunk: bytes):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "ab") as f:
+            f.write(chunk)
+
+    async def _flush(self):
+        if not self._buffer:
+            return
+        chunk = bytes(self._buffer)
+        self._buffer.clear()
+        await asyncio.to_thread(self._append, chunk)
+        self.bytes_written += len(chunk)
+
+    async def _flush_loop(self):
+        while not self._closing.is_set():
+            try:
+                await asyncio.wait_for(self._closing.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self._flush()
+            except Exception as e:
+                logger.error(f"Call recording write failed: {e}")
+
+    async def close(self):
+        """Final flush; waits for pending writes."""
+        self._closing.set()
+        if self._task is not None:
+            # Shielded so the final flush completes even if the call is cancelled
+            await asyncio.shield(self._task)
+        else:
+            await self._flush()
+        logger.info("Call recording saved: %s (%d bytes)", self.path, self.bytes_written)
+
+
+def read_recording(path: str) -> tuple[dict[str, Any], list[tuple[int, float, bytes]]]:
+    """Load a recording as (metadata, [(kind, t_seconds, payload), ...])."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    magic, version, meta_len = _HEADER.unpack_from(raw, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Not a call recording (v{VERSION}): {path}")
+    offset = _HEADER.size
+    metadata = json.loads(raw[offset:offset + meta_len])
+    offset += meta_len
+    return metadata, list(_iter_records(raw, offset))
+
+
+def _iter_records(raw: bytes, offset: int) -> Iterator[tuple[int, float, bytes]]:
+    while offset + _RECORD.size <= len(raw):
+        kind, t_us, length = _RECORD.unpack_from(raw, offset)
+        offset += _RECORD.size
+        if offset + length > len(raw):
+            break  # truncated tail (process died mid-write)
+        yield kind, t_us / 1_000_000, raw[offset:offset + length]
+        offset += length
@@ -0,0 +1,372 @@
+"""Replay a recorded call against the backend with local fake Gemini and n8n endpoints.
+
+Usage (from backend/):
+    python -m app.replay data/recordings/<file>.crec [--fast]
+    python -m app.replay tests/fixtures/short_call.crec --fast --repeat 1000 --soak   # memory soak
+
+The recorded client frames are sent to /ws/call through the ASGI test client.
+A fake Live session plays back the recorded Gemini messages, and a fake MCP
+transport answers tools/call from the recorded n8n responses. Each Gemini
+message is held until the client frames that preceded it in the recording
+have been sent, and each client frame until the Gemini messages that
+preceded it have been played, so runs are repeatable. With the default paced mode, frames,
+messages and tool latencies also follow the recorded timestamps; --fast
+drops all waiting. Prints a JSON report for use as a regression fixture.
+
+Replay never touches the deployment's data: transcripts, call-log spool and
+shared state go to --data-dir (default: a fresh temp dir, named in the
+report), recording is off, the call-log exporter is disabled and the state
+backend is per-process. The call is replayed against the tenant named in
+the recording header; non-default tenants need the same TENANTS_FILE.
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager
+from typing import Any
+
+import httpx
+
+from .recorder import (
+    CLIENT_AUDIO, CLIENT_IMAGE, CLIENT_CONTROL, GEMINI_AUDIO, GEMINI_MESSAGE, MCP_CALL,
+    read_recording
+)
+
+FAKE_MCP_URL = "http://fake-n8n.local/mcp"
+
+# Path settings that default to locations under DATA_DIR (see config.py)
+DATA_PATH_SETTINGS = ("STATE_PATH", "TRANSCRIPT_PATH", "CALL_LOG_DIR", "CALL_RECORD_DIR")
+
+
+def isolate_data_dir(data_dir: str | None = None) -> str:
+    """Point everything the app writes at `data_dir`; must run before app.config is imported."""
+    if f"{__package__}.config" in sys.modules:
+        raise RuntimeError("replay must set up its data dir before app.config is imported")
+    data_dir = data_dir or tempfile.mkdtemp(prefix="replay-")
+    for setting in DATA_PATH_SETTINGS:
+        os.environ.pop(setting, None)
+    os.environ.update({
+        "DATA_DIR": data_dir,
+        "STATE_BACKEND": "memory",
+        "CALL_RECORDING": "false",
+        "CALL_LOG_EXPORTER": "none",
+    })
+    return data_dir
+
+
+class ReplayClock:
+    """Shared progress between the client driver thread and the fake session."""
+
+    def __init__(self, paced: bool):
+        self.paced = paced
+        self.start = time.perf_counter()
+        self.client_frames_sent = 0
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    async def wait_until(self, t: float, client_frames: int):
+        while self.client_frames_sent < client_frames:
+            await asyncio.sleep(0.001)
+        if self.paced and (delay := t - self.elapsed()) > 0:
+            await asyncio.sleep(delay)
+
+
+class FakeLiveSession:
+    """Stands in for the Gemini Live session; plays recorded server messages."""
+
+    def __init__(self, messages: list[tuple[float, int, Any]], clock: ReplayClock):
+        self._messages = messages
+        self._clock = clock
+        self._next = 0
+        self.sends = 0
+
+    async def send(self, input=None, end_of_turn: bool = False):
+        self.sends += 1
+
+    async def receive(self):
+        """Yield one recorded turn (up to and including turn_complete)."""
+        while self._next >= len(self._messages):
+            await asyncio.sleep(3600)  # recording exhausted; wait to be cancelled
+        while self._next < len(self._messages):
+            t, client_frames, message = self._messages[self._next]
+            self._next += 1
+            await self._clock.wait_until(t, client_frames)
+            yield message
+            if message.server_content and message.server_content.turn_complete:
+                return
+
+
+class FakeGeminiClient:
+    """Mimics genai.Client just enough for `client.aio.live.connect(...)`."""
+
+    def __init__(self, session: FakeLiveSession):
+        self.session = session
+        self.aio = self
+        self.live = self
+
+    @asynccontextmanager
+    async def connect(self, model: str, config: Any):
+        yield self.session
+
+
+class FakeN8N:
+    """MCP transport that answers tools/call from recorded n8n exchanges."""
+
+    def __init__(self, exchanges: list[dict[str, Any]], paced: bool):
+        self.paced = paced
+        self.served = 0
+        self.unmatched = 0
+        self._exchanges = exchanges
+        self.reset()
+
+    def reset(self):
+        """Re-arm every recorded exchange for the next replayed call."""
+        self._by_params: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        for exchange in self._exchanges:
+            self._by_params[json.dumps(exchange["params"], sort_keys=True)].append(exchange)
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        method = body.get("method")
+        if method != "tools/call":
+            return httpx.Response(200, json={"jsonrpc": "2.0", "id": body.get("id"), "result": {}})
+
+        queue = self._by_params.get(json.dumps(body.get("params"), sort_keys=True))
+        if not queue:
+            self.unmatched += 1
+            return httpx.Response(200, json={
+                "jsonrpc": "2.0", "id": body.get("id"),
+                "error": {"message": "No recorded response for this tools/call"}
+            })
+        exchange = queue.pop(0)
+        self.served += 1
+        if self.paced:
+            await asyncio.sleep(exchange["ms"] / 1000)
+        return httpx.Response(200, json={"jsonrpc": "2.0", "id": body.get("id"), **exchange["response"]})
+
+
+def _split_records(records):
+    """Split a recording into client frames, gated Gemini messages and MCP exchanges."""
+    from google.genai import types
+
+    client_frames: list[tuple[float, int, dict[str, Any]]] = []
+    gemini: list[tuple[float, int, Any]] = []
+    exchanges: list[dict[str, Any]] = []
+    for kind, t, payload in records:
+        if kind == CLIENT_AUDIO:
+            frame = {"type": "audio", "data": base64.b64encode(payload).decode()}
+            client_frames.append((t, len(gemini), frame))
+        elif kind == CLIENT_IMAGE:
+            frame = {"type": "image", "data": base64.b64encode(payload).decode()}
+            client_frames.append((t, len(gemini), frame))
+        elif kind == CLIENT_CONTROL:
+            client_frames.append((t, len(gemini), json.loads(payload)))
+        elif kind == GEMINI_AUDIO:
+            message = types.LiveServerMessage(server_content=types.LiveServerContent(
+                model_turn=types.Content(parts=[types.Part(
+                    inline_data=types.Blob(data=payload, mime_type="audio/pcm;rate=24000")
+                )])
+            ))
+            gemini.append((t, len(client_frames), message))
+        elif kind == GEMINI_MESSAGE:
+            gemini.append((t, len(client_frames), types.LiveServerMessage.model_validate_json(payload)))
+        elif kind == MCP_CALL:
+            exchanges.append(json.loads(payload))
+    return client_frames, gemini, exchanges
+
+
+def _replay_call(client, route: str, query: str, client_frames, gemini, clock: ReplayClock, session: FakeLiveSession, settle: float):
+    """Drive one call over the websocket; returns (received counts, audio bytes, first audio time)."""
+    received: Counter = Counter()
+    audio_bytes = 0
+    first_audio_at: float | None = None
+    last_audio_at = 0.0
+    with client.websocket_connect(f"{route}?{query}") as ws:
+        def read_server():
+            nonlocal audio_bytes, first_audio_at, last_audio_at
+            try:
+                while True:
+                    message = ws.receive_json()
+                    received[message.get("type")] += 1
+                    if message.get("type") == "audio":
+                        audio_bytes += len(base64.b64decode(message["data"]))
+                        last_audio_at = time.perf_counter()
+                        if first_audio_at is None:
+                            first_audio_at = clock.elapsed()
+            except Exception:
+                pass
+
+        reader = threading.Thread(target=read_server, daemon=True)
+        reader.start()
+        clock.start = time.perf_counter()
+        ended_by_client = False
+        for t, gemini_before, frame in client_frames:
+            wait_until = time.perf_counter() + settle
+            while session._next < gemini_before and time.perf_counter() < wait_until:
+                time.sleep(0.001)
+            if clock.paced and (delay := t - clock.elapsed()) > 0:
+                time.sleep(delay)
+            ws.send_json(frame)
+            clock.client_frames_sent += 1
+            ended_by_client = frame.get("type") == "end_call"
+        # Let remaining Gemini messages play out before hanging up
+        deadline = time.perf_counter() + settle + (
+            max(0.0, gemini[-1][0] - clock.elapsed()) if clock.paced and gemini else 0.0
+        )
+        while session._next < len(gemini) and time.perf_counter() < deadline:
+            time.sleep(0.01)
+        # Paced outbound audio trails the last Gemini message by up to its playback time
+        while clock.paced and time.perf_counter() - last_audio_at < 0.3:
+            time.sleep(0.01)
+        if not ended_by_client:
+            ws.send_json({"type": "end_call"})
+        # The server closes the socket once the call has wound down
+        reader.join(timeout=settle + 5)
+    return received, audio_bytes, first_audio_at
+
+
+def _fake_n8n_transport(pools, fake_n8n: FakeN8N):
+    for pool in pools:
+        for bridge in pool.bridges:
+            bridge.mcp_url = FAKE_MCP_URL
+            bridge._client = httpx.AsyncClient(transport=httpx.MockTransport(fake_n8n))
+
+
+def replay(
+    path: str, paced: bool = True, settle: float = 1.0, repeat: int = 1, soak: bool = False,
+    data_dir: str | None = None,
+) -> dict[str, Any]:
+    """
+    Replay `path` against the app and return a summary report.
+
+    With `repeat` > 1 the recording is replayed as that many consecutive
+    calls in one app lifetime. With `soak`, allocations are traced: the
+    baseline is taken after a warm-up of calls, and the report adds the
+    traced memory retained per completed call and the top modules by growth.
+    """
+    data_dir = isolate_data_dir(data_dir)
+    from fastapi.testclient import TestClient
+    from . import main
+    from .calls import call_registry
+    from .mcp_bridge import mcp_bridge
+    from .memory_stats import process_memory, snapshot_diff, start_tracing, stop_tracing
+    from .tenants import DEFAULT_TENANT, tenant_registry
+
+    metadata, records = read_recording(path)
+    client_frames, gemini, exchanges = _split_records(records)
+
+    fake_n8n = FakeN8N(exchanges, paced)
+    mcp_bridge.cache.ttl = 0  # every recorded tools/call must reach the fake n8n
+    main._outbound_pacing = main._outbound_pacing and paced
+    # Load tenants now so their pools talk to the fake n8n from the first request
+    tenant_registry.load()
+    tenant_id = metadata.get("tenant", DEFAULT_TENANT)  # older recordings have no tenant
+    tenant = tenant_registry.tenants.get(tenant_id)
+    if tenant is None:
+        raise ValueError(f"Recording is for tenant '{tenant_id}', which TENANTS_FILE does not define")
+    _fake_n8n_transport([mcp_bridge] + [pool for _, pool in tenant_registry.extra_pools()], fake_n8n)
+
+    route = "/ws/call" if tenant_id == DEFAULT_TENANT else f"/ws/call/{tenant_id}"
+    query = (
+        f"persona={metadata['persona']}&sample_rate={metadata['sample_rate']}"
+        f"&channels={metadata['channels']}&output_rate={metadata['output_rate']}"
+        f"&codec={metadata['codec']}"
+    )
+    if tenant.token:
+        query += f"&token={tenant.token}"
+    warmup = min(max(10, repeat // 10), repeat - 1) if soak else 0
+    memory: dict[str, Any] = {}
+    started = time.perf_counter()
+
+    with TestClient(main.app) as client:
+        for index in range(repeat):
+            if soak and index == warmup:
+                start_tracing()
+                memory["baseline"] = process_memory()
+            clock = ReplayClock(paced)
+            session = FakeLiveSession(gemini, clock)
+            main._gemini_client = FakeGeminiClient(session)
+            fake_n8n.reset()
+            received, audio_bytes, first_audio_at = _replay_call(
+                client, route, query, client_frames, gemini, clock, session, settle
+            )
+        duration = clock.elapsed()
+        if soak:
+            # Let per-call cleanup (transcript/call-log flushes) settle first
+            time.sleep(settle)
+            diff = snapshot_diff(limit=10, depth=1)
+            memory["final"] = process_memory()
+            measured = repeat - warmup
+            memory.update({
+                "calls_measured": measured,
+                "active_calls_left": len(call_registry.calls),
+                "retained_bytes_per_call": round(diff["total_diff_bytes"] / max(measured, 1), 1),
+                "top_modules": diff["modules"],
+            })
+            stop_tracing()
+
+    report = {
+        "recording": path,
+        "tenant": tenant_id,
+        "data_dir": data_dir,
+        "mode": "paced" if paced else "fast",
+        "duration_s": round(duration, 3),
+        "client_frames_sent": len(client_frames),
+        "gemini_messages_played": session._next,
+        "gemini_messages_recorded": len(gemini),
+        "mcp_served": fake_n8n.served,
+        "mcp_unmatched": fake_n8n.unmatched,
+        "received": dict(received),
+        "audio_bytes_received": audio_bytes,
+        "first_audio_s": round(first_audio_at, 3) if first_audio_at is not None else None,
+    }
+    if repeat > 1:
+        report["calls"] = repeat
+        report["total_s"] = round(time.perf_counter() - started, 1)
+    if soak:
+        report["memory"] = memory
+    return report
+
+
+def main_cli(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay a recorded call (.crec)")
+    parser.add_argument("recording")
+    parser.add_argument("--fast", action="store_true", help="ignore recorded timing")
+    parser.add_argument("--repeat", type=int, default=1, help="replay as N consecutive calls")
+    parser.add_argument(
+        "--soak", action="store_true",
+        help="trace allocations and fail if memory per call does not return to baseline"
+    )
+    parser.add_argument(
+        "--max-retained", type=float, default=2048,
+        help="soak: allowed traced bytes retained per completed call"
+    )
+    parser.add_argument(
+        "--data-dir", help="where the replayed calls write transcripts and call logs (default: temp dir)"
+    )
+    args = parser.parse_args(argv)
+    report = replay(
+        args.recording, paced=not args.fast, repeat=args.repeat, soak=args.soak, data_dir=args.data_dir
+    )
+    print(json.dumps(report, indent=2))
+    if report["mcp_unmatched"]:
+        return 1
+    if args.soak and (
+        report["memory"]["active_calls_left"]
+        or report["memory"]["retained_bytes_per_call"] > args.max_retained
+    ):
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
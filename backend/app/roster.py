@@ -0,0 +1,286 @@
+"""Daily arrival roster for instant kiosk (Reza) verification.
+
+A background job loads today's bookings through the n8n workflow mapped as
+`list_today_bookings` (ROSTER_WORKFLOW_ID for the default tenant, or in a
+tenant's tool_mapping) and indexes them by email and normalized name. The
+local `verify_arrival` tool then answers from memory with the booking and an
+early | on_time | late verdict computed against the server clock, instead of a
+Calendar lookup plus the model doing time arithmetic.
+
+The workflow receives {"date": "YYYY-MM-DD"} and should return one item with
+an "events" list; each event may use Calendar-style fields (summary,
+start.dateTime, attendees[].email) or flat ones (name, email, startTime).
+
+The roster reloads every ROSTER_REFRESH_INTERVAL seconds, when the date
+changes, after this process books/reschedules/cancels, and on
+POST /admin/roster/refresh (e.g. from an n8n Calendar trigger). When it is
+not loaded or the guest is not in it (e.g. booked moments ago on another
+worker), verify_arrival falls back to lookup_appointment through n8n (via
+the call's prefetcher, so a lookup already started from the transcript is
+reused). All-day events (a date without a time) are on time all day.
+"""
+
+import asyncio
+import datetime
+import json
+import logging
+import re
+import time
+import unicodedata
+from typing import Any, Awaitable, Callable
+
+from .config import ROSTER_REFRESH_INTERVAL, ROSTER_EARLY_MINUTES, ROSTER_LATE_MINUTES
+
+logger = logging.getLogger(__name__)
+
+ROSTER_TOOL = "list_today_bookings"
+
+# Tools whose success means today's bookings changed
+BOOKING_WRITE_TOOLS = {"book_event", "reschedule_appointment", "cancel_appointment"}
+
+_HONORIFICS = {"bapak", "pak", "ibu", "bu", "mas", "mbak", "kak", "sdr", "sdri", "mr", "mrs", "ms"}
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, strip accents, punctuation and honorifics ("Bapak Budi S." -> "budi s")."""
+    text = unicodedata.normalize("NFKD", name or "")
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    words = re.sub(r"[^a-z0-9]+", " ", text).split()
+    return " ".join(word for word in words if word not in _HONORIFICS)
+
+
+def _is_date_only(value: Any) -> bool:
+    """All-day Calendar event: {"date": "YYYY-MM-DD"} or a bare date string."""
+    if isinstance(value, dict):
+        return not value.get("dateTime") and bool(value.get("date"))
+    return isinstance(value, str) and len(value.strip()) == 10
+
+
+def _parse_time(value: Any) -> datetime.datetime | None:
+    if isinstance(value, dict):
+        value = value.get("dateTime") or value.get("date")
+    if not value:
+        return None
+    try:
+        return datetime.datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def _first(event: dict[str, Any], *keys: str) -> Any:
+    for key in keys:
+        if event.get(key):
+            return event[key]
+    return None
+
+
+class Booking:
+    """One of today's bookings."""
+
+    def __init__(self, event: dict[str, Any]):
+        attendees = event.get("attendees") or []
+        self.event_id = _first(event, "event_id", "id", "eventId")
+        self.name = _first(event, "name", "summary", "title") or ""
+        self.email = (
+            _first(event, "email", "attendeeEmail")
+            or next((a.get("email") for a in attendees if isinstance(a, dict) and a.get("email")), None)
+            or ""
+        ).strip().lower()
+        start = _first(event, "start", "startTime")
+        self.start = _parse_time(start)
+        self.all_day = _is_date_only(start)
+        self.end = _parse_time(_first(event, "end", "endTime"))
+
+    def verdict(self, now: datetime.datetime) -> tuple[str, int]:
+        """("early" | "on_time" | "late", minutes from start; negative = before)."""
+        if self.all_day:
+            return "on_time", 0
+        start = self.start
+        if start.tzinfo is None:
+            now = now.replace(tzinfo=None)
+        minutes = round((now - start).total_seconds() / 60)
+        if minutes < -ROSTER_EARLY_MINUTES:
+            return "early", minutes
+        if minutes > ROSTER_LATE_MINUTES:
+            return "late", minutes
+        return "on_time", minutes
+
+    def to_result(self, now: datetime.datetime) -> dict[str, Any]:
+        verdict, minutes = self.verdict(now)
+        return {
+            "found": True,
+            "verdict": verdict,
+            "minutes_from_start": minutes,
+            "name": self.name,
+            "email": self.email,
+            "event_id": self.event_id,
+            "start": self.start.date().isoformat() if self.all_day else self.start.isoformat(),
+            "all_day": self.all_day,
+            "end": self.end.isoformat() if self.end else None,
+            "server_time": now.replace(microsecond=0).isoformat(),
+            "rules": f"early > {ROSTER_EARLY_MINUTES} min before start, late > {ROSTER_LATE_MINUTES} min after",
+        }
+
+
+def _now() -> datetime.datetime:
+    return datetime.datetime.now().astimezone()
+
+
+class ArrivalRoster:
+    """Today's bookings for one tenant, indexed by email and normalized name."""
+
+    def __init__(self, mcp, refresh_interval: float = ROSTER_REFRESH_INTERVAL):
+        self.mcp = mcp
+        self.refresh_interval = refresh_interval
+        self.date: str | None = None
+        self.loaded_at: float | None = None
+        self.bookings: list[Booking] = []
+        self._by_email: dict[str, list[Booking]] = {}
+        self._by_name: dict[str, list[Booking]] = {}
+        self._refresh_wanted = asyncio.Event()
+        self.stats = {"refreshes": 0, "refresh_errors": 0, "hits": 0, "misses": 0, "fallbacks": 0}
+        self.last_error: str | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return ROSTER_TOOL in self.mcp.tool_mapping
+
+    @property
+    def is_fresh(self) -> bool:
+        """Loaded for today and refreshed recently enough to trust."""
+        return (
+            self.loaded_at is not None
+            and self.date == _now().date().isoformat()
+            and time.monotonic() - self.loaded_at < max(3 * self.refresh_interval, 300)
+        )
+
+    def request_refresh(self):
+        self._refresh_wanted.set()
+
+    # --- loading -----------------------------------------------------------
+
+    @staticmethod
+    def _events(result: dict[str, Any]) -> list[dict[str, Any]]:
+        payload = result.get("result")
+        if isinstance(payload, str):
+            payload = json.loads(payload)
+        if isinstance(payload, dict):
+            payload = payload.get("events", payload.get("items", []))
+        if not isinstance(payload, list):
+            raise ValueError(f"Unexpected roster payload: {type(payload).__name__}")
+        return [event for event in payload if isinstance(event, dict)]
+
+    async def refresh(self) -> bool:
+        date = _now().date().isoformat()
+        try:
+            result = await self.mcp.execute_function(ROSTER_TOOL, {"date": date})
+            if not result.get("success"):
+                raise RuntimeError(result.get("error") or result.get("result"))
+            bookings = [b for b in map(Booking, self._events(result)) if b.start is not None]
+        except Exception as e:
+            self.stats["refresh_errors"] += 1
+            self.last_error = str(e)
+            logger.warning(f"Arrival roster refresh failed: {e}")
+            return False
+
+        by_email: dict[str, list[Booking]] = {}
+        by_name: dict[str, list[Booking]] = {}
+        for booking in bookings:
+            if booking.email:
+                by_email.setdefault(booking.email, []).append(booking)
+            if name := normalize_name(booking.name):
+                by_name.setdefault(name, []).append(booking)
+        # Swap whole indexes so lookups never see a half-built roster
+        self.bookings, self._by_email, self._by_name = bookings, by_email, by_name
+        self.date = date
+        self.loaded_at = time.monotonic()
+        self.last_error = None
+        self.stats["refreshes"] += 1
+        logger.info("Arrival roster loaded: %d bookings for %s", len(bookings), date)
+        return True
+
+    async def run(self):
+        """Refresh loop: periodically, on date change and on request."""
+        while True:
+            if not await self.refresh():
+                await asyncio.sleep(min(30.0, self.refresh_interval))
+                continue
+            try:
+                await asyncio.wait_for(self._refresh_wanted.wait(), self.refresh_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._refresh_wanted.clear()
+
+    # --- verification --------------------------------------------------------
+
+    def _match(self, email: str | None, name: str | None) -> list[Booking]:
+        if email and (found := self._by_email.get(email.strip().lower())):
+            return found
+        wanted = normalize_name(name or "")
+        if not wanted:
+            return []
+        if found := self._by_name.get(wanted):
+            return found
+        # "Budi" or "Budi Santoso" against a booking under "Budi Santoso Wijaya"
+        words = set(wanted.split())
+        return [
+            booking for key, bookings in self._by_name.items()
+            if words <= set(key.split())
+            for booking in bookings
+        ]
+
+    async def verify(
+        self,
+        arguments: dict[str, Any],
+        lookup: Callable[[str, dict[str, Any]], Awaitable[dict[str, Any]]] | None = None,
+    ) -> dict[str, Any]:
+        """
+        verify_arrival tool: booking plus verdict, or the n8n lookup as a fallback.
+        `lookup` runs the fallback tool call (default: straight to the MCP pool).
+        """
+        email = arguments.get("email")
+        name = arguments.get("name")
+        now = _now()
+        if self.is_fresh:
+            matches = self._match(email, name)
+            if matches:
+                self.stats["hits"] += 1
+                # Several bookings today: the timed one whose start is closest to now
+                matches = sorted(matches, key=lambda b: (b.all_day, abs(b.verdict(now)[1])))
+                unique_people = {b.email or normalize_name(b.name) for b in matches}
+                if len(unique_people) > 1:
+                    return {
+                        "found": False,
+                        "ambiguous": True,
+                        "result": "Beberapa tamu cocok dengan nama ini. Minta email reservasi.",
+                        "candidates": sorted({b.name for b in matches}),
+                        "success": True,
+                    }
+                return {**matches[0].to_result(now), "bookings_today": len(matches), "success": True}
+        self.stats["misses"] += 1
+
+        if not email:
+            return {
+                "found": False,
+                "result": "Data belum ditemukan. Minta email reservasi tamu.",
+                "success": False,
+            }
+        self.stats["fallbacks"] += 1
+        result = await (lookup or self.mcp.execute_function)("lookup_appointment", {"email": email})
+        return {
+            **result,
+            "verdict": "unknown",
+            "server_time": now.replace(microsecond=0).isoformat(),
+            "rules": f"early > {ROSTER_EARLY_MINUTES} min before start, late > {ROSTER_LATE_MINUTES} min after",
+        }
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "fresh": self.is_fresh,
+            "date": self.date,
+            "bookings": len(self.bookings),
+            "age_s": round(time.monotonic() - self.loaded_at, 1) if self.loaded_at is not None else None,
+            "last_error": self.last_error,
+            **self.stats,
+        }
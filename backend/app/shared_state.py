@@ -0,0 +1,389 @@
+"""Pluggable shared-state backends used across uvicorn workers.
+
+STATE_BACKEND=memory  per-process dict (single worker, previous behaviour)
+STATE_BACKEND=sqlite  WAL-mode SQLite file shared by every worker on the host;
+                      point STATE_PATH at /dev/shm for a RAM-backed file
+STATE_BACKEND=redis   any Redis-protocol server at STATE_URL. For a local
+                      stand-in without Redis installed, run:
+                          python -m app.shared_state serve --port 6380
+
+All backends expose the same small key/value API with expiry, atomic
+counters and set-if-absent locks; values are bytes.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse
+
+from .config import STATE_BACKEND, STATE_PATH, STATE_URL
+
+logger = logging.getLogger(__name__)
+
+
+class SharedState:
+    """Key/value store interface. `ttl` is in seconds; None means no expiry."""
+
+    async def get(self, key: str) -> bytes | None:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: float | None = None, nx: bool = False) -> bool:
+        """Store `value`; with `nx` only if the key is absent. Returns True if stored."""
+        raise NotImplementedError
+
+    async def delete(self, key: str):
+        raise NotImplementedError
+
+    async def incr(self, key: str) -> int:
+        raise NotImplementedError
+
+    async def acquire(self, key: str, ttl: float) -> bool:
+        """Try to take a lock that expires by itself after `ttl` seconds."""
+        return await self.set(key, b"1", ttl=ttl, nx=True)
+
+    async def release(self, key: str):
+        await self.delete(key)
+
+    async def close(self):
+        pass
+
+
+class MemoryState(SharedState):
+    """Process-local backend."""
+
+    def __init__(self):
+        self._data: dict[str, tuple[bytes, float | None]] = {}
+
+    def _live(self, key: str) -> bytes | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires = entry
+        if expires is not None and expires <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    async def get(self, key: str) -> bytes | None:
+        return self._live(key)
+
+    async def set(self, key: str, value: bytes, ttl: float | None = None, nx: bool = False) -> bool:
+        if nx and self._live(key) is not None:
+            return False
+        if len(self._data) >= 10_000:
+            for stale in [k for k in self._data if self._live(k) is None]:
+                self._data.pop(stale, None)
+        self._data[key] = (value, time.monotonic() + ttl if ttl else None)
+        return True
+
+    async def delete(self, key: str):
+        self._data.pop(key, None)
+
+    async def incr(self, key: str) -> int:
+        value = int(self._live(key) or 0) + 1
+        self._data[key] = (str(value).encode(), None)
+        return value
+
+
+class SQLiteState(SharedState):
+    """SQLite file shared by all worker processes on one host."""
+
+    def __init__(self, path: str = STATE_PATH):
+        self.path = path
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS kv ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _run(self, fn):
+        with self._lock:
+            return fn(self._connect())
+
+    def _get(self, conn: sqlite3.Connection, key: str) -> bytes | None:
+        row = conn.execute(
+            "SELECT value FROM kv WHERE key = ? AND (expires IS NULL OR expires > ?)",
+            (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def _set(self, conn: sqlite3.Connection, key: str, value: bytes, ttl: float | None, nx: bool) -> bool:
+        now = time.time()
+        expires = now + ttl if ttl else None
+        if nx:
+            # Insert, or take over an expired row; no-op if a live row exists
+            cursor = conn.execute(
+                "INSERT INTO kv (key, value, expires) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires = excluded.expires "
+                "WHERE kv.expires IS NOT NULL AND kv.expires <= ?",
+                (key, value, expires, now)
+            )
+        else:
+            cursor = conn.execute(
+                "INSERT OR REPLACE INTO kv (key, value, expires) VALUES (?, ?, ?)",
+                (key, value, expires)
+            )
+        self._writes += 1
+        if self._writes % 500 == 0:
+            conn.execute("DELETE FROM kv WHERE expires IS NOT NULL AND expires <= ?", (now,))
+        return cursor.rowcount > 0
+
+    def _incr(self, conn: sqlite3.Connection, key: str) -> int:
+        row = conn.execute(
+            "INSERT INTO kv (key, value, expires) VALUES (?, '1', NULL) "
+            "ON CONFLICT(key) DO UPDATE SET value = CAST(kv.value AS INTEGER) + 1 "
+            "RETURNING value",
+            (key,)
+        ).fetchone()
+        return int(row[0])
+
+    async def get(self, key: str) -> bytes | None:
+        return await asyncio.to_thread(self._run, lambda conn: self._get(conn, key))
+
+    async def set(self, key: str, value: bytes, ttl: float | None = None, nx: bool = False) -> bool:
+        return await asyncio.to_thread(self._run, lambda conn: self._set(conn, key, value, ttl, nx))
+
+    async def delete(self, key: str):
+        await asyncio.to_thread(self._run, lambda conn: conn.execute("DELETE FROM kv WHERE key = ?", (key,)))
+
+    async def incr(self, key: str) -> int:
+        return await asyncio.to_thread(self._run, lambda conn: self._incr(conn, key))
+
+    async def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class RESPError(Exception):
+    """Error reply from a Redis-protocol server."""
+
+
+async def _read_reply(reader: asyncio.StreamReader):
+    line = (await reader.readline()).rstrip(b"\r\n")
+    if not line:
+        raise ConnectionError("Connection closed by state server")
+    kind, rest = line[:1], line[1:]
+    if kind == b"+":
+        return rest
+    if kind == b"-":
+        raise RESPError(rest.decode())
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        length = int(rest)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        count = int(rest)
+        return None if count < 0 else [await _read_reply(reader) for _ in range(count)]
+    raise RESPError(f"Unexpected reply: {line[:50]!r}")
+
+
+def _encode_command(*args) -> bytes:
+    parts = [f"*{len(args)}\r\n".encode()]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+class RedisState(SharedState):
+    """Minimal Redis-protocol (RESP2) client: one connection, commands serialized."""
+
+    def __init__(self, url: str = STATE_URL):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._lock = asyncio.Lock()
+
+    async def _connect(self):
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), timeout=5.0
+        )
+        if self.password:
+            await self._roundtrip("AUTH", self.password)
+        if self.db:
+            await self._roundtrip("SELECT", self.db)
+
+    async def _roundtrip(self, *args):
+        self._writer.write(_encode_command(*args))
+        await self._writer.drain()
+        return await asyncio.wait_for(_read_reply(self._reader), timeout=5.0)
+
+    async def _command(self, *args, idempotent: bool = True):
+        """
+        Run one command. Any failure mid-roundtrip, cancellation included,
+        drops the connection so its unread reply can't be taken by the next
+        command. Connection errors are retried once on a new connection,
+        unless the command was already sent and is not idempotent.
+        """
+        async with self._lock:
+            for attempt in range(2):
+                sent = False
+                try:
+                    if self._writer is None or self._writer.is_closing():
+                        await self._connect()
+                    sent = True
+                    return await self._roundtrip(*args)
+                except (ConnectionError, OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+                    self._drop()
+                    if attempt or (sent and not idempotent):
+                        raise
+                except BaseException:
+                    self._drop()
+                    raise
+
+    def _drop(self):
+        """Close the connection without waiting (safe while being cancelled)."""
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def _disconnect(self):
+        writer = self._writer
+        self._drop()
+        if writer is not None:
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    async def get(self, key: str) -> bytes | None:
+        return await self._command("GET", key)
+
+    async def set(self, key: str, value: bytes, ttl: float | None = None, nx: bool = False) -> bool:
+        args = ["SET", key, value]
+        if ttl:
+            args += ["PX", max(1, int(ttl * 1000))]
+        if nx:
+            args.append("NX")
+        # A resent SET NX would find its own first write and report failure
+        return await self._command(*args, idempotent=not nx) is not None
+
+    async def delete(self, key: str):
+        await self._command("DEL", key)
+
+    async def incr(self, key: str) -> int:
+        return await self._command("INCR", key, idempotent=False)
+
+    async def close(self):
+        async with self._lock:
+            await self._disconnect()
+
+
+BACKENDS = {
+    "memory": MemoryState,
+    "sqlite": SQLiteState,
+    "redis": RedisState,
+}
+
+
+def create_state(backend: str = STATE_BACKEND) -> SharedState:
+    if backend not in BACKENDS:
+        logger.warning(f"Unknown STATE_BACKEND '{backend}', using memory")
+        backend = "memory"
+    return BACKENDS[backend]()
+
+
+# --- Local Redis-protocol stand-in -------------------------------------------
+
+
+async def serve(host: str = "127.0.0.1", port: int = 6380):
+    """Serve the subset of Redis commands the backend uses, from memory."""
+    store = MemoryState()
+
+    def reply(value) -> bytes:
+        if value is None:
+            return b"$-1\r\n"
+        if isinstance(value, bool):
+            return b"+OK\r\n" if value else b"$-1\r\n"
+        if isinstance(value, int):
+            return b":%d\r\n" % value
+        if isinstance(value, str):
+            return b"+%s\r\n" % value.encode()
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+
+    async def execute(args: list[bytes]) -> bytes:
+        command = args[0].upper().decode()
+        if command == "PING":
+            return reply("PONG")
+        if command in ("AUTH", "SELECT"):
+            return reply("OK")
+        if command == "GET":
+            return reply(await store.get(args[1].decode()))
+        if command == "SET":
+            options = [a.upper() for a in args[3:]]
+            ttl = None
+            if b"PX" in options:
+                ttl = int(args[3 + options.index(b"PX") + 1]) / 1000
+            elif b"EX" in options:
+                ttl = float(args[3 + options.index(b"EX") + 1])
+            return reply(await store.set(args[1].decode(), args[2], ttl=ttl, nx=b"NX" in options))
+        if command == "DEL":
+            keys = [a.decode() for a in args[1:]]
+            existing = [k for k in keys if await store.get(k) is not None]
+            for key in keys:
+                await store.delete(key)
+            return reply(len(existing))
+        if command == "INCR":
+            return reply(await store.incr(args[1].decode()))
+        return f"-ERR unknown command '{command}'\r\n".encode()
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                args = await _read_reply(reader)
+                if not isinstance(args, list) or not args:
+                    break
+                writer.write(await execute(args))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, RESPError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    logger.info(f"Shared-state stand-in listening on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main_cli(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Local Redis-protocol stand-in for STATE_BACKEND=redis")
+    parser.add_argument("command", choices=["serve"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6380)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,150 @@
+"""Startup benchmark: import time, time to /health and to the first accepted /ws/call.
+
+Usage (from backend/):
+    python -m app.startup_bench [--runs 5] [--mcp-delay 2.0] [--app-dir <backend dir>]
+
+Each run starts a fresh interpreter for the import measurement and a fresh
+uvicorn process for the serving measurements. N8N_MCP_URL points at a local
+stub that answers after --mcp-delay seconds, standing in for a slow n8n, so
+a startup that waits for MCP shows up in the numbers. --app-dir runs the
+same measurement against another checkout (e.g. a worktree of an older
+commit) for before/after comparisons. Prints a JSON report with medians.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import websockets
+
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - t)"
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _slow_mcp_stub(delay: float) -> ThreadingHTTPServer:
+    """Answers every JSON-RPC POST with an empty result after `delay` seconds."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            time.sleep(delay)
+            payload = json.dumps({"jsonrpc": "2.0", "id": body.get("id"), "result": {}}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Mcp-Session-Id", "bench")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", _free_port()), Handler)
+    server.handle_error = lambda request, client_address: None  # app killed mid-request
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _measure_import(app_dir: str, env: dict[str, str]) -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=app_dir, env=env, capture_output=True, text=True, check=True,
+    )
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+async def _first_ws_accept(url: str, started: float, timeout: float) -> float:
+    deadline = started + timeout
+    while time.perf_counter() < deadline:
+        try:
+            async with websockets.connect(url, open_timeout=timeout):
+                return time.perf_counter() - started
+        except (OSError, websockets.exceptions.InvalidHandshake):
+            await asyncio.sleep(0.01)
+    raise TimeoutError("no /ws/call accept")
+
+
+def _measure_serving(app_dir: str, env: dict[str, str], timeout: float) -> tuple[float, float]:
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=app_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        health = None
+        with httpx.Client() as client:
+            while time.perf_counter() - started < timeout:
+                try:
+                    if client.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                        health = time.perf_counter() - started
+                        break
+                except httpx.HTTPError:
+                    time.sleep(0.01)
+        if health is None:
+            raise TimeoutError("/health never answered")
+        accept = asyncio.run(
+            _first_ws_accept(f"ws://127.0.0.1:{port}/ws/call?persona=sari", started, timeout)
+        )
+        return health, accept
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def bench(app_dir: str, runs: int = 5, mcp_delay: float = 2.0, timeout: float = 60.0) -> dict:
+    stub = _slow_mcp_stub(mcp_delay)
+    env = {
+        **os.environ,
+        "GEMINI_API_KEY": "bench",
+        "N8N_MCP_URL": f"http://127.0.0.1:{stub.server_address[1]}/mcp",
+        "CALL_RECORDING": "false",
+        "PYTHONDONTWRITEBYTECODE": "1",
+    }
+    samples: dict[str, list[float]] = {"import_s": [], "health_s": [], "first_ws_accept_s": []}
+    try:
+        for _ in range(runs):
+            samples["import_s"].append(_measure_import(app_dir, env))
+            health, accept = _measure_serving(app_dir, env, timeout)
+            samples["health_s"].append(health)
+            samples["first_ws_accept_s"].append(accept)
+    finally:
+        stub.shutdown()
+    return {
+        "app_dir": os.path.abspath(app_dir),
+        "runs": runs,
+        "mcp_delay_s": mcp_delay,
+        "median": {key: round(statistics.median(values), 3) for key, values in samples.items()},
+        "max": {key: round(max(values), 3) for key, values in samples.items()},
+    }
+
+
+def main_cli(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Measure backend startup and first-call latency")
+    parser.add_argument("--app-dir", default=".", help="backend directory to measure")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--mcp-delay", type=float, default=2.0, help="seconds the stub n8n takes per request")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args(argv)
+    print(json.dumps(bench(args.app_dir, args.runs, args.mcp_delay, args.timeout), indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
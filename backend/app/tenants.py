@@ -0,0 +1,229 @@
+"""Tenant registry: several venues served by one process.
+
+Without TENANTS_FILE there is a single "default" tenant built from config.py
+(the Sari/Reza personas and the global MCP bridge), so single-venue
+deployments behave as before. With TENANTS_FILE, each entry adds a venue:
+
+    {
+      "tenants": {
+        "bistro-a": {
+          "name": "Bistro A",
+          "token": "secret-for-bistro-a",
+          "mcp_url": "https://n8n.example.com/mcp/bistro-a",
+          "auth_token": "Bearer ...",
+          "mcp_pool_size": 1,
+          "max_concurrent_calls": 5,
+          "tool_mapping": {"client_lookup": "<workflow id>", ...},
+          "default_persona": "sari",
+          "personas": {
+            "sari": {"instruction_file": "bistro-a/sari.md", "voice": "Aoede"}
+          }
+        }
+      }
+    }
+
+Every tenant other than "default" must set personas, mcp_url, auth_token and
+tool_mapping; a missing one is a load error rather than a silent fallback to
+the default venue's prompts, workflows and credentials. Only a "default"
+entry inherits the env values for whatever it leaves out.
+
+Calls pick a tenant by path (/ws/call/<tenant>) or by token (?token= or
+X-Tenant-Token header). Each tenant has its own MCP pool, its own tool-cache
+namespace in the shared state backend, LiveConnectConfig templates built
+once per persona (declaring only the tools in its tool_mapping plus the
+in-process ones), and a concurrent-call quota.
+"""
+
+import json
+import logging
+import os
+from typing import Any
+
+from .config import (
+    TENANTS_FILE, TENANT_MAX_CALLS, MCP_POOL_SIZE,
+    SARI_INSTRUCTION, REZA_INSTRUCTION
+)
+from .mcp_bridge import MCPBridgePool, mcp_bridge
+from .roster import ArrivalRoster
+from .tool_cache import ToolCache
+from .tools import tool_declarations_for
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TENANT = "default"
+
+# Fields a non-default tenant must set (the default tenant falls back to env)
+REQUIRED_FIELDS = ("personas", "mcp_url", "auth_token", "tool_mapping")
+
+DEFAULT_PERSONAS = {
+    "sari": {"instruction": SARI_INSTRUCTION, "voice": "Aoede"},
+    "reza": {"instruction": REZA_INSTRUCTION, "voice": "Puck"},
+}
+
+
+class Tenant:
+    """One venue: personas, MCP endpoint, cache namespace and call quota."""
+
+    def __init__(
+        self,
+        tenant_id: str,
+        mcp: MCPBridgePool,
+        personas: dict[str, dict[str, str]],
+        name: str | None = None,
+        token: str | None = None,
+        default_persona: str | None = None,
+        max_concurrent_calls: int = TENANT_MAX_CALLS,
+    ):
+        self.tenant_id = tenant_id
+        self.name = name or tenant_id
+        self.token = token
+        self.mcp = mcp
+        self.roster = ArrivalRoster(mcp)
+        self.personas = {key.lower(): value for key, value in personas.items()}
+        self.default_persona = (default_persona or next(iter(self.personas))).lower()
+        self.max_concurrent_calls = max_concurrent_calls
+        self.rejected_calls = 0
+        self._live_configs: dict[str, Any] = {}
+
+    def resolve_persona(self, persona: str | None) -> str:
+        persona = (persona or "").lower()
+        return persona if persona in self.personas else self.default_persona
+
+    def live_config(self, persona: str):
+        """LiveConnectConfig template for `persona`, built on first use."""
+        config = self._live_configs.get(persona)
+        if config is None:
+            from google.genai import types
+
+            spec = self.personas[persona]
+            # EXACT Shila pattern
+            config = types.LiveConnectConfig(
+                response_modalities=["AUDIO"],
+                output_audio_transcription={},
+                input_audio_transcription={},
+                speech_config=types.SpeechConfig(
+                    voice_config=types.VoiceConfig(
+                        prebuilt_voice_config=types.PrebuiltVoiceConfig(
+                            voice_name=spec.get("voice", "Aoede")
+                        )
+                    )
+                ),
+                system_instruction=spec["instruction"],
+                # Only tools this venue's n8n can run, plus the in-process ones
+                tools=tool_declarations_for(self.mcp.tool_mapping)
+            )
+            self._live_configs[persona] = config
+        return config
+
+    def connect_config(self, persona: str, preamble: str):
+        """Per-call copy of the persona template with `preamble` prepended to the instruction."""
+        template = self.live_config(persona)
+        return template.model_copy(update={
+            "system_instruction": preamble + self.personas[persona]["instruction"]
+        })
+
+
+class TenantRegistry:
+    """Tenants by id and by token."""
+
+    def __init__(self):
+        self.tenants: dict[str, Tenant] = {
+            DEFAULT_TENANT: Tenant(DEFAULT_TENANT, mcp_bridge, DEFAULT_PERSONAS, name="Default")
+        }
+        self._by_token: dict[str, Tenant] = {}
+        self._loaded_from: str | None = None
+
+    def load(self, path: str = TENANTS_FILE):
+        """Add tenants from a registry file (entries may replace "default"); loads each file once."""
+        if not path or path == self._loaded_from:
+            return
+        with open(path, encoding="utf-8") as f:
+            spec = json.load(f)
+        base_dir = os.path.dirname(os.path.abspath(path))
+        for tenant_id, entry in spec.get("tenants", {}).items():
+            tenant = self._build(tenant_id, entry, base_dir)
+            self.tenants[tenant_id] = tenant
+            if tenant.token:
+                self._by_token[tenant.token] = tenant
+        self._loaded_from = path
+        logger.info(f"Loaded {len(self.tenants)} tenants from {path}")
+
+    def _build(self, tenant_id: str, entry: dict[str, Any], base_dir: str) -> Tenant:
+        if tenant_id != DEFAULT_TENANT:
+            missing = [field for field in REQUIRED_FIELDS if not entry.get(field)]
+            if missing:
+                raise ValueError(f"Tenant '{tenant_id}' must set {', '.join(missing)}")
+        personas = {}
+        for persona, persona_spec in (entry.get("personas") or DEFAULT_PERSONAS).items():
+            persona_spec = dict(persona_spec)
+            if instruction_file := persona_spec.pop("instruction_file", None):
+                with open(os.path.join(base_dir, instruction_file), encoding="utf-8") as f:
+                    persona_spec["instruction"] = f.read()
+            if "instruction" not in persona_spec:
+                raise ValueError(f"Tenant '{tenant_id}' persona '{persona}' has no instruction")
+            personas[persona] = persona_spec
+
+        mcp = MCPBridgePool(
+            size=entry.get("mcp_pool_size", MCP_POOL_SIZE),
+            mcp_url=entry.get("mcp_url"),
+            auth_token=entry.get("auth_token"),
+            tool_mapping=entry.get("tool_mapping"),
+            # One state backend for all tenants, keys namespaced per tenant
+            cache=ToolCache(state=mcp_bridge.cache.state, namespace=tenant_id),
+        )
+        return Tenant(
+            tenant_id,
+            mcp,
+            personas,
+            name=entry.get("name"),
+            token=entry.get("token"),
+            default_persona=entry.get("default_persona"),
+            max_concurrent_calls=entry.get("max_concurrent_calls", TENANT_MAX_CALLS),
+        )
+
+    def precompile(self):
+        """Build every tenant's LiveConnectConfig templates (imports google.genai)."""
+        for tenant in self.tenants.values():
+            for persona in tenant.personas:
+                tenant.live_config(persona)
+
+    def resolve(self, tenant_id: str | None, token: str | None) -> Tenant | None:
+        """Tenant for a call by path id (token checked if the tenant has one) or by token."""
+        if tenant_id is None and token:
+            return self._by_token.get(token)
+        tenant = self.tenants.get(tenant_id or DEFAULT_TENANT)
+        if tenant is not None and tenant.token and token != tenant.token:
+            return None
+        return tenant
+
+    def extra_pools(self) -> list[tuple[str, MCPBridgePool]]:
+        """MCP pools other than the global bridge (started and closed by main)."""
+        return [
+            (tenant.tenant_id, tenant.mcp)
+            for tenant in self.tenants.values()
+            if tenant.mcp is not mcp_bridge
+        ]
+
+    async def close(self):
+        for _, pool in self.extra_pools():
+            await pool.close()
+
+    def status(self, active_calls: dict[str, int]) -> list[dict[str, Any]]:
+        return [
+            {
+                "tenant": tenant.tenant_id,
+                "name": tenant.name,
+                "personas": sorted(tenant.personas),
+                "active_calls": active_calls.get(tenant.tenant_id, 0),
+                "max_concurrent_calls": tenant.max_concurrent_calls,
+                "rejected_calls": tenant.rejected_calls,
+                "mcp_ready": tenant.mcp.is_ready,
+                "roster": tenant.roster.status(),
+                "tool_cache": tenant.mcp.cache.summary(),
+            }
+            for tenant in self.tenants.values()
+        ]
+
+
+# Global instance
+tenant_registry = TenantRegistry()
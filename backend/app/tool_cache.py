@@ -0,0 +1,170 @@
+"""Shared tool-result cache with single-flight for read-only n8n workflows.
+
+Lookups (client_lookup, lookup_appointment, check_availability) are cached in
+the shared-state backend, so every worker reuses a result that any worker
+fetched. Concurrent misses for the same key across workers are collapsed: one
+caller takes a short lock and queries n8n, the rest wait for its result.
+
+Each cached tool belongs to an index namespace (CRM, appointments,
+availability). Cache keys embed the namespace's version counter, and tools
+that write to n8n bump the counters they affect, which invalidates every
+worker's entries at once. Writes made outside this backend (the n8n UI,
+other channels) bump nothing, so caching is off unless TOOL_CACHE_TTL > 0
+and that TTL bounds how stale a cached slot list can be.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable
+
+from .config import TOOL_CACHE_TTL, TOOL_CACHE_WAIT
+from .shared_state import SharedState, create_state
+
+logger = logging.getLogger(__name__)
+
+# Read-only tools -> index namespace
+CACHED_TOOLS = {
+    "client_lookup": "crm",
+    "lookup_appointment": "appointments",
+    "check_availability": "availability",
+}
+
+# Write tools -> namespaces whose cached reads they make stale
+INVALIDATES = {
+    "create_client": ("crm",),
+    "book_event": ("availability", "appointments"),
+    "reschedule_appointment": ("availability", "appointments"),
+    "cancel_appointment": ("availability", "appointments"),
+}
+
+
+class ToolCache:
+    """Cross-worker cache and single-flight in front of `MCPBridgePool.execute_function`."""
+
+    def __init__(
+        self,
+        state: SharedState | None = None,
+        ttl: float = TOOL_CACHE_TTL,
+        wait: float = TOOL_CACHE_WAIT,
+        lock_ttl: float = 130.0,
+        namespace: str = "",
+    ):
+        self._owns_state = state is None
+        self.state = state or create_state()
+        # Key prefix separating tenants that share one state backend
+        self.prefix = f"{namespace}:" if namespace else ""
+        self.ttl = ttl
+        self.wait = wait
+        self.lock_ttl = lock_ttl  # Longer than the tools/call timeout
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "invalidations": 0, "errors": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    async def _key(self, name: str, arguments: dict[str, Any]) -> str:
+        namespace = CACHED_TOOLS[name]
+        version = int(await self.state.get(f"{self.prefix}ns:{namespace}") or 0)
+        digest = hashlib.sha1(
+            json.dumps(arguments or {}, sort_keys=True, ensure_ascii=False).encode()
+        ).hexdigest()
+        return f"{self.prefix}tool:{namespace}:{version}:{name}:{digest}"
+
+    async def _cached(self, key: str) -> dict[str, Any] | None:
+        raw = await self.state.get(key)
+        return json.loads(raw) if raw is not None else None
+
+    async def _store(self, key: str, result: dict[str, Any]):
+        # Failures (including "not found") are not cached
+        if result.get("success"):
+            await self.state.set(key, json.dumps(result, ensure_ascii=False).encode(), ttl=self.ttl)
+
+    async def execute(
+        self,
+        name: str,
+        arguments: dict[str, Any],
+        run: Callable[[], Awaitable[dict[str, Any]]],
+    ) -> dict[str, Any]:
+        """Return the result of `run()`, served from or stored to the shared cache."""
+        if not self.enabled:
+            return await run()
+        if name in INVALIDATES:
+            result = await run()
+            if result.get("success"):
+                await self._invalidate(INVALIDATES[name])
+            return result
+        if name not in CACHED_TOOLS:
+            return await run()
+
+        try:
+            key = await self._key(name, arguments)
+            if (cached := await self._cached(key)) is not None:
+                self.stats["hits"] += 1
+                return cached
+            lock = f"lock:{key}"
+            if not await self.state.acquire(lock, self.lock_ttl):
+                if (cached := await self._wait_for(key, lock)) is not None:
+                    self.stats["coalesced"] += 1
+                    return cached
+                if not await self.state.acquire(lock, self.lock_ttl):
+                    # Leader is still running past TOOL_CACHE_WAIT; don't hold the caller
+                    self.stats["misses"] += 1
+                    return await run()
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Tool cache unavailable, calling n8n directly: {e}")
+            return await run()
+
+        self.stats["misses"] += 1
+        try:
+            result = await run()
+            try:
+                await self._store(key, result)
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.warning(f"Tool cache store failed: {e}")
+            return result
+        finally:
+            try:
+                await self.state.release(lock)
+            except Exception:
+                pass  # expires on its own
+
+    async def _wait_for(self, key: str, lock: str) -> dict[str, Any] | None:
+        """Wait for the single-flight leader to publish `key`."""
+        deadline = time.monotonic() + self.wait
+        delay = 0.02
+        while time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.25)
+            if (cached := await self._cached(key)) is not None:
+                return cached
+            if await self.state.get(lock) is None:
+                # Leader finished without a cacheable result
+                return await self._cached(key)
+        return None
+
+    async def _invalidate(self, namespaces: tuple[str, ...]):
+        try:
+            for namespace in namespaces:
+                await self.state.incr(f"{self.prefix}ns:{namespace}")
+            self.stats["invalidations"] += 1
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Tool cache invalidation failed for {namespaces}: {e}")
+
+    def summary(self) -> dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["coalesced"] + self.stats["misses"]
+        return {
+            "backend": type(self.state).__name__,
+            "ttl_s": self.ttl,
+            **self.stats,
+            "hit_rate": round((self.stats["hits"] + self.stats["coalesced"]) / lookups, 3) if lookups else None,
+        }
+
+    async def close(self):
+        if self._owns_state:
+            await self.state.close()
@@ -0,0 +1,111 @@
+"""Cost of persisting call transcripts, per sink.
+
+Usage (from backend/):
+    python -m app.transcript_bench [--records 2000] [--turns 20] [--batch-size 50]
+
+For each sink (jsonl, sqlite) in a temporary directory, submits `records`
+synthetic transcripts of `turns` entries to a TranscriptWriter in bursts of
+BURST (many calls hanging up together), then closes it. Reports the time
+each submit() held the event loop, the event-loop lag measured by
+monitor_loop_lag while the writer worked, and how long the writer took to
+drain everything to disk. For comparison, `inline_write_ms` is what writing
+one transcript synchronously on the event loop would block it for.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from .logging_setup import lag_summary, monitor_loop_lag
+from .transcripts import TranscriptWriter
+
+SINKS = ["jsonl", "sqlite"]
+BURST = 100
+
+
+def _record(index: int, turns: int) -> dict:
+    now = time.time()
+    return {
+        "call_id": f"bench-{index:06d}",
+        "persona": "sari",
+        "started_at": now - 120,
+        "ended_at": now,
+        "entries": [
+            {"role": "user" if turn % 2 else "model", "t": turn * 3.5,
+             "text": "Selamat pagi, saya ingin membuat janji temu untuk minggu depan. " * 2}
+            for turn in range(turns)
+        ],
+    }
+
+
+async def _run(writer: TranscriptWriter, records: list[dict]) -> dict:
+    samples: list[float] = []
+    probe = asyncio.create_task(monitor_loop_lag(0.005, report_every=float("inf"), samples=samples))
+    writer.start()
+    submit_s = []
+    started = time.perf_counter()
+    for position in range(0, len(records), BURST):
+        for record in records[position:position + BURST]:
+            before = time.perf_counter()
+            writer.submit(record)
+            submit_s.append(time.perf_counter() - before)
+        await asyncio.sleep(0.001)
+    await writer.close()
+    drain_s = time.perf_counter() - started
+    probe.cancel()
+    await asyncio.gather(probe, return_exceptions=True)
+    return {
+        "submit_us_p50": round(statistics.median(submit_s) * 1e6, 1),
+        "submit_us_max": round(max(submit_s) * 1e6, 1),
+        "written": writer.written,
+        "dropped": writer.dropped,
+        "drain_s": round(drain_s, 3),
+        "records_per_s": round(writer.written / drain_s),
+        "loop_lag": lag_summary(samples or [0.0]),
+    }
+
+
+def _inline_write_ms(sink: str, path: str, records: list[dict]) -> float:
+    writer = TranscriptWriter(sink=sink, path=path)
+    durations = []
+    for record in records:
+        before = time.perf_counter()
+        writer._write_batch([record])
+        durations.append(time.perf_counter() - before)
+    if writer._db is not None:
+        writer._db.close()
+    return round(statistics.median(durations) * 1000, 3)
+
+
+def bench(records: int = 2000, turns: int = 20, batch_size: int = 50) -> dict:
+    payload = [_record(index, turns) for index in range(records)]
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for sink in SINKS:
+            extension = "db" if sink == "sqlite" else "jsonl"
+            writer = TranscriptWriter(
+                sink=sink, path=os.path.join(directory, f"batched.{extension}"),
+                batch_size=batch_size, flush_interval=2.0, max_pending=records + 1,
+            )
+            results[sink] = asyncio.run(_run(writer, payload))
+            results[sink]["inline_write_ms"] = _inline_write_ms(
+                sink, os.path.join(directory, f"inline.{extension}"), payload[:200]
+            )
+    return {"records": records, "turns": turns, "batch_size": batch_size, "results": results}
+
+
+def main_cli(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Measure transcript persistence cost per sink")
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--turns", type=int, default=20, help="entries per transcript")
+    parser.add_argument("--batch-size", type=int, default=50)
+    args = parser.parse_args(argv)
+    print(json.dumps(bench(args.records, args.turns, args.batch_size), indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
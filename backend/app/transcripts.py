@@ -0,0 +1,173 @@
+"""Call transcript collection and a batched write-behind transcript sink."""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import Any
+
+from .config import (
+    TRANSCRIPT_SINK, TRANSCRIPT_PATH, TRANSCRIPT_BATCH_SIZE,
+    TRANSCRIPT_FLUSH_INTERVAL, TRANSCRIPT_MAX_PENDING
+)
+
+logger = logging.getLogger(__name__)
+
+
+class CallTranscript:
+    """Collects streamed transcription fragments for one call, merged per speaker turn."""
+
+    def __init__(self, call_id: str, persona: str):
+        self.call_id = call_id
+        self.persona = persona
+        self.started_at = time.time()
+        self.entries: list[dict[str, Any]] = []
+
+    def add(self, role: str, text: str):
+        if self.entries and self.entries[-1]["role"] == role:
+            self.entries[-1]["text"] += text
+        else:
+            self.entries.append({
+                "role": role,
+                "text": text,
+                "t": round(time.time() - self.started_at, 2)
+            })
+
+    def to_record(self) -> dict[str, Any]:
+        return {
+            "call_id": self.call_id,
+            "persona": self.persona,
+            "started_at": self.started_at,
+            "ended_at": time.time(),
+            "entries": [{**entry, "text": entry["text"].strip()} for entry in self.entries]
+        }
+
+
+class TranscriptWriter:
+    """
+    Write-behind sink for finished transcripts.
+    `submit()` never blocks: records go onto a bounded queue and a background
+    task writes them in batches (size- or time-triggered) from a worker
+    thread, as appended JSONL lines or one SQLite transaction per batch.
+    """
+
+    def __init__(
+        self,
+        sink: str = TRANSCRIPT_SINK,
+        path: str = TRANSCRIPT_PATH,
+        batch_size: int = TRANSCRIPT_BATCH_SIZE,
+        flush_interval: float = TRANSCRIPT_FLUSH_INTERVAL,
+        max_pending: int = TRANSCRIPT_MAX_PENDING,
+    ):
+        self.sink = sink
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.written = 0
+        self.dropped = 0
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._db: sqlite3.Connection | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.sink in ("jsonl", "sqlite")
+
+    def start(self):
+        if not self.enabled or self._task is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Transcript writer started ({self.sink}: {self.path})")
+
+    def submit(self, record: dict[str, Any]) -> bool:
+        """Queue a transcript record for writing; drops it if the backlog is full."""
+        if self._queue is None:
+            return False
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(f"Transcript queue full, dropped call {record.get('call_id')}")
+            return False
+
+    async def _next_batch(self) -> tuple[list[dict[str, Any]], bool]:
+        """Collect up to `batch_size` records or until `flush_interval` passes.
+        Returns (batch, stop) where stop means the close sentinel was seen."""
+        first = await self._queue.get()
+        if first is None:
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                record = await asyncio.wait_for(self._queue.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            if record is None:
+                return batch, True
+            batch.append(record)
+        return batch, False
+
+    async def _run(self):
+        stop = False
+        while not stop:
+            batch, stop = await self._next_batch()
+            if not batch:
+                continue
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+                self.written += len(batch)
+            except Exception as e:
+                logger.error(f"Transcript write failed ({len(batch)} records): {e}")
+
+    def _write_batch(self, batch: list[dict[str, Any]]):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if self.sink == "jsonl":
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in batch))
+            return
+
+        if self._db is None:
+            # Only the writer task touches the connection, one batch at a time
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS transcripts ("
+                "call_id TEXT PRIMARY KEY, persona TEXT, started_at REAL, "
+                "ended_at REAL, entries TEXT)"
+            )
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?, ?, ?)",
+                [
+                    (r["call_id"], r["persona"], r["started_at"], r["ended_at"],
+                     json.dumps(r["entries"], ensure_ascii=False))
+                    for r in batch
+                ]
+            )
+
+    async def close(self):
+        """Stop the writer and flush whatever is still queued."""
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+        self._task = None
+        self._queue = None
+        logger.info(f"Transcript writer closed (written={self.written}, dropped={self.dropped})")
+
+
+# Global instance
+transcript_writer = TranscriptWriter()
@@ -0,0 +1,67 @@
+"""Regenerate short_call.crec, the recording the replay and soak tests drive.
+
+Usage (from backend/):
+    python tests/fixtures/make_short_call.py
+
+A Sari call in one turn: half a second of caller audio, an input
+transcription, a client_lookup round trip to n8n, a spoken answer with its
+output transcription, then end_call. Audio is silence, so the file is small.
+"""
+
+import asyncio
+import base64
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from google.genai import types  # noqa: E402
+
+from app.recorder import CallRecorder  # noqa: E402
+
+PATH = os.path.join(os.path.dirname(__file__), "short_call.crec")
+LOOKUP_PARAMS = {
+    "name": "execute_workflow",
+    "arguments": {
+        "workflowId": "PiHySWYpcDwjUq87",
+        "inputs": {"type": "webhook", "webhookData": {"body": {"email": "budi@example.com"}}},
+    },
+}
+
+
+async def record():
+    recorder = CallRecorder(PATH, {
+        "call_id": "fixture", "tenant": "default", "persona": "sari", "started_at": 0,
+        "sample_rate": 16000, "channels": 1, "output_rate": 24000, "codec": "pcm",
+    })
+    recorder.start()
+    for _ in range(12):  # 12 x 40 ms of 16 kHz silence
+        recorder.client_frame({"type": "audio", "data": base64.b64encode(bytes(1280)).decode()})
+        await asyncio.sleep(0.04)
+    recorder.gemini_message(types.LiveServerMessage(server_content=types.LiveServerContent(
+        input_transcription=types.Transcription(text="Email saya budi@example.com")
+    )))
+    recorder.gemini_message(types.LiveServerMessage(tool_call=types.LiveServerToolCall(function_calls=[
+        types.FunctionCall(id="call-1", name="client_lookup", args={"email": "budi@example.com"})
+    ])))
+    recorder.mcp_call(
+        LOOKUP_PARAMS,
+        {"jsonrpc": "2.0", "result": {"content": [{"type": "text", "text": "Member ditemukan: Budi"}]}},
+        0.3,
+    )
+    await asyncio.sleep(0.3)
+    recorder.gemini_message(types.LiveServerMessage(server_content=types.LiveServerContent(
+        model_turn=types.Content(parts=[types.Part(
+            inline_data=types.Blob(data=bytes(4800), mime_type="audio/pcm;rate=24000")
+        )]),
+        output_transcription=types.Transcription(text="Halo Pak Budi"),
+    )))
+    recorder.gemini_message(types.LiveServerMessage(server_content=types.LiveServerContent(turn_complete=True)))
+    await asyncio.sleep(0.1)
+    recorder.client_frame({"type": "end_call"})
+    await recorder.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(record())
+    print(f"Wrote {PATH} ({os.path.getsize(PATH)} bytes)")
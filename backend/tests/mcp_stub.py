@@ -0,0 +1,56 @@
+"""Local stand-in for the n8n MCP endpoint (httpx MockTransport handler).
+
+Hands out Mcp-Session-Id values on initialize and answers 404 for a
+session it no longer knows, as an MCP server does after a restart or
+session timeout. `expire()` forgets every session.
+"""
+
+import json
+import uuid
+from collections import Counter
+
+import httpx
+
+STUB_URL = "http://mcp-stub.local/mcp"
+
+
+class MCPStub:
+    def __init__(self):
+        self.sessions: set[str] = set()
+        self.initializes = 0
+        self.executed: Counter = Counter()  # workflowId -> tools/call actually run
+        self.rejected = 0
+        self.status_override: tuple[int, str] | None = None
+
+    def expire(self):
+        self.sessions.clear()
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        method = payload["method"]
+        if method == "initialize":
+            self.initializes += 1
+            session_id = uuid.uuid4().hex
+            self.sessions.add(session_id)
+            return httpx.Response(
+                200, headers={"mcp-session-id": session_id},
+                json={"jsonrpc": "2.0", "id": payload["id"], "result": {"protocolVersion": "2024-11-05"}},
+            )
+        if self.status_override is not None:
+            status, body = self.status_override
+            return httpx.Response(status, text=body)
+        if request.headers.get("mcp-session-id") not in self.sessions:
+            self.rejected += 1
+            return httpx.Response(404, text="Session not found")
+        if method == "tools/call":
+            workflow = payload["params"]["arguments"].get("workflowId", payload["params"]["name"])
+            self.executed[workflow] += 1
+            text = json.dumps({"result": f"ok from {workflow}", "success": True})
+            return httpx.Response(200, json={
+                "jsonrpc": "2.0", "id": payload["id"],
+                "result": {"content": [{"type": "text", "text": text}]},
+            })
+        return httpx.Response(200, json={"jsonrpc": "2.0", "id": payload.get("id"), "result": {}})
@@ -0,0 +1,161 @@
+import logging
+import struct
+
+import numpy as np
+import pytest
+
+from app.audio_bench import bench_codecs, voice_like
+from app.audio_codecs import (
+    ADPCM_BLOCK_SAMPLES,
+    AudioCodec,
+    adpcm_decode,
+    adpcm_encode,
+    mulaw_decode,
+    mulaw_encode,
+    negotiate_codec,
+)
+
+BLOCK_BYTES = 4 + (ADPCM_BLOCK_SAMPLES - 1) // 2
+
+
+def _snr_db(reference: bytes, decoded: bytes) -> float:
+    x = np.frombuffer(reference, np.int16).astype(np.float64)
+    y = np.frombuffer(decoded, np.int16).astype(np.float64)
+    return 10 * np.log10((x ** 2).sum() / max(((x - y) ** 2).sum(), 1e-9))
+
+
+@pytest.mark.parametrize("rate", [16000, 24000])
+def test_mulaw_round_trip_snr(rate):
+    pcm = voice_like(rate, 1.0)
+    encoded = mulaw_encode(pcm)
+    assert len(encoded) == len(pcm) // 2
+    decoded = mulaw_decode(encoded)
+    assert len(decoded) == len(pcm)
+    assert _snr_db(pcm, decoded) > 30
+
+
+def test_mulaw_codes_are_stable_and_error_is_bounded():
+    codes = bytes(range(256))
+    levels = mulaw_decode(codes)
+    # Decoded levels re-encode to themselves (0x7F and 0xFF are both zero)
+    assert mulaw_decode(mulaw_encode(levels)) == levels
+
+    samples = np.arange(-32768, 32768, 7, dtype=np.int16)
+    decoded = np.frombuffer(mulaw_decode(mulaw_encode(samples.tobytes())), np.int16)
+    error = np.abs(decoded.astype(np.int32) - samples)
+    # Quantization step doubles per segment: error stays within ~1/16 of the magnitude
+    assert np.all(error <= np.maximum(np.abs(samples.astype(np.int32)) // 16, 8) + 132)
+
+
+def test_mulaw_ignores_a_trailing_odd_byte():
+    pcm = voice_like(16000, 0.01)
+    assert mulaw_encode(pcm + b"\x01") == mulaw_encode(pcm)
+
+
+@pytest.mark.parametrize("rate", [16000, 24000])
+def test_adpcm_round_trip_snr(rate):
+    pcm = voice_like(rate, 1.0)
+    encoded = adpcm_encode(pcm)
+    assert len(encoded) < len(pcm) / 3.5
+    decoded = adpcm_decode(encoded)
+    assert len(decoded) == len(pcm)
+    assert _snr_db(pcm, decoded) > 25
+
+
+@pytest.mark.parametrize("samples", [1, 2, 64, 65, 66, 129, 130, 1000, 1301])
+def test_adpcm_partial_last_block(samples):
+    pcm = voice_like(16000, 1.0)[:samples * 2]
+    encoded = adpcm_encode(pcm)
+    assert len(encoded) == 4 + -(-samples // ADPCM_BLOCK_SAMPLES) * BLOCK_BYTES
+    decoded = adpcm_decode(encoded)
+    assert len(decoded) == len(pcm)
+    # Each block starts from the exact sample, so the first one always survives
+    assert decoded[:2] == pcm[:2]
+    if samples >= 100:
+        assert _snr_db(pcm, decoded) > 20
+
+
+def test_adpcm_odd_byte_length_drops_the_half_sample():
+    pcm = voice_like(16000, 0.1) + b"\x7f"
+    decoded = adpcm_decode(adpcm_encode(pcm))
+    assert len(decoded) == len(pcm) - 1
+
+
+def test_adpcm_empty_and_short_messages():
+    assert adpcm_encode(b"") == struct.pack("<I", 0)
+    assert adpcm_decode(adpcm_encode(b"")) == b""
+    assert adpcm_decode(b"") == b""
+    assert adpcm_decode(b"\x10\x00") == b""
+    # Header promises samples but no whole block follows it
+    assert adpcm_decode(struct.pack("<I", 65) + b"\x00" * (BLOCK_BYTES - 1)) == b""
+
+
+def test_adpcm_truncated_message_decodes_whole_blocks_only():
+    pcm = voice_like(16000, 0.1)
+    encoded = adpcm_encode(pcm)
+    decoded = adpcm_decode(encoded[:4 + 2 * BLOCK_BYTES + 5])
+    assert len(decoded) == 2 * ADPCM_BLOCK_SAMPLES * 2
+    assert decoded == adpcm_decode(encoded)[:len(decoded)]
+
+
+def test_adpcm_count_bounds_the_output():
+    pcm = voice_like(16000, 0.1)
+    encoded = bytearray(adpcm_encode(pcm))
+    encoded[:4] = struct.pack("<I", 70)
+    assert adpcm_decode(bytes(encoded)) == adpcm_decode(adpcm_encode(pcm))[:140]
+
+
+def test_adpcm_malformed_block_header_is_clipped():
+    block = bytearray(BLOCK_BYTES)
+    block[0:2] = struct.pack("<h", 32767)
+    block[2] = 0xFF  # step index past the table
+    block[3] = 0xAB  # reserved byte set
+    block[4:] = b"\x77" * (BLOCK_BYTES - 4)  # max positive step every sample
+    decoded = np.frombuffer(adpcm_decode(struct.pack("<I", 65) + bytes(block)), np.int16)
+    assert len(decoded) == ADPCM_BLOCK_SAMPLES
+    assert decoded.max() == 32767
+
+    block[0:2] = struct.pack("<h", -32768)
+    block[4:] = b"\xff" * (BLOCK_BYTES - 4)  # max negative step every sample
+    decoded = np.frombuffer(adpcm_decode(struct.pack("<I", 65) + bytes(block)), np.int16)
+    assert decoded.min() == -32768
+
+
+def test_audio_codec_counts_wire_bytes():
+    pcm = voice_like(16000, 0.5)
+    for name, ratio in [("pcm", 1.0), ("mulaw", 0.5), ("adpcm", 0.28)]:
+        codec = AudioCodec(name)
+        data = codec.encode(pcm)
+        assert len(codec.decode(data)) == len(pcm)
+        assert codec.bytes_out == codec.bytes_in == len(data)
+        assert len(data) <= len(pcm) * ratio + 4
+        assert f"codec={name}" in codec.summary(0.5)
+
+
+def test_codec_bench_reports_every_codec():
+    report = bench_codecs(seconds=0.5, runs=1)["codecs"]
+    assert set(report) == {f"{name} {rate}" for name in ("pcm", "mulaw", "adpcm") for rate in (16000, 24000)}
+    assert report["pcm 24000"]["wire_kb_s"] > report["mulaw 24000"]["wire_kb_s"] > report["adpcm 24000"]["wire_kb_s"]
+    assert report["adpcm 16000"]["snr_db"] > 20
+
+
+@pytest.mark.parametrize("requested,expected", [
+    (None, "pcm"),
+    ("", "pcm"),
+    ("opus", "pcm"),
+    (" , ,", "pcm"),
+    ("ADPCM", "adpcm"),
+    ("opus, MuLaw ,adpcm", "mulaw"),
+    ("opus,adpcm", "adpcm"),
+])
+def test_negotiate_codec(requested, expected):
+    assert negotiate_codec(requested) == expected
+
+
+def test_negotiate_codec_warns_only_for_unsupported_requests(caplog):
+    with caplog.at_level(logging.WARNING, logger="app.audio_codecs"):
+        negotiate_codec(None)
+        negotiate_codec("mulaw")
+        assert not caplog.records
+        negotiate_codec("opus,speex")
+    assert "opus,speex" in caplog.records[0].getMessage()
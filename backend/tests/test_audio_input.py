@@ -0,0 +1,99 @@
+import asyncio
+import time
+
+import numpy as np
+
+from app.audio_bench import bench_input, voice_like
+from app.audio_input import InboundAudioStage
+
+
+class FakeSession:
+    def __init__(self, send_s: float = 0.0):
+        self.send_s = send_s
+        self.messages = []
+
+    async def send(self, input=None, end_of_turn: bool = False):
+        if self.send_s:
+            await asyncio.sleep(self.send_s)
+        self.messages.append(b"".join(chunk.data for chunk in input.media_chunks))
+
+
+def _drain(stage: InboundAudioStage, session: FakeSession, pushes) -> None:
+    async def scenario():
+        sender = asyncio.create_task(stage.run())
+        for delay, pcm in pushes:
+            if delay:
+                await asyncio.sleep(delay)
+            stage.push(pcm)
+        while not stage._queue.empty():
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(session.send_s + 0.01)
+        sender.cancel()
+        await sender
+
+    asyncio.run(scenario())
+
+
+def test_rechunks_into_fixed_frames():
+    session = FakeSession()
+    stage = InboundAudioStage(session, frame_ms=20, backlog_ms=10_000)  # never coalesce here
+    pcm = voice_like(16000, 0.5)
+    sizes = [100, 1000, 7, 641, 2, 3333]
+    pieces, position = [], 0
+    while position < len(pcm):
+        size = sizes[len(pieces) % len(sizes)]
+        pieces.append((0, pcm[position:position + size]))
+        position += size
+    _drain(stage, session, pieces)
+
+    assert stage.frame_bytes == 640
+    assert {len(message) for message in session.messages} == {640}
+    assert stage.coalesced_sends == 0
+    assert b"".join(session.messages) == pcm[:len(pcm) // 640 * 640]
+    assert stage.queued_bytes == len(pcm) % 640  # remainder waits for the next chunk
+
+
+def test_coalesces_when_sends_back_up():
+    session = FakeSession(send_s=0.05)  # upstream slower than 20 ms frames
+    stage = InboundAudioStage(session, frame_ms=20, backlog_ms=100)
+    pcm = voice_like(16000, 1.0)
+    _drain(stage, session, [(0.02, pcm[i:i + 640]) for i in range(0, len(pcm), 640)])
+
+    assert stage.frames_sent == 50
+    assert stage.coalesced_sends > 0
+    assert stage.sends < stage.frames_sent
+    assert max(len(message) for message in session.messages) > 640
+    assert b"".join(session.messages) == pcm  # nothing lost or reordered
+
+
+def test_backlog_is_bounded_and_keeps_the_newest_audio():
+    stage = InboundAudioStage(FakeSession(), frame_ms=20, max_backlog_ms=500)
+    pcm = voice_like(16000, 3.0)
+    stage.push(pcm)  # upstream stalled: nothing drains the queue
+
+    assert stage._queue.qsize() == 25
+    assert stage.dropped_frames == 150 - 25
+    assert stage.queued_bytes == 25 * 640
+    frames = [stage._queue.get_nowait()[1] for _ in range(25)]
+    assert b"".join(frames) == pcm[-25 * 640:]
+    assert "dropped=125" in stage.summary()
+
+
+def test_voice_check_uses_the_peak_of_either_sign():
+    stage = InboundAudioStage(FakeSession(), frame_ms=20)
+    silence = np.zeros(320, dtype=np.int16)
+    assert not stage._is_voiced(silence.tobytes())
+    for value in (2000, -2000, -32768, 32767):
+        frame = silence.copy()
+        frame[100] = value
+        assert stage._is_voiced(frame.tobytes())
+    assert stage.push(frame.tobytes()) is True
+    assert stage.last_voiced_at is not None
+
+
+def test_end_of_speech_latency_grows_with_frame_size():
+    # Client sends 20 ms chunks; a 160 ms frame holds the speech tail until it fills
+    report = bench_input(chunk_ms=20, runs=2, frame_sizes=[20, 160])["frames"]
+    assert report["frame 20ms"]["speech_end_latency_ms"] < 20
+    assert report["frame 160ms"]["speech_end_latency_ms"] > 40
+    assert report["frame 20ms"]["sends_per_second"] > 5 * report["frame 160ms"]["sends_per_second"]
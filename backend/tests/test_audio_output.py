@@ -0,0 +1,44 @@
+from app.audio_output import OutboundAudioStage, simulate
+
+RATE = 24000
+
+
+def _stage(**kwargs) -> OutboundAudioStage:
+    return OutboundAudioStage(None, RATE, paced=True, frame_ms=20, target_ms=120, min_ms=60, max_ms=500, **kwargs)
+
+
+def test_adaptive_pacing_against_unpaced_and_fixed():
+    modes = simulate(seconds=120, seed=1, jitter_ms=30, spike_rate=0.5, spike_ms=250)["modes"]
+    unpaced, fixed, adaptive = modes["unpaced"], modes["fixed"], modes["adaptive"]
+    # Far less audio queued in the browser: lower latency and less heard after barge-in
+    assert adaptive["send_to_play_ms"]["p95"] < unpaced["send_to_play_ms"]["p95"] / 3
+    assert adaptive["stale_after_barge_in_ms"]["mean"] < unpaced["stale_after_barge_in_ms"]["mean"] / 3
+    # Unpaced ships whole turns ahead, so it never runs dry; a paced lead must
+    # adapt to the jitter to stay close to that
+    assert adaptive["underruns"] < fixed["underruns"] / 3
+    assert adaptive["underruns"] <= unpaced["underruns"] + 5
+
+
+def test_flush_drops_queued_audio_on_barge_in():
+    stage = _stage()
+    stage.push(bytes(RATE * 2), now=0.0)  # 1 s of model audio
+    sent = stage.poll(0.0)
+    assert 0 < len(sent) * stage.frame_s <= 0.12 + stage.frame_s
+    queued = stage.queued_bytes
+    assert stage.flush() == queued > 0
+    assert stage.queued_bytes == 0 and stage.poll(10.0) == []
+    # The next turn continues the stream position after the dropped audio
+    stage.push(bytes(stage.frame_bytes), now=10.0)
+    frame = stage.poll(10.0)[0]
+    assert frame.offset == RATE * 2 and frame.start
+
+
+def test_low_client_buffer_raises_the_target():
+    stage = _stage()
+    stage.push(bytes(stage.frame_bytes), now=0.0)
+    frame = stage.poll(0.0)[0]
+    stage.on_ack(frame.seq, buffered_ms=200, underruns=0, now=0.05)
+    healthy = stage.target_s
+    stage.on_ack(frame.seq + 5, buffered_ms=10, underruns=0, now=0.06)
+    assert stage.target_s > healthy
+    assert stage.client_underruns == 0
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from app.audio_processing import SUPPORTED_RATES, AudioPipeline, PeakNormalizer
+
+
+def _tone(rate: int, seconds: float = 1.0, freq: float = 440.0, amplitude: float = 0.5) -> np.ndarray:
+    t = np.arange(int(rate * seconds)) / rate
+    return (amplitude * 32767 * np.sin(2 * np.pi * freq * t)).astype(np.int16)
+
+
+def _chunked(pipeline: AudioPipeline, pcm: bytes, sizes: list[int]) -> bytes:
+    out, position, index = [], 0, 0
+    while position < len(pcm):
+        size = sizes[index % len(sizes)]
+        out.append(pipeline.process(pcm[position:position + size]))
+        position += size
+        index += 1
+    return b"".join(out)
+
+
+@pytest.mark.parametrize("in_rate", SUPPORTED_RATES)
+@pytest.mark.parametrize("out_rate", [16000, 24000])
+def test_output_length_follows_the_rate(in_rate, out_rate):
+    pipeline = AudioPipeline(in_rate, out_rate)
+    out = _chunked(pipeline, _tone(in_rate).tobytes(), [in_rate // 50 * 2])  # 20 ms chunks
+    assert abs(len(out) // 2 - out_rate) <= 2
+
+
+@pytest.mark.parametrize("in_rate,out_rate", [(48000, 16000), (8000, 16000), (44100, 16000), (24000, 22050)])
+def test_chunk_boundaries_are_seamless(in_rate, out_rate):
+    pcm = _tone(in_rate).tobytes()
+    whole = np.frombuffer(AudioPipeline(in_rate, out_rate).process(pcm), np.int16)
+    # Odd-sized chunks, including ones that split a sample
+    pieces = np.frombuffer(_chunked(AudioPipeline(in_rate, out_rate), pcm, [333, 4096, 17, 960]), np.int16)
+    # The last output may land on either side of the final chunk's end
+    assert abs(len(pieces) - len(whole)) <= 1
+    common = min(len(pieces), len(whole))
+    assert np.abs(pieces[:common].astype(np.int32) - whole[:common]).max() <= 1
+
+
+def test_stereo_downmix():
+    mono = _tone(48000)
+    same = np.column_stack([mono, mono]).ravel().tobytes()
+    opposite = np.column_stack([mono, -mono]).ravel().tobytes()
+    reference = np.frombuffer(AudioPipeline(48000, 16000).process(mono.tobytes()), np.int16)
+    downmixed = np.frombuffer(AudioPipeline(48000, 16000, channels=2).process(same), np.int16)
+    assert np.abs(downmixed.astype(np.int32) - reference).max() <= 1
+    cancelled = np.frombuffer(AudioPipeline(48000, 16000, channels=2).process(opposite), np.int16)
+    assert np.abs(cancelled).max() <= 1
+
+
+def test_stereo_keeps_partial_frames_for_the_next_chunk():
+    left, right = _tone(16000, freq=440), _tone(16000, freq=1000, amplitude=0.1)
+    stereo = np.column_stack([left, right]).ravel().tobytes()
+    whole = AudioPipeline(16000, 16000, channels=2).process(stereo)
+    # 3-byte chunks split frames everywhere; channel alignment must survive
+    split = _chunked(AudioPipeline(16000, 16000, channels=2), stereo, [3, 1001, 6, 2])
+    assert split == whole
+
+
+def test_agc_boost_is_capped_and_never_clips():
+    normalizer = PeakNormalizer(target=0.7, max_gain=8.0)
+    quiet = np.full(320, 0.02, dtype=np.float32)
+    for _ in range(500):
+        normalizer.process(quiet.copy())
+    assert normalizer.gain <= 8.0
+    loud = np.full(320, 0.9, dtype=np.float32)
+    out = normalizer.process(loud.copy())
+    assert np.abs(out).max() <= 1.0 + 1e-6
+    assert normalizer.gain * 0.9 <= 1.0 + 1e-6
+
+
+def test_agc_holds_gain_in_silence():
+    normalizer = PeakNormalizer(noise_floor=0.01)
+    for _ in range(50):
+        normalizer.process(np.full(320, 0.35, dtype=np.float32))
+    gain = normalizer.gain
+    for _ in range(50):
+        normalizer.process(np.full(320, 0.001, dtype=np.float32))
+    assert normalizer.gain == pytest.approx(gain)
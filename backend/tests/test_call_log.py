@@ -0,0 +1,101 @@
+import asyncio
+import os
+
+import pytest
+
+from app.call_log import CallLog, CallLogExporter, WebhookExporter
+
+
+class RecordingExporter(CallLogExporter):
+    def __init__(self):
+        self.batches: list[list[dict]] = []
+
+    async def export(self, events):
+        await asyncio.sleep(0)  # let the other worker interleave
+        self.batches.append(events)
+
+
+def _exported_call_ids(*exporters: RecordingExporter) -> list[str]:
+    return [event["call_id"] for exporter in exporters for batch in exporter.batches for event in batch]
+
+
+def test_open_segment_of_another_worker_is_not_exported(tmp_path):
+    async def scenario():
+        a = CallLog(str(tmp_path), exporter=RecordingExporter(), owner="worker-a")
+        b = CallLog(str(tmp_path), exporter=RecordingExporter(), owner="worker-b")
+        a.log_event("call_start", "call-1")
+        await a.flush()  # written to a's open segment, not sealed
+        await b.export_pending()
+        assert b.exporter.batches == []
+        await a.export_pending()  # seals and exports its own segment
+        return a.exporter, b.exporter
+
+    a_exporter, b_exporter = asyncio.run(scenario())
+    assert _exported_call_ids(a_exporter, b_exporter) == ["call-1"]
+
+
+def test_sealed_segment_is_exported_once_across_workers(tmp_path):
+    async def scenario():
+        workers = [
+            CallLog(str(tmp_path), exporter=RecordingExporter(), owner=f"worker-{i}") for i in range(4)
+        ]
+        for i, worker in enumerate(workers):
+            for n in range(3):
+                worker.log_event("tool_result", f"call-{i}-{n}")
+            await worker.flush()
+            async with worker._io_lock:
+                await asyncio.to_thread(worker._seal, worker._segment)
+                worker._segment = None
+        await asyncio.gather(*(worker.export_pending() for worker in workers))
+        return [worker.exporter for worker in workers]
+
+    exporters = asyncio.run(scenario())
+    exported = _exported_call_ids(*exporters)
+    assert sorted(exported) == sorted(f"call-{i}-{n}" for i in range(4) for n in range(3))
+    assert not os.listdir(tmp_path / "pending")
+
+
+def test_failed_export_is_retried_by_the_claiming_worker(tmp_path):
+    class FlakyExporter(RecordingExporter):
+        fail = True
+
+        async def export(self, events):
+            if self.fail:
+                raise RuntimeError("webhook down")
+            await super().export(events)
+
+    async def scenario():
+        log = CallLog(str(tmp_path), exporter=FlakyExporter(), owner="worker-a")
+        log.log_event("call_end", "call-1")
+        await log.export_pending()
+        assert log.exporter.batches == []
+        log.exporter.fail = False
+        await log.export_pending()
+        return log.exporter
+
+    assert _exported_call_ids(asyncio.run(scenario())) == ["call-1"]
+
+
+def test_restart_recovers_own_open_and_claimed_segments(tmp_path):
+    async def first_run():
+        log = CallLog(str(tmp_path), exporter=RecordingExporter(), owner="worker-a")
+        log.log_event("call_start", "call-open")
+        await log.flush()  # crash before sealing
+
+    asyncio.run(first_run())
+    claimed = tmp_path / "exporting" / "worker-a"
+    claimed.mkdir(parents=True)
+    (claimed / "1-worker-a.jsonl").write_text('{"event": "call_end", "call_id": "call-claimed"}\n')
+
+    async def second_run():
+        log = CallLog(str(tmp_path), exporter=RecordingExporter(), owner="worker-a")
+        log._recover()
+        await log.export_pending()
+        return log.exporter
+
+    assert sorted(_exported_call_ids(asyncio.run(second_run()))) == ["call-claimed", "call-open"]
+
+
+def test_webhook_exporter_requires_url():
+    with pytest.raises(ValueError):
+        WebhookExporter(url="")
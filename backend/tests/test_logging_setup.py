@@ -0,0 +1,36 @@
+import logging
+import threading
+
+from app.logging_setup import HotPathRateFilter
+
+
+def _record(level=logging.INFO, msg="Audio frame for call %d"):
+    return logging.LogRecord("app.main", level, __file__, 1, msg, (1,), None)
+
+
+def test_rate_filter_is_off_by_default():
+    rate_filter = HotPathRateFilter(rate=0)
+    assert all(rate_filter.filter(_record()) for _ in range(1000))
+
+
+def test_rate_filter_never_limits_warnings():
+    rate_filter = HotPathRateFilter(rate=1)
+    assert all(rate_filter.filter(_record(logging.WARNING)) for _ in range(100))
+
+
+def test_rate_filter_counts_exactly_across_threads():
+    rate_filter = HotPathRateFilter(rate=500)
+    passed = []
+    barrier = threading.Barrier(8)
+
+    def emit():
+        barrier.wait()
+        passed.append(sum(rate_filter.filter(_record()) for _ in range(200)))
+
+    threads = [threading.Thread(target=emit) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # 1600 records inside one window: exactly `rate` get through
+    assert sum(passed) == 500
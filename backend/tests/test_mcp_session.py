@@ -0,0 +1,88 @@
+import asyncio
+
+import httpx
+
+from app.mcp_bridge import DEFAULT_TOOL_MAPPING, MCPBridge
+from mcp_stub import STUB_URL, MCPStub
+
+
+def _bridge(stub: MCPStub) -> MCPBridge:
+    bridge = MCPBridge(mcp_url=STUB_URL, auth_token="Bearer test")
+    bridge._client = httpx.AsyncClient(transport=stub.transport())
+    return bridge
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_expired_session_replays_idempotent_lookup():
+    stub = MCPStub()
+
+    async def scenario():
+        bridge = _bridge(stub)
+        assert (await bridge.execute_function("client_lookup", {"email": "a@b.c"}))["success"]
+        stub.expire()
+        result = await bridge.execute_function("client_lookup", {"email": "a@b.c"})
+        await bridge.close()
+        return result
+
+    result = _run(scenario())
+    assert result["success"] is True
+    assert stub.initializes == 2
+    assert stub.rejected == 1
+    assert stub.executed[DEFAULT_TOOL_MAPPING["client_lookup"]] == 2
+
+
+def test_expired_session_never_replays_write_tool():
+    stub = MCPStub()
+
+    async def scenario():
+        bridge = _bridge(stub)
+        await bridge.initialize()
+        stub.expire()
+        failed = await bridge.execute_function("book_event", {"email": "a@b.c"})
+        # The session was renewed, so the caller's explicit retry goes through
+        retried = await bridge.execute_function("book_event", {"email": "a@b.c"})
+        await bridge.close()
+        return failed, retried
+
+    failed, retried = _run(scenario())
+    assert failed["success"] is False
+    assert retried["success"] is True
+    assert stub.initializes == 2
+    assert stub.executed[DEFAULT_TOOL_MAPPING["book_event"]] == 1
+
+
+def test_bad_request_mentioning_session_is_not_a_session_expiry():
+    stub = MCPStub()
+
+    async def scenario():
+        bridge = _bridge(stub)
+        await bridge.initialize()
+        stub.status_override = (400, "invalid session parameter")
+        result = await bridge.execute_function("client_lookup", {"email": "a@b.c"})
+        await bridge.close()
+        return result
+
+    result = _run(scenario())
+    assert result["success"] is False
+    assert stub.initializes == 1
+
+
+def test_concurrent_expiries_share_one_reinitialize():
+    stub = MCPStub()
+
+    async def scenario():
+        bridge = _bridge(stub)
+        await bridge.initialize()
+        stub.expire()
+        results = await asyncio.gather(*(
+            bridge.execute_function("check_availability", {"date": "2026-01-01"}) for _ in range(5)
+        ))
+        await bridge.close()
+        return results
+
+    results = _run(scenario())
+    assert all(result["success"] for result in results)
+    assert stub.initializes == 2
@@ -0,0 +1,155 @@
+import asyncio
+
+import pytest
+
+from app.prefetch import EMAIL_RE, ToolPrefetcher, normalize_transcript, prefetch_stats
+
+
+@pytest.mark.parametrize("spoken,email", [
+    ("Budi at gmail dot com", "budi@gmail.com"),
+    ("email saya budi titik santoso at yahoo titik co titik id ya", "budi.santoso@yahoo.co.id"),
+    ("budi underscore s at gmail dot com", "budi_s@gmail.com"),
+    ("budi garis bawah s et gmail dot com", "budi_s@gmail.com"),
+    ("budi dash s at kantor strip pusat dot co dot id", "budi-s@kantor-pusat.co.id"),
+    ("my email is Budi.Santoso@Gmail.com.", "budi.santoso@gmail.com"),
+])
+def test_spoken_emails_are_normalized(spoken, email):
+    assert [match.group(0) for match in EMAIL_RE.finditer(normalize_transcript(spoken))] == [email]
+
+
+@pytest.mark.parametrize("spoken", ["budi at gmail", "budi at gmail dot", "at gmail dot com", "budi dot com"])
+def test_incomplete_addresses_do_not_match(spoken):
+    assert not EMAIL_RE.search(normalize_transcript(spoken))
+
+
+class FakeTools:
+    def __init__(self, delay: float = 0.05, result: dict | None = None):
+        self.delay = delay
+        self.result = result or {"found": True}
+        self.calls = []
+
+    async def execute(self, name, arguments):
+        self.calls.append((name, arguments))
+        await asyncio.sleep(self.delay)
+        return dict(self.result)
+
+
+def test_partial_address_is_not_prefetched_until_text_follows():
+    async def scenario():
+        tools = FakeTools()
+        prefetcher = ToolPrefetcher(tools.execute, "sari", enabled=True)
+        for fragment in [" budi at", " gmail dot co", " dot id"]:
+            prefetcher.feed(fragment)
+            await asyncio.sleep(0)
+            assert tools.calls == []  # "budi@gmail.co" may still grow into ".co.id"
+        prefetcher.feed(" ya")
+        await asyncio.sleep(0)
+        assert tools.calls == [("client_lookup", {"email": "budi@gmail.co.id"})]
+        prefetcher.close()
+
+    asyncio.run(scenario())
+
+
+def test_trailing_punctuation_waits_for_the_end_of_the_turn():
+    async def scenario():
+        tools = FakeTools()
+        prefetcher = ToolPrefetcher(tools.execute, "reza", enabled=True)
+        prefetcher.feed("budi at gmail dot com.")
+        await asyncio.sleep(0)
+        assert tools.calls == []
+        prefetcher.end_of_input()
+        await asyncio.sleep(0)
+        assert tools.calls == [("lookup_appointment", {"email": "budi@gmail.com"})]
+        # The same address later in the call is not looked up twice
+        prefetcher.feed("budi at gmail dot com tolong")
+        prefetcher.end_of_input()
+        await asyncio.sleep(0)
+        assert len(tools.calls) == 1
+        prefetcher.close()
+
+    asyncio.run(scenario())
+
+
+def test_take_counts_hits_misses_and_saved_time():
+    async def scenario():
+        before = prefetch_stats.summary()
+        tools = FakeTools(delay=0.05)
+        prefetcher = ToolPrefetcher(tools.execute, "sari", enabled=True)
+        prefetcher.feed("budi at gmail dot com ya")
+        await asyncio.sleep(0.1)  # lookup finished before the model asked
+
+        result = await prefetcher.take("client_lookup", {"email": " Budi@Gmail.com "})
+        assert result == {"found": True}
+        assert prefetcher.hits == 1
+        assert 0.04 <= prefetcher.saved_s <= 0.09  # the lookup's duration, not the idle wait
+
+        # Taken once only: a repeat call goes to n8n and counts as a miss
+        assert await prefetcher.take("client_lookup", {"email": "budi@gmail.com"}) is None
+        assert await prefetcher.take("client_lookup", {"email": "other@gmail.com"}) is None
+        assert prefetcher.misses == 2
+        # Tools that are never prefetched are not misses
+        assert await prefetcher.take("book_appointment", {"email": "budi@gmail.com"}) is None
+        assert prefetcher.misses == 2
+
+        prefetcher.close()
+        after = prefetch_stats.summary()
+        assert after["calls"] == before["calls"] + 1
+        assert after["hits"] == before["hits"] + 1
+        assert after["misses"] == before["misses"] + 2
+        assert after["saved_ms_total"] >= before["saved_ms_total"] + 40
+        assert prefetcher.summary().startswith("started=1 hits=1 misses=2 wasted=0")
+
+    asyncio.run(scenario())
+
+
+def test_take_before_the_lookup_finishes_saves_the_head_start():
+    async def scenario():
+        tools = FakeTools(delay=0.2)
+        prefetcher = ToolPrefetcher(tools.execute, "sari", enabled=True)
+        prefetcher.feed("budi at gmail dot com ya")
+        await asyncio.sleep(0.05)
+        assert await prefetcher.take("client_lookup", {"email": "budi@gmail.com"}) == {"found": True}
+        assert 0.04 <= prefetcher.saved_s < 0.15
+        prefetcher.close()
+
+    asyncio.run(scenario())
+
+
+def test_unused_and_failed_prefetches():
+    async def scenario():
+        before = prefetch_stats.wasted
+        tools = FakeTools(delay=10)
+        prefetcher = ToolPrefetcher(tools.execute, "sari", enabled=True, max_prefetches=2)
+        prefetcher.feed("budi at gmail dot com, ani at gmail dot com, eko at gmail dot com ok")
+        await asyncio.sleep(0)
+        assert prefetcher.started == 2  # capped by max_prefetches
+        tasks = [task for _, task, _ in prefetcher._pending.values()]
+        prefetcher.close()
+        await asyncio.sleep(0)
+        assert prefetcher.wasted == 2
+        assert all(task.cancelled() for task in tasks)
+        assert prefetch_stats.wasted == before + 2
+
+        failing = ToolPrefetcher(FakeTools(0, {"error": "n8n unreachable"}).execute, "sari", enabled=True)
+        failing.feed("budi at gmail dot com ya")
+        await asyncio.sleep(0.01)
+        assert await failing.take("client_lookup", {"email": "budi@gmail.com"}) is None
+        assert failing.hits == 0 and failing.saved_s == 0
+        failing.close()
+
+    asyncio.run(scenario())
+
+
+def test_disabled_prefetcher_does_nothing():
+    async def scenario():
+        tools = FakeTools()
+        prefetcher = ToolPrefetcher(tools.execute, "sari", enabled=False)
+        prefetcher.feed("budi at gmail dot com ya")
+        prefetcher.end_of_input()
+        await asyncio.sleep(0)
+        assert tools.calls == []
+        assert await prefetcher.take("client_lookup", {"email": "budi@gmail.com"}) is None
+        assert prefetcher.misses == 0
+        prefetcher.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,86 @@
+import asyncio
+import time
+
+from app.calls import ActiveCall, CallRegistry
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_json(self, data):
+        self.sent.append(data)
+
+
+class FakeSession:
+    def __init__(self, stall: bool = False):
+        self.stall = stall
+        self.sends = 0
+
+    async def send(self, input=None, end_of_turn: bool = False):
+        if self.stall:
+            await asyncio.sleep(3600)  # Gemini session that never answers
+        self.sends += 1
+
+
+def _registry(calls: int, stalled: int = 0, dead: int = 0) -> tuple[CallRegistry, list[ActiveCall]]:
+    registry = CallRegistry()
+    active = []
+    for index in range(calls):
+        call = ActiveCall(f"call-{index}", "sari", FakeWebSocket(), asyncio.Event())
+        call.session = FakeSession(stall=index < stalled)
+        if index >= calls - dead:
+            call.last_client_frame -= 60  # frozen tab: no frames at all
+        registry.register(call)
+        active.append(call)
+    return registry, active
+
+
+def test_reaper_hangs_up_many_dead_clients():
+    async def scenario():
+        registry, calls = _registry(500, dead=400)
+        await registry.reap_once(dead_after=30)
+        assert registry.reaper_stats["abandoned_hangups"] == 400
+        assert [call.end_reason for call in calls].count("abandoned") == 400
+        assert all(call.end_reason is None for call in calls[:100])
+
+    asyncio.run(scenario())
+
+
+def test_stalled_session_does_not_block_the_sweep():
+    async def scenario():
+        registry, calls = _registry(200, stalled=5)
+        idle_since = time.monotonic() - 60
+        for call in calls:
+            call.last_voiced_input = call.last_gemini_output = idle_since
+            call.last_client_frame = time.monotonic()
+
+        started = time.monotonic()
+        await registry.reap_once(action_timeout=0.2)
+        assert time.monotonic() - started < 1.0
+        assert registry.reaper_stats["idle_prompts"] == 200
+        assert sum(call.session.sends for call in calls) == 195
+
+        # Still silent after the prompt (client still streaming): hang up
+        await registry.reap_once(now=time.monotonic() + 30, dead_after=60, action_timeout=0.2)
+        assert registry.reaper_stats["idle_hangups"] == 200
+        assert all(call.end_reason == "idle" for call in calls)
+        assert calls[-1].websocket.sent[-1]["reason"] == "idle"
+
+    asyncio.run(scenario())
+
+
+def test_drain_deadline_holds_with_a_stalled_session():
+    async def scenario():
+        registry, calls = _registry(3, stalled=1)
+        started = time.monotonic()
+        registry.start_drain(timeout=1.0, notice_seconds=0.5)
+        # Nothing answers stop_event here, so the drain waits its last 5 s; the hang-up is what counts
+        while not all(call.end_reason == "drain" for call in calls):
+            assert time.monotonic() - started < 2.0, "drain deadline not enforced"
+            await asyncio.sleep(0.05)
+        assert time.monotonic() - started < 1.3
+        assert calls[-1].websocket.sent[0]["reason"] == "shutdown"
+        registry._drain_task.cancel()
+
+    asyncio.run(scenario())
@@ -0,0 +1,36 @@
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), "..")
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "short_call.crec")
+
+
+def _replay(*args: str) -> tuple[int, dict]:
+    # Replay sets DATA_DIR before app.config is imported, so it needs its own interpreter
+    env = {**os.environ, "GEMINI_API_KEY": "replay"}
+    env.pop("TENANTS_FILE", None)
+    result = subprocess.run(
+        [sys.executable, "-m", "app.replay", FIXTURE, "--fast", *args],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=300,
+    )
+    return result.returncode, json.loads(result.stdout)
+
+
+def test_replay_fixture_writes_only_to_its_data_dir(tmp_path):
+    code, report = _replay("--data-dir", str(tmp_path))
+    assert code == 0
+    assert report["data_dir"] == str(tmp_path)
+    assert report["mcp_served"] == 1 and report["mcp_unmatched"] == 0
+    assert report["received"]["transcript"] == 2
+    assert report["audio_bytes_received"] == 4800
+    assert os.listdir(tmp_path)
+
+
+def test_soak_memory_returns_to_baseline(tmp_path):
+    # 300 consecutive calls; fails (exit 2) on calls left registered or
+    # more than --max-retained traced bytes kept per completed call
+    code, report = _replay("--repeat", "300", "--soak", "--data-dir", str(tmp_path))
+    assert code == 0, report["memory"]
+    assert report["memory"]["active_calls_left"] == 0
@@ -0,0 +1,61 @@
+import asyncio
+import datetime
+from collections import Counter
+
+from app.prefetch import ToolPrefetcher
+from app.roster import ArrivalRoster, Booking
+
+TODAY = datetime.date(2026, 10, 19)
+TZ = datetime.timezone(datetime.timedelta(hours=7))
+
+
+def _at(hour: int, minute: int = 0) -> datetime.datetime:
+    return datetime.datetime(2026, 10, 19, hour, minute, tzinfo=TZ)
+
+
+def test_all_day_event_is_on_time_all_day():
+    booking = Booking({"summary": "Budi", "start": {"date": TODAY.isoformat()}})
+    assert booking.all_day
+    for now in (_at(0, 5), _at(12), _at(23, 50)):
+        assert booking.verdict(now) == ("on_time", 0)
+    assert booking.to_result(_at(18))["start"] == TODAY.isoformat()
+
+
+def test_timed_event_still_gets_a_verdict():
+    booking = Booking({"summary": "Budi", "start": {"dateTime": _at(10).isoformat()}})
+    assert not booking.all_day
+    assert booking.verdict(_at(11))[0] == "late"
+    assert booking.verdict(_at(9))[0] == "early"
+
+
+class FakePool:
+    tool_mapping: dict = {}
+
+    def __init__(self):
+        self.executed = Counter()
+
+    async def execute_function(self, name, arguments):
+        self.executed[name] += 1
+        await asyncio.sleep(0.01)
+        return {"success": True, "result": "Reservasi ditemukan"}
+
+
+def test_fallback_lookup_reuses_the_prefetch():
+    async def scenario():
+        pool = FakePool()
+        roster = ArrivalRoster(pool)  # not loaded: every verify falls back
+        prefetcher = ToolPrefetcher(pool.execute_function, "reza", enabled=True)
+
+        async def run_tool(name, arguments):
+            result = await prefetcher.take(name, arguments)
+            return result if result is not None else await pool.execute_function(name, arguments)
+
+        prefetcher.feed("email saya budi@example.com ")
+        prefetcher.end_of_input()
+        result = await roster.verify({"email": "budi@example.com"}, lookup=run_tool)
+        prefetcher.close()
+        assert result["success"] and result["verdict"] == "unknown"
+        assert pool.executed["lookup_appointment"] == 1
+        assert prefetcher.hits == 1 and prefetcher.wasted == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from app.shared_state import RedisState, _read_reply
+
+
+async def _fake_redis(slow: set[str], drop_incr: list[bool]):
+    """RESP server: GET k -> "value-of-k" (delayed for `slow` keys); INCR counts."""
+    counters: dict[str, int] = {}
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                command, *args = [part.decode() for part in await _read_reply(reader)]
+                if command == "GET":
+                    if args[0] in slow:
+                        await asyncio.sleep(0.2)
+                    value = f"value-of-{args[0]}".encode()
+                    writer.write(b"$%d\r\n%s\r\n" % (len(value), value))
+                elif command == "INCR":
+                    counters[args[0]] = counters.get(args[0], 0) + 1
+                    if drop_incr and drop_incr.pop():
+                        writer.close()  # applied, but the reply never arrives
+                        return
+                    writer.write(b":%d\r\n" % counters[args[0]])
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, counters
+
+
+def test_cancelled_command_does_not_leak_its_reply():
+    async def scenario():
+        server, _ = await _fake_redis(slow={"tool:crm:alice"}, drop_incr=[])
+        state = RedisState(f"redis://127.0.0.1:{server.sockets[0].getsockname()[1]}/0")
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(state.get("tool:crm:alice"), timeout=0.05)
+            assert await state.get("tool:crm:bob") == b"value-of-tool:crm:bob"
+        finally:
+            await state.close()
+            server.close()
+
+    asyncio.run(scenario())
+
+
+def test_incr_is_not_resent_after_a_lost_reply():
+    async def scenario():
+        server, counters = await _fake_redis(slow=set(), drop_incr=[True])
+        state = RedisState(f"redis://127.0.0.1:{server.sockets[0].getsockname()[1]}/0")
+        try:
+            with pytest.raises((ConnectionError, asyncio.IncompleteReadError)):
+                await state.incr("ns:crm")
+            assert counters["ns:crm"] == 1
+            assert await state.incr("ns:crm") == 2
+        finally:
+            await state.close()
+            server.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,27 @@
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), "..")
+
+SCRIPT = """
+import asyncio, os, signal
+from app import main
+
+async def run():
+    main._install_drain_on_sigterm()  # previous handler is SIG_DFL here
+    os.kill(os.getpid(), signal.SIGTERM)
+    await asyncio.sleep(10)
+    print("still running")
+
+asyncio.run(run())
+"""
+
+
+def test_sigterm_exits_after_drain_without_a_previous_handler():
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT], cwd=BACKEND_DIR, capture_output=True, text=True,
+        env={**os.environ, "GEMINI_API_KEY": "test"}, timeout=30,
+    )
+    assert "still running" not in result.stdout
+    assert result.returncode == -15
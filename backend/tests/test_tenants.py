@@ -0,0 +1,98 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from app import main
+from app.mcp_bridge import mcp_bridge
+from app.tenants import DEFAULT_TENANT, TenantRegistry
+from app.tools import LOCAL_TOOLS, get_tool_declarations
+
+FULL_ENTRY = {
+    "mcp_url": "https://n8n.example.com/mcp/bistro-a",
+    "auth_token": "Bearer bistro-a",
+    "tool_mapping": {"client_lookup": "bistro-a-lookup"},
+    "personas": {"sari": {"instruction": "Bistro A", "voice": "Aoede"}},
+}
+
+
+def _load(tmp_path, tenants):
+    path = tmp_path / "tenants.json"
+    path.write_text(json.dumps({"tenants": tenants}))
+    registry = TenantRegistry()
+    registry.load(str(path))
+    return registry
+
+
+@pytest.mark.parametrize("field", ["personas", "mcp_url", "auth_token", "tool_mapping"])
+def test_tenant_without_its_own_settings_is_rejected(tmp_path, field):
+    entry = {key: value for key, value in FULL_ENTRY.items() if key != field}
+    with pytest.raises(ValueError, match=field):
+        _load(tmp_path, {"bistro-a": entry})
+
+
+def test_tenant_uses_only_its_own_settings(tmp_path):
+    tenant = _load(tmp_path, {"bistro-a": FULL_ENTRY}).tenants["bistro-a"]
+    bridge = tenant.mcp.bridges[0]
+    assert bridge.mcp_url == FULL_ENTRY["mcp_url"]
+    assert bridge.auth_token == FULL_ENTRY["auth_token"]
+    assert bridge.tool_mapping == FULL_ENTRY["tool_mapping"]
+    assert set(tenant.personas) == {"sari"}
+
+
+def test_default_tenant_entry_inherits_env(tmp_path):
+    tenant = _load(tmp_path, {DEFAULT_TENANT: {"max_concurrent_calls": 3}}).tenants[DEFAULT_TENANT]
+    assert tenant.mcp.bridges[0].tool_mapping == mcp_bridge.bridges[0].tool_mapping
+    assert set(tenant.personas) == {"sari", "reza"}
+
+
+def test_example_registry_loads():
+    registry = TenantRegistry()
+    registry.load(os.path.join(os.path.dirname(__file__), "..", "tenants.example.json"))
+    assert {"bistro-a", "office-b"} <= set(registry.tenants)
+
+
+def _declared(tenant, persona: str = "sari") -> set[str]:
+    return {
+        declaration.name
+        for tool in tenant.live_config(persona).tools
+        for declaration in tool.function_declarations
+    }
+
+
+def test_tenant_declares_only_its_mapped_and_local_tools(tmp_path):
+    registry = _load(tmp_path, {"bistro-a": FULL_ENTRY})
+    assert _declared(registry.tenants["bistro-a"]) == {"client_lookup"} | LOCAL_TOOLS
+    # The default venue maps every n8n workflow, so it keeps the full set
+    assert _declared(registry.tenants[DEFAULT_TENANT]) == {
+        declaration.name for tool in get_tool_declarations() for declaration in tool.function_declarations
+    }
+
+
+def _set_ready(pool, ready: bool):
+    for bridge in pool.bridges:
+        bridge._initialized = ready
+
+
+def test_ready_and_tool_cache_cover_every_tenant(tmp_path, monkeypatch):
+    registry = _load(tmp_path, {"bistro-a": FULL_ENTRY})
+    monkeypatch.setattr(main, "tenant_registry", registry)
+    monkeypatch.setattr(mcp_bridge.bridges[0], "_initialized", True)
+
+    response = asyncio.run(main.readiness_check())
+    body = json.loads(response.body)
+    assert body["checks"]["mcp"] is False  # bistro-a's n8n is not up yet
+    assert body["mcp_tenants"] == {DEFAULT_TENANT: True, "bistro-a": False}
+    assert response.status_code == 503
+
+    _set_ready(registry.tenants["bistro-a"].mcp, True)
+    try:
+        body = json.loads(asyncio.run(main.readiness_check()).body)
+        assert body["checks"]["mcp"] is True
+    finally:
+        _set_ready(registry.tenants["bistro-a"].mcp, False)
+
+    caches = asyncio.run(main.tool_cache_stats())
+    assert set(caches) == {DEFAULT_TENANT, "bistro-a"}
+    assert all("hit_rate" in summary for summary in caches.values())
@@ -0,0 +1,141 @@
+import asyncio
+import json
+import sqlite3
+
+from app.transcript_bench import bench
+from app.transcripts import CallTranscript, TranscriptWriter
+
+
+def _record(index: int, text: str = "Halo, saya Budi") -> dict:
+    return {
+        "call_id": f"call-{index}", "persona": "sari", "started_at": 1.0, "ended_at": 2.0,
+        "entries": [{"role": "user", "text": text, "t": 0.5}],
+    }
+
+
+def _writer(tmp_path, sink: str = "jsonl", **options) -> tuple[TranscriptWriter, list[int]]:
+    writer = TranscriptWriter(sink=sink, path=str(tmp_path / f"transcripts.{sink}"), **options)
+    batches = []
+    write_batch = writer._write_batch
+
+    def recording(batch):
+        batches.append(len(batch))
+        write_batch(batch)
+
+    writer._write_batch = recording
+    return writer, batches
+
+
+def test_batches_by_size_and_flushes_the_rest_on_close(tmp_path):
+    async def scenario():
+        writer, batches = _writer(tmp_path, batch_size=3, flush_interval=10)
+        writer.start()
+        for index in range(7):
+            assert writer.submit(_record(index))
+        await asyncio.sleep(0.1)
+        assert batches == [3, 3]  # the 7th waits for more records or the interval
+        assert writer.written == 6
+        await writer.close()
+        assert batches == [3, 3, 1]
+        assert writer.written == 7
+
+    asyncio.run(scenario())
+
+
+def test_batches_by_time(tmp_path):
+    async def scenario():
+        writer, batches = _writer(tmp_path, batch_size=100, flush_interval=0.1)
+        writer.start()
+        writer.submit(_record(1))
+        await asyncio.sleep(0.05)
+        writer.submit(_record(2))
+        assert batches == []
+        await asyncio.sleep(0.2)
+        assert batches == [2]  # one batch, written without waiting for close
+        writer.submit(_record(3))
+        await asyncio.sleep(0.2)
+        assert batches == [2, 1]
+        await writer.close()
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_drops_and_counts(tmp_path):
+    async def scenario():
+        writer, batches = _writer(tmp_path, max_pending=3)
+        writer.start()
+        # No await in between: the writer task cannot drain the queue yet
+        accepted = [writer.submit(_record(index)) for index in range(5)]
+        assert accepted == [True, True, True, False, False]
+        assert writer.dropped == 2
+        await writer.close()
+        assert writer.written == 3
+        lines = (tmp_path / "transcripts.jsonl").read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line)["call_id"] for line in lines] == ["call-0", "call-1", "call-2"]
+
+    asyncio.run(scenario())
+
+
+def test_jsonl_sink_appends_one_line_per_record(tmp_path):
+    async def scenario():
+        records = [_record(index, text="Terima kasih, sampai jumpa — Sari") for index in range(5)]
+        for chunk in (records[:2], records[2:]):  # two writer lifetimes append to the same file
+            writer, _ = _writer(tmp_path, batch_size=2)
+            writer.start()
+            for record in chunk:
+                writer.submit(record)
+            await writer.close()
+        text = (tmp_path / "transcripts.jsonl").read_text(encoding="utf-8")
+        assert "—" in text  # written as UTF-8, not escaped
+        assert [json.loads(line) for line in text.splitlines()] == records
+
+    asyncio.run(scenario())
+
+
+def test_sqlite_sink_stores_one_row_per_call(tmp_path):
+    async def scenario():
+        writer, _ = _writer(tmp_path, sink="sqlite", batch_size=2)
+        writer.start()
+        for index in range(3):
+            writer.submit(_record(index))
+        writer.submit(_record(1, text="Updated"))  # same call id replaces the row
+        await writer.close()
+        assert writer._db is None
+
+        with sqlite3.connect(tmp_path / "transcripts.sqlite") as db:
+            rows = db.execute("SELECT call_id, persona, started_at, ended_at, entries FROM transcripts ORDER BY call_id").fetchall()
+        assert [row[0] for row in rows] == ["call-0", "call-1", "call-2"]
+        assert rows[0][1:4] == ("sari", 1.0, 2.0)
+        assert json.loads(rows[1][4]) == [{"role": "user", "text": "Updated", "t": 0.5}]
+
+    asyncio.run(scenario())
+
+
+def test_disabled_sink_accepts_nothing(tmp_path):
+    async def scenario():
+        writer, batches = _writer(tmp_path, sink="none")
+        writer.start()
+        assert not writer.enabled
+        assert writer.submit(_record(1)) is False
+        await writer.close()
+        assert batches == []
+
+    asyncio.run(scenario())
+
+
+def test_call_transcript_merges_fragments_per_turn():
+    transcript = CallTranscript("call-1", "sari")
+    for role, text in [("user", " Halo,"), ("user", " saya Budi "), ("model", "Selamat"), ("model", " pagi"), ("user", "Terima kasih")]:
+        transcript.add(role, text)
+    record = transcript.to_record()
+    assert [(entry["role"], entry["text"]) for entry in record["entries"]] == [
+        ("user", "Halo, saya Budi"), ("model", "Selamat pagi"), ("user", "Terima kasih")
+    ]
+    assert record["ended_at"] >= record["started_at"]
+
+
+def test_transcript_bench_writes_everything():
+    report = bench(records=200, turns=5)["results"]
+    for sink in ("jsonl", "sqlite"):
+        assert report[sink]["written"] == 200
+        assert report[sink]["dropped"] == 0
@@ -23,7 +23,8 @@ export default function CallScreen() {
         connect,
         disconnect,
         onAudioReceived,
-        aiSpeaking
+        aiSpeaking,
+        notice
     } = useWebSocket()
 
     const {
@@ -40,14 +41,14 @@ export default function CallScreen() {
 
     // Handle audio received from AI
     useEffect(() => {
-        onAudioReceived((audioData) => {
-            if (isSpeakerOn) {
-                playAudioBuffer(audioData)
-            }
-
+        onAudioReceived((audioData, startOfSpeech) => {
             // Simulate AI audio level for visualization
             setAiAudioLevel(0.7)
             setTimeout(() => setAiAudioLevel(0), 200)
+
+            if (isSpeakerOn) {
+                return playAudioBuffer(audioData, startOfSpeech)
+            }
         })
     }, [onAudioReceived, playAudioBuffer, isSpeakerOn])
 
@@ -108,6 +109,22 @@ export default function CallScreen() {
                 </div>
             </motion.header>
 
+            {/* Server notice (maintenance, idle hang-up); stays up after the call ends */}
+            <AnimatePresence>
+                {notice && (
+                    <motion.div
+                        role="status"
+                        className="relative z-30 mx-4 px-4 py-2 rounded-lg bg-yellow-500/15 border border-yellow-500/40 text-yellow-100 text-sm text-center"
+                        initial={{ opacity: 0, y: -10 }}
+                        animate={{ opacity: 1, y: 0 }}
+                        exit={{ opacity: 0 }}
+                    >
+                        {notice.message}
+                        {notice.seconds !== undefined && ` (${notice.seconds}s)`}
+                    </motion.div>
+                )}
+            </AnimatePresence>
+
             {/* Main content */}
             <main className="flex-1 flex flex-col items-center justify-center relative px-4">
                 {/* Audio visualizer background */}
@@ -29,7 +29,8 @@ export default function KioskScreen() {
         disconnect,
         onAudioReceived,
         onFunctionCall,
-        aiSpeaking
+        aiSpeaking,
+        notice
     } = useWebSocket("reza")
 
     const {
@@ -126,10 +127,10 @@ export default function KioskScreen() {
 
     // 2. Audio Handling (AI Voice)
     useEffect(() => {
-        onAudioReceived((audioData) => {
-            playAudioBuffer(audioData)
+        onAudioReceived((audioData, startOfSpeech) => {
             setAiStatus("Speaking...")
             setTimeout(() => setAiStatus("Listening"), 1500) // Reset after bit
+            return playAudioBuffer(audioData, startOfSpeech)
         })
     }, [onAudioReceived, playAudioBuffer])
 
@@ -261,6 +262,12 @@ export default function KioskScreen() {
                         System: {status === 'connected' ? "ONLINE" : "OFFLINE"}
                     </p>
                 </div>
+                {notice && (
+                    <p role="status" className="mt-3 mx-auto max-w-xl px-4 py-2 text-sm font-mono text-yellow-200 border border-yellow-500/50 bg-black/60 rounded">
+                        {notice.message}
+                        {notice.seconds !== undefined && ` (${notice.seconds}s)`}
+                    </p>
+                )}
             </div>
 
             {/* Face Scanning Frame (Dynamic) */}
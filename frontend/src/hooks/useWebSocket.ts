@@ -1,37 +1,60 @@
 'use client'
 
 import { useState, useEffect, useCallback, useRef } from 'react'
+import type { PlaybackReport } from '@/lib/audioUtils'
 
 type CallStatus = 'idle' | 'connecting' | 'ringing' | 'connected' | 'ended'
 
 interface WebSocketMessage {
-    type: 'audio' | 'status' | 'function_call' | 'error' | 'text'
+    type: 'audio' | 'status' | 'function_call' | 'error' | 'text' | 'transcript' | 'notice'
     data?: string
+    role?: 'user' | 'assistant'
+    text?: string
     status?: string
     name?: string
     arguments?: Record<string, unknown>
     message?: string
+    reason?: string
+    seconds?: number
+    seq?: number
+    start?: boolean
+    ack?: boolean
 }
 
+// Server notice shown on screen (e.g. maintenance drain, idle hang-up)
+export interface CallNotice {
+    reason: string
+    message: string
+    seconds?: number
+}
+
+// Returns the playback state so paced audio frames can be acknowledged
+type AudioCallback = (
+    audioData: ArrayBuffer,
+    startOfSpeech: boolean
+) => PlaybackReport | void | Promise<PlaybackReport | void | undefined>
+
 interface UseWebSocketReturn {
     isConnected: boolean
     status: CallStatus
     sendAudio: (audioData: ArrayBuffer) => void
     connect: () => void
     disconnect: () => void
-    onAudioReceived: (callback: (audioData: ArrayBuffer) => void) => void
+    onAudioReceived: (callback: AudioCallback) => void
     onFunctionCall: (callback: (name: string, args: any) => void) => void
     aiSpeaking: boolean
     sendImage: (base64Data: string) => void
+    notice: CallNotice | null
 }
 
 export function useWebSocket(persona: string = "sari"): UseWebSocketReturn {
     const [isConnected, setIsConnected] = useState(false)
     const [status, setStatus] = useState<CallStatus>('idle')
     const [aiSpeaking, setAiSpeaking] = useState(false)
+    const [notice, setNotice] = useState<CallNotice | null>(null)
 
     const wsRef = useRef<WebSocket | null>(null)
-    const audioCallbackRef = useRef<((audioData: ArrayBuffer) => void) | null>(null)
+    const audioCallbackRef = useRef<AudioCallback | null>(null)
     const functionCallCallbackRef = useRef<((name: string, args: any) => void) | null>(null)
     const reconnectTimeoutRef = useRef<NodeJS.Timeout | null>(null)
 
@@ -44,6 +67,7 @@ export function useWebSocket(persona: string = "sari"): UseWebSocketReturn {
         const wsUrl = `${baseUrl}?persona=${persona}`
 
         setStatus('connecting')
+        setNotice(null)
 
         try {
             const ws = new WebSocket(wsUrl)
@@ -75,11 +99,24 @@ export function useWebSocket(persona: string = "sari"): UseWebSocketReturn {
                                 for (let i = 0; i < binaryString.length; i++) {
                                     bytes[i] = binaryString.charCodeAt(i)
                                 }
-                                audioCallbackRef.current(bytes.buffer)
                                 setAiSpeaking(true)
 
                                 // Reset AI speaking after a short delay
                                 setTimeout(() => setAiSpeaking(false), 500)
+
+                                // Frames without seq come from a server that does not pace audio
+                                const report = await audioCallbackRef.current(
+                                    bytes.buffer,
+                                    message.start === true || message.seq === undefined
+                                )
+                                if (message.ack && report && ws.readyState === WebSocket.OPEN) {
+                                    ws.send(JSON.stringify({
+                                        type: 'audio_ack',
+                                        seq: message.seq,
+                                        buffered_ms: Math.round(report.bufferedMs),
+                                        underruns: report.underruns
+                                    }))
+                                }
                             }
                             break
 
@@ -107,6 +144,20 @@ export function useWebSocket(persona: string = "sari"): UseWebSocketReturn {
                         case 'text':
                             console.log('AI text:', message.data)
                             break
+
+                        case 'transcript':
+                            console.log(`Transcript (${message.role}):`, message.text)
+                            break
+
+                        case 'notice':
+                            if (message.message) {
+                                setNotice({
+                                    reason: message.reason || 'notice',
+                                    message: message.message,
+                                    seconds: message.seconds
+                                })
+                            }
+                            break
                     }
                 } catch (error) {
                     console.error('Error parsing WebSocket message:', error)
@@ -182,7 +233,7 @@ export function useWebSocket(persona: string = "sari"): UseWebSocketReturn {
         }
     }, [])
 
-    const onAudioReceived = useCallback((callback: (audioData: ArrayBuffer) => void) => {
+    const onAudioReceived = useCallback((callback: AudioCallback) => {
         audioCallbackRef.current = callback
     }, [])
 
@@ -211,6 +262,7 @@ export function useWebSocket(persona: string = "sari"): UseWebSocketReturn {
         onAudioReceived,
         onFunctionCall,
         aiSpeaking,
-        sendImage
+        sendImage,
+        notice
     }
 }
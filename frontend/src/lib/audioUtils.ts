@@ -2,6 +2,14 @@
 
 import { useRef, useCallback } from 'react'
 
+/**
+ * Playback state reported back to the server after scheduling a chunk
+ */
+export interface PlaybackReport {
+    bufferedMs: number
+    underruns: number
+}
+
 /**
  * Audio playback utilities for playing PCM audio received from WebSocket
  * Uses scheduled playback for gapless continuous audio stream
@@ -10,6 +18,7 @@ export function useAudioPlayback() {
     const audioContextRef = useRef<AudioContext | null>(null)
     const nextPlayTimeRef = useRef<number>(0)
     const isInitializedRef = useRef<boolean>(false)
+    const underrunsRef = useRef<number>(0)
 
     const getAudioContext = useCallback(() => {
         if (!audioContextRef.current) {
@@ -20,7 +29,10 @@ export function useAudioPlayback() {
         return audioContextRef.current
     }, [])
 
-    const playAudioBuffer = useCallback(async (audioData: ArrayBuffer) => {
+    const playAudioBuffer = useCallback(async (
+        audioData: ArrayBuffer,
+        startOfSpeech: boolean = true
+    ): Promise<PlaybackReport | undefined> => {
         try {
             const audioContext = getAudioContext()
 
@@ -51,6 +63,10 @@ export function useAudioPlayback() {
 
             // Initialize or reset if we've fallen behind
             if (!isInitializedRef.current || nextPlayTimeRef.current < currentTime) {
+                // Ran dry in the middle of speech: the server raises its jitter target
+                if (isInitializedRef.current && !startOfSpeech) {
+                    underrunsRef.current += 1
+                }
                 // Add a small buffer for the first chunk (50ms)
                 nextPlayTimeRef.current = currentTime + 0.05
                 isInitializedRef.current = true
@@ -62,6 +78,11 @@ export function useAudioPlayback() {
             // Update next play time for the following chunk
             nextPlayTimeRef.current += audioBuffer.duration
 
+            return {
+                bufferedMs: (nextPlayTimeRef.current - currentTime) * 1000,
+                underruns: underrunsRef.current
+            }
+
         } catch (error) {
             console.error('Error playing audio:', error)
         }
@@ -74,6 +95,7 @@ export function useAudioPlayback() {
         }
         nextPlayTimeRef.current = 0
         isInitializedRef.current = false
+        underrunsRef.current = 0
     }, [])
 
     return {